@@ -0,0 +1,204 @@
+"""Offline feature extraction over whole raw recordings.
+
+`extract_features` computes every hop of a recording in one vectorized pass
+and reproduces the live bridge's `FeatureComputer` (default, non-streaming
+Welch) hop for hop:
+
+- hops end at the same sample indices as the bridge's `HopScheduler`;
+- the windows are a strided (n_hops, channels, window) view of the
+  recording, and their Welch PSDs are batched rffts over chunks of hops
+  sized to a memory budget;
+- the EMA is evaluated block-wise as a matrix product plus a carried
+  state, and the slew limiter only steps sample by sample while it is
+  actually limiting.
+
+Band powers, relative powers and `ri` agree with the live loop to ~1e-15
+relative, the rounding of a different FFT batching; `ri_ema` and
+`ri_scaled`, whose EMA is evaluated block-wise, agree to ~1e-15 absolute.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.live_visualisation.live_eeg_stream import BANDS, BridgeConfig, FeatureComputer, _window_and_hop
+from src.raw_recording import RawRecording
+from utils.utils import get_welch_plan
+
+# Hops per EMA block; keeps decay**-k well inside float64 range for any alpha.
+_EMA_BLOCK = 64
+
+
+@dataclass
+class BatchFeatures:
+    """Features of every hop of a recording, one row per hop.
+
+    Attributes
+    ----------
+    end : np.ndarray
+        Sample index (exclusive) at which each hop's window ends.
+    t : np.ndarray
+        Recording timestamp of each window's newest sample.
+    absolute : np.ndarray
+        (n_hops, 5) channel-averaged band powers in `BAND_NAMES` order.
+    relative : np.ndarray
+        (n_hops, 5) band powers relative to the 1-45 Hz total.
+    ri, ri_ema, ri_scaled : np.ndarray
+        Relaxation index, its EMA and the eased, slew-limited 0-1 value.
+    """
+
+    end: np.ndarray
+    t: np.ndarray
+    absolute: np.ndarray
+    relative: np.ndarray
+    ri: np.ndarray
+    ri_ema: np.ndarray
+    ri_scaled: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.end)
+
+
+def hop_ends(n_samples: int, window_size: int, hop_size: int) -> np.ndarray:
+    """Window end indices the bridge's `HopScheduler` fires for `n_samples` of input."""
+    first = -(-window_size // hop_size)
+    last = n_samples // hop_size
+    return np.arange(first, last + 1, dtype=np.int64) * hop_size
+
+
+def _band_powers(samples: np.ndarray, ends: np.ndarray, window_size: int, fs: float, seg_len: int,
+                 overlap: int, max_bytes: int) -> np.ndarray:
+    """(n_hops, n_channels, n_bands) Welch band powers of the windows ending at `ends`."""
+    n_channels = samples.shape[0]
+    plan = get_welch_plan(fs, seg_len, BANDS)
+    step = max(1, seg_len - overlap)
+    n_segs = (window_size - seg_len) // step + 1
+    # Demeaned segments, windowed segments and their spectrum dominate the memory per hop.
+    per_hop = n_channels * n_segs * seg_len * 8 * 4
+    chunk = max(1, int(max_bytes // per_hop))
+    out = np.empty((len(ends), n_channels, len(BANDS)))
+    if not len(ends):
+        return out
+    # Every window of the recording as a strided view; only each chunk's hops are gathered.
+    windows = np.lib.stride_tricks.sliding_window_view(samples, window_size, axis=-1)
+    starts = ends - window_size
+    for i in range(0, len(ends), chunk):
+        # Gather this chunk's (hops, channels, window) block, then view it as Welch segments.
+        batch = windows[:, starts[i:i + chunk], :].transpose(1, 0, 2)
+        segs = np.lib.stride_tricks.sliding_window_view(batch, seg_len, axis=-1)[:, :, ::step, :]
+        segs = segs - segs.mean(axis=-1, keepdims=True)
+        fft_vals = np.fft.rfft(segs * plan.window, axis=-1)
+        psd = (np.abs(fft_vals) ** 2).mean(axis=2) * plan.scale
+        out[i:i + chunk] = plan.band_powers(psd)
+    return out
+
+
+def _ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    """`exponential_moving_average` applied along `x`, seeded with its first value."""
+    n = len(x)
+    if n == 0:
+        return x.copy()
+    decay = 1.0 - alpha
+    k = np.arange(_EMA_BLOCK)
+    lags = k[:, None] - k[None, :]
+    # ema[b, i] = sum_j alpha * decay**(i-j) * x[b, j] + decay**(i+1) * carry[b]
+    response = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+    n_blocks = -(-n // _EMA_BLOCK)
+    blocks = np.zeros((n_blocks, _EMA_BLOCK))
+    blocks.ravel()[:n] = x
+    partial = blocks @ response.T
+    carry_gain = decay ** (k + 1)
+    carries = np.empty(n_blocks)
+    carry = x[0]  # alpha * x0 + decay * x0 == x0, the live loop's seed
+    block_decay = decay ** _EMA_BLOCK
+    for b in range(n_blocks):
+        carries[b] = carry
+        carry = partial[b, -1] + block_decay * carry
+    return (partial + carry_gain * carries[:, None]).ravel()[:n]
+
+
+def _slew_limit(x: np.ndarray, max_step: float, start: float) -> np.ndarray:
+    """Per-hop slew limiting as in `FeatureComputer`, stepping only through limited stretches."""
+    y = x.copy()
+    n = len(x)
+    # Where the output follows the input, hop j is limited iff |x[j] - x[j-1]| > max_step.
+    jumps = np.flatnonzero(np.abs(np.diff(x)) > max_step) + 1
+    k, prev = 0, start
+    while k < n:
+        if abs(x[k] - prev) <= max_step:
+            # Following: jump straight to the next hop that would be limited.
+            nxt = jumps[np.searchsorted(jumps, k + 1)] if jumps.size and jumps[-1] > k else n
+            k = nxt
+            prev = x[k - 1]
+            continue
+        while k < n:
+            delta = x[k] - prev
+            if delta > max_step:
+                prev = prev + max_step
+            elif delta < -max_step:
+                prev = prev - max_step
+            else:
+                prev = x[k]
+                y[k] = prev
+                k += 1
+                break
+            y[k] = prev
+            k += 1
+    return y
+
+
+def _ease(ri_ema: np.ndarray, low: float, high: float) -> np.ndarray:
+    """`FeatureComputer`'s cosine ease of the EMA inside the focus band, before slew limiting."""
+    base = np.clip(0.5 * (ri_ema + 1.0), 0.0, 1.0)
+    denom = max(1e-9, high - low)
+    inside = (base > low) & (base < high)
+    eased = np.where(inside, 0.5 - 0.5 * np.cos(np.pi * (base - low) / denom), base)
+    return np.clip(eased, 0.0, 1.0)
+
+
+def extract_features(samples: np.ndarray, fs: float, cfg: Optional[BridgeConfig] = None,
+                     timestamps: Optional[np.ndarray] = None, max_bytes: int = 16 << 20) -> BatchFeatures:
+    """Compute every hop's features for a whole recording at once.
+
+    Parameters
+    ----------
+    samples : np.ndarray
+        (4, n) raw EEG, rows TP9, AF7, AF8, TP10.
+    fs : float
+        Sampling rate.
+    cfg : Optional[BridgeConfig]
+        Window, hop and smoothing settings; the bridge defaults if None.
+    timestamps : Optional[np.ndarray]
+        Per-sample timestamps for `BatchFeatures.t`; sample times from 0 if None.
+    max_bytes : int
+        Rough memory budget for the batched FFTs; a few MB keeps each chunk in cache.
+
+    Returns
+    -------
+    BatchFeatures
+        One row per hop, like the live bridge's `HopFeatures` sequence.
+    """
+    cfg = cfg or BridgeConfig()
+    window_size, hop_size = _window_and_hop(cfg)
+    computer = FeatureComputer(BridgeConfig(hop_seconds=cfg.hop_seconds), fs, window_size)
+    samples = np.asarray(samples, dtype=np.float64)
+    ends = hop_ends(samples.shape[1], window_size, hop_size)
+
+    powers = _band_powers(samples, ends, window_size, fs, computer.seg_len, computer.overlap, max_bytes)
+    mean_powers = powers.mean(axis=1)
+    absolute, total = mean_powers[:, :-1], mean_powers[:, -1:]
+    relative = absolute / (total + 1e-9)
+    ri = relative[:, 2] - relative[:, 3]
+    ri_ema = _ema(ri, computer.ema_alpha)
+    ri_scaled = _slew_limit(_ease(ri_ema, computer.focus_low, computer.focus_high),
+                            computer.max_step, computer.last_ri_scaled)
+
+    t = timestamps[ends - 1] if timestamps is not None and len(ends) else (ends - 1) / fs
+    return BatchFeatures(ends, np.asarray(t, dtype=np.float64), absolute, relative, ri, ri_ema, ri_scaled)
+
+
+def extract_recording_features(recording: RawRecording, cfg: Optional[BridgeConfig] = None,
+                               max_bytes: int = 16 << 20) -> BatchFeatures:
+    """`extract_features` for a recording from `load_raw_eeg` or `open_raw_recording`."""
+    return extract_features(recording.samples, recording.fs, cfg, recording.timestamps, max_bytes)
@@ -2,6 +2,12 @@
 
 This package contains:
 - live_eeg_stream.py: LSL → features → OSC/UDP bridge
+- pipeline.py: threaded bridge runtime (acquisition / compute / sink)
+- multi_headset.py: one bridge worker process per headset, tagged outputs
+- fanout.py: multi-destination UDP/OSC fan-out and its control socket
+- rate_output.py: fixed-rate, interpolated Unity UDP output
+- shm_channel.py: shared-memory feature channel and its reader API
+- ws_stream.py: WebSocket feature stream and dashboard page for browsers
 - osc_visualizer.py: PyQt6 OSC visualizer using pyqtgraph
 
 All modules expose a main() entry point for direct execution.
@@ -0,0 +1,245 @@
+"""Fan-out of bridge datagrams to many UDP destinations.
+
+Each output channel (OSC, Unity UDP) is a `UdpFanout`: the payload is
+encoded once and sent with one `sendto` per subscribed destination from a
+single non-blocking socket. A multicast group is just another destination;
+one send then reaches every listener that joined the group.
+
+Destinations can be added and removed while the bridge runs through a
+`ControlServer`, a small line protocol on a local UDP socket:
+
+    subscribe <channel> <host> <port>
+    unsubscribe <channel> <host> <port>
+    list
+    stats
+
+where <channel> is 'osc' or 'udp'. Every command gets a JSON reply, ie
+
+    echo "subscribe udp 127.0.0.1 5006" | nc -u -w1 127.0.0.1 7100
+"""
+
+import errno
+import ipaddress
+import json
+import socket
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Destination = Tuple[str, int]
+
+# sendto errors that mean "socket buffer full, datagram not sent" rather than a broken destination.
+_DROP_ERRNOS = {errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS}
+
+
+def parse_destination(text: str) -> Destination:
+    """Parse 'host:port' into a (host, port) pair; raises ValueError if it is malformed."""
+    host, sep, port = text.rpartition(':')
+    if sep and host and port.isdigit() and 0 < int(port) < 65536:
+        return host, int(port)
+    raise ValueError(f"destination must be HOST:PORT with a port in 1-65535, got {text!r}")
+
+
+def _is_multicast(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_multicast
+    except ValueError:
+        return False
+
+
+class UdpFanout:
+    """Sends each datagram to every subscribed destination.
+
+    Subscribing and unsubscribing are safe from any thread: the destination
+    list is replaced, never mutated, so `send` iterates without a lock.
+
+    Parameters
+    ----------
+    destinations : Iterable[Tuple[str, int]]
+        Initial (host, port) destinations, unicast or multicast.
+    multicast_ttl : int
+        Hop limit for multicast destinations; 1 keeps them on the local network.
+    """
+
+    def __init__(self, destinations: Iterable[Destination] = (), multicast_ttl: int = 1):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, max(0, int(multicast_ttl)))
+        self._lock = threading.Lock()
+        self._destinations: Tuple[Destination, ...] = ()
+        self._counters: Dict[Destination, Dict[str, int]] = {}
+        for host, port in destinations:
+            self.subscribe(host, port)
+
+    @property
+    def destinations(self) -> Tuple[Destination, ...]:
+        return self._destinations
+
+    def subscribe(self, host: str, port: int) -> bool:
+        """Add a destination; returns False if it was already subscribed."""
+        dest = (host, int(port))
+        with self._lock:
+            if dest in self._destinations:
+                return False
+            self._counters[dest] = {'sent': 0, 'dropped': 0, 'errors': 0}
+            self._destinations = self._destinations + (dest,)
+        return True
+
+    def unsubscribe(self, host: str, port: int) -> bool:
+        """Remove a destination; returns False if it was not subscribed."""
+        dest = (host, int(port))
+        with self._lock:
+            if dest not in self._destinations:
+                return False
+            self._destinations = tuple(d for d in self._destinations if d != dest)
+            self._counters.pop(dest, None)
+        return True
+
+    def send(self, data: Optional[bytes]) -> int:
+        """Send `data` to every destination; returns how many accepted it."""
+        if not data:
+            return 0
+        sent = 0
+        for dest in self._destinations:
+            counters = self._counters.get(dest)
+            if counters is None:
+                continue
+            try:
+                self.sock.sendto(data, dest)
+            except OSError as e:
+                counters['dropped' if e.errno in _DROP_ERRNOS else 'errors'] += 1
+            else:
+                counters['sent'] += 1
+                sent += 1
+        return sent
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-destination counters keyed 'host:port' (multicast ones marked)."""
+        return {
+            f"{host}:{port}" + (' (multicast)' if _is_multicast(host) else ''): dict(self._counters.get((host, port), {}))
+            for host, port in self._destinations
+        }
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class ControlServer:
+    """Runtime subscribe/unsubscribe for a set of named `UdpFanout` channels.
+
+    Serves the line protocol described in the module docstring on a daemon
+    thread.
+
+    Parameters
+    ----------
+    channels : Dict[str, UdpFanout]
+        Channels by name, ie {'osc': ..., 'udp': ...}.
+    host : str
+        Interface to bind; keep it on loopback unless remote control is wanted.
+    port : int
+        UDP port to listen on.
+    """
+
+    def __init__(self, channels: Dict[str, UdpFanout], host: str = '127.0.0.1', port: int = 7100):
+        self.channels = channels
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.5)
+        self.address = self.sock.getsockname()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name='bridge-control', daemon=True)
+
+    def start(self) -> 'ControlServer':
+        self._thread.start()
+        print(f"Control socket on {self.address[0]}:{self.address[1]} (subscribe/unsubscribe/list/stats)")
+        return self
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data, peer = self.sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            reply = self.handle(data.decode('utf-8', 'replace'))
+            try:
+                self.sock.sendto(json.dumps(reply).encode('utf-8'), peer)
+            except OSError:
+                pass
+
+    def handle(self, command: str) -> dict:
+        """Execute one command line and return the reply."""
+        words = command.split()
+        if not words:
+            return {'ok': False, 'error': 'empty command'}
+        verb, args = words[0].lower(), words[1:]
+        if verb == 'list':
+            return {'ok': True, 'channels': {name: [f"{h}:{p}" for h, p in ch.destinations]
+                                             for name, ch in self.channels.items()}}
+        if verb == 'stats':
+            return {'ok': True, 'channels': {name: ch.stats() for name, ch in self.channels.items()}}
+        if verb in ('subscribe', 'unsubscribe') and len(args) == 3:
+            name, host, port = args
+            channel = self.channels.get(name)
+            if channel is None:
+                return {'ok': False, 'error': f"unknown channel {name!r}, expected one of {sorted(self.channels)}"}
+            try:
+                port = int(port)
+            except ValueError:
+                return {'ok': False, 'error': f"bad port {port!r}"}
+            changed = channel.subscribe(host, port) if verb == 'subscribe' else channel.unsubscribe(host, port)
+            return {'ok': True, 'changed': changed}
+        return {'ok': False, 'error': f"unknown command {command.strip()!r}"}
+
+    def close(self) -> None:
+        self._stop.set()
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        self._thread.join(1.0)
+
+
+def format_fanout_stats(name: str, fanout: UdpFanout) -> List[str]:
+    """One console line per destination of `fanout`."""
+    return [f"{name} {dest}: " + ", ".join(f"{k}={v}" for k, v in counters.items())
+            for dest, counters in fanout.stats().items()]
+
+
+class OutputChannels:
+    """The bridge's OSC and Unity UDP fan-outs plus its optional control server.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        `osc_ip/osc_port` and `udp_ip/udp_port` are the first destinations of
+        each enabled channel, followed by `osc_destinations` and
+        `udp_destinations`; `control_port` (0 disables) starts a `ControlServer`.
+    """
+
+    def __init__(self, cfg):
+        self.osc: Optional[UdpFanout] = None
+        self.udp: Optional[UdpFanout] = None
+        self.control: Optional[ControlServer] = None
+        if cfg.enable_osc:
+            self.osc = UdpFanout([(cfg.osc_ip, cfg.osc_port)] + [parse_destination(d) for d in cfg.osc_destinations],
+                                 multicast_ttl=cfg.multicast_ttl)
+        if cfg.enable_udp:
+            self.udp = UdpFanout([(cfg.udp_ip, cfg.udp_port)] + [parse_destination(d) for d in cfg.udp_destinations],
+                                 multicast_ttl=cfg.multicast_ttl)
+        if cfg.control_port:
+            channels = {name: ch for name, ch in (('osc', self.osc), ('udp', self.udp)) if ch is not None}
+            self.control = ControlServer(channels, cfg.control_ip, cfg.control_port).start()
+
+    def close(self) -> None:
+        """Stop the control server, print per-destination counters and close the sockets."""
+        if self.control is not None:
+            self.control.close()
+        for name, fanout in (('OSC', self.osc), ('UDP', self.udp)):
+            if fanout is not None:
+                for line in format_fanout_stats(name, fanout):
+                    print(line)
+                fanout.close()
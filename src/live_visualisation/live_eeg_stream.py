@@ -1,25 +1,48 @@
 import argparse
+import asyncio
 import json
 import math
 import os
-import socket
 import time
-from collections import deque
 from dataclasses import dataclass
-from typing import Deque, Optional, Tuple
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
 
 import numpy as np
 from pylsl import StreamInlet, resolve_byprop
 
-from utils.utils import find_eeg_inlet, compute_bandpower_welch, exponential_moving_average
+from src.live_visualisation.fanout import OutputChannels, parse_destination
+from src.live_visualisation.rate_output import GameRateOutput, HopInterpolator
+from src.live_visualisation.shm_channel import SharedMemoryPublisher
+from src.live_visualisation.ws_stream import FeatureWebSocketServer
+from src.pacing import Pacer
+from src.raw_recording import RawEEGRecorder
+from src.replay import RawEEGReplay, load_raw_eeg
+from src.session_log import SESSION_LOG_SUFFIX, BinarySessionWriter
+from src.synthetic import BAND_PROFILES, SyntheticEEG, parse_trajectory
+from utils.row_writer import SESSION_CSV_HEADER, BackgroundCSVWriter, BackgroundRowWriter
+from utils.utils import (
+    ChunkedInlet,
+    OscBundleTemplate,
+    RelaxationPacketEncoder,
+    RingBuffer,
+    StreamingWelch,
+    compute_band_powers_welch_multi,
+    encode_osc_eeg_chunk,
+    exponential_moving_average,
+    find_eeg_inlet,
+)
 
 try:
-    from pythonosc.udp_client import SimpleUDPClient as OscUDPClient
+    from pythonosc.osc_message_builder import OscMessageBuilder
 except Exception:
-    OscUDPClient = None
+    OscMessageBuilder = None
 
 
- 
+# Band edges in Hz; the trailing entry is the total band used for relative powers.
+BAND_NAMES = ('delta', 'theta', 'alpha', 'beta', 'gamma')
+BANDS = ((1.0, 4.0), (4.0, 8.0), (8.0, 12.0), (13.0, 30.0), (30.0, 45.0), (1.0, 45.0))
+# Seconds a one-sample LSL pull (`--pull-sample`) blocks before giving up.
+_PULL_SAMPLE_TIMEOUT = 5.0
 
 
 @dataclass
@@ -33,151 +56,902 @@ class BridgeConfig:
     osc_port : int
         Destination port for OSC messages.
     udp_ip : str
-        Destination IP for the Unity UDP JSON channel.
+        Destination IP for the Unity UDP channel.
     udp_port : int
-        Destination port for the Unity UDP JSON channel.
+        Destination port for the Unity UDP channel.
+    udp_format : str
+        'json' (default) or 'binary' for the fixed-layout packet from
+        `utils.utils.RelaxationPacketEncoder`.
+    udp_rate_hz : float
+        If non-zero, sends the Unity packet at this fixed rate with values
+        interpolated between hops (see `rate_output.py`) instead of once per
+        hop.
+    udp_interpolation : str
+        'interpolate', 'extrapolate' or 'hold', for `udp_rate_hz`.
+    osc_destinations : Tuple[str, ...]
+        Extra 'host:port' OSC destinations; every datagram is encoded once and
+        sent to each (see `fanout.py`). Multicast groups are allowed.
+    udp_destinations : Tuple[str, ...]
+        Extra 'host:port' destinations for the Unity UDP channel.
+    multicast_ttl : int
+        Hop limit for multicast destinations.
+    control_ip : str
+        Interface for the control socket.
+    control_port : int
+        If non-zero, listens here for runtime subscribe/unsubscribe commands.
     window_seconds : float
         Sliding analysis window duration used for bandpower.
     hop_seconds : float
         Hop between processing windows; controls update rate and smoothing.
     send_raw_eeg : bool
-        If True, forwards last raw EEG sample via OSC /muse/eeg for debugging.
+        If True, forwards raw EEG via OSC for debugging and visualization.
+    raw_eeg_chunks : bool
+        If True, raw EEG goes out as `/muse/eeg_chunk` messages of
+        `raw_chunk_samples` samples each (see `RawEEGForwarder`) instead of
+        one /muse/eeg message per sample, which Muse-style OSC consumers
+        expect.
+    raw_chunk_samples : int
+        Samples per `/muse/eeg_chunk` message.
     enable_osc : bool
         Enables OSC output.
+    osc_bundle : bool
+        If True, sends each hop's band elements as one timestamped OSC
+        bundle built from a pre-encoded template; otherwise one message per
+        element.
     enable_udp : bool
         Enables UDP JSON output for Unity.
     log_csv : bool
-        If True, writes summary metrics to a CSV in `logs/`.
+        If True, writes summary metrics to a session log in `logs/`.
+    log_format : str
+        'csv' (default) or 'binary' for a `.rwlog` file (see
+        `src/session_log.py`) with the same columns.
+    log_flush_rows : int
+        Rows queued before the background log writer flushes early.
+    log_flush_seconds : float
+        Longest time a row waits before it is written and flushed.
+    log_fsync : bool
+        Also fsync the log after each flush.
+    record_raw : bool
+        If True, records every raw sample with its LSL timestamp to
+        `logs/raw_<stamp>.eeg` (see `src/raw_recording.py`).
+    replay : Tuple[str, ...]
+        Recorded raw EEG to read instead of LSL (see `src/replay.py`); one
+        file, or one per headset with `multi_headset`. The bridge stops at the
+        end of the recording.
+    replay_speed : float
+        Replay rate relative to the recorded timestamps; 0 replays as fast as
+        the features are computed.
+    enable_console : bool
+        Print one line of features per hop.
     simulate : bool
-        If True, runs a synthetic EEG generator instead of LSL input.
+        If True, runs a synthetic EEG generator instead of LSL input (see
+        `src/synthetic.py`).
+    sim_seed : Optional[int]
+        Seed of the synthetic EEG; runs with the same seed produce the same
+        samples. Random (and printed) if None.
+    sim_trajectory : str
+        Scripted relaxation level of the synthetic EEG, ie '0.5',
+        '0:0.2,60:0.9' or 'sine:120' (see `parse_trajectory`).
+    sim_low : str
+        Band profile of the synthetic EEG at relaxation level 0.
+    sim_high : str
+        Band profile at relaxation level 1.
+    sim_seconds : float
+        If non-zero, the simulation ends after this much synthetic EEG.
+    sim_unthrottled : bool
+        If True, generates synthetic EEG as fast as the bridge consumes it
+        instead of in real time, to load-test the pipeline.
+    pace_spin_ms : float
+        Simulate and replay release samples on absolute deadlines; this is
+        the time busy-waited before each one instead of sleeping, for
+        sub-millisecond timing at the cost of CPU (0 only sleeps).
+    streaming_welch : bool
+        If True, computes bandpowers with `StreamingWelch`, which keeps a
+        running PSD sum and transforms one new segment per hop instead of
+        the whole window. Results match the default Welch to rounding. It
+        needs a hop that divides the 128-sample segment step, ie
+        --hop-seconds 0.125 or 0.25; with any other hop, such as the 0.1 s
+        default, no segment could be reused and the default Welch is used.
+    pull_chunk : bool
+        If True, acquires LSL samples in chunks into preallocated arrays;
+        otherwise pulls one sample at a time.
+    chunk_max_samples : int
+        Largest chunk taken from LSL per pull.
+    chunk_timeout : float
+        Seconds a pull blocks when no sample is buffered; once one arrives
+        the chunk is whatever is already buffered, so pulls never wait for
+        `chunk_max_samples` to fill.
+    coalesce_hops : bool
+        If True, a burst covering several hops processes only the newest one
+        instead of catching up on each.
+    threaded : bool
+        If True, runs acquisition, feature computation and outputs on
+        separate threads joined by bounded queues (see `pipeline.py`).
+    queue_size : int
+        Capacity of each pipeline queue; the oldest item is dropped when full.
+    use_asyncio : bool
+        If True, runs `run_bridge_async` on an asyncio event loop.
+    multi_headset : bool
+        If True, runs one worker process per EEG stream and tags every
+        output with a headset ID (see `multi_headset.py`).
+    headsets : int
+        Maximum number of streams used in multi-headset mode, and the number
+        of simulated headsets with `simulate`.
+    shm_name : Optional[str]
+        If set, also publishes every hop and its raw window to the shared
+        memory segment of this name (see `shm_channel.py`); multi-headset
+        mode appends `_h<ID>` per headset.
+    shm_history : int
+        Hops kept in the shared-memory history ring.
+    ws_port : int
+        If non-zero, serves features to browsers over a WebSocket on this
+        port (see `ws_stream.py`).
+    ws_host : str
+        Interface for the WebSocket server.
+    ws_rate_hz : float
+        Most WebSocket sends per client per second; stale hops are skipped.
+    ws_raw_decimation : int
+        If non-zero, also streams raw EEG block-averaged by this factor.
     """
     osc_ip: str = '127.0.0.1'
     osc_port: int = 7000
     udp_ip: str = '127.0.0.1'
     udp_port: int = 5005
+    udp_format: str = 'json'
+    udp_rate_hz: float = 0.0
+    udp_interpolation: str = 'interpolate'
+    osc_destinations: Tuple[str, ...] = ()
+    udp_destinations: Tuple[str, ...] = ()
+    multicast_ttl: int = 1
+    control_ip: str = '127.0.0.1'
+    control_port: int = 0
     window_seconds: float = 2.0
     hop_seconds: float = 0.1
     send_raw_eeg: bool = False
+    raw_eeg_chunks: bool = False
+    raw_chunk_samples: int = 16
     enable_osc: bool = True
+    osc_bundle: bool = True
     enable_udp: bool = True
     log_csv: bool = False
+    log_format: str = 'csv'
+    log_flush_rows: int = 64
+    log_flush_seconds: float = 1.0
+    log_fsync: bool = False
+    record_raw: bool = False
+    replay: Tuple[str, ...] = ()
+    replay_speed: float = 1.0
+    enable_console: bool = True
     simulate: bool = False
+    sim_seed: Optional[int] = None
+    sim_trajectory: str = '0.5'
+    sim_low: str = 'focused'
+    sim_high: str = 'relaxed'
+    sim_seconds: float = 0.0
+    sim_unthrottled: bool = False
+    pace_spin_ms: float = 0.0
+    streaming_welch: bool = False
+    pull_chunk: bool = True
+    chunk_max_samples: int = 64
+    chunk_timeout: float = 5.0
+    coalesce_hops: bool = False
+    threaded: bool = False
+    queue_size: int = 64
+    use_asyncio: bool = False
+    multi_headset: bool = False
+    headsets: int = 4
+    shm_name: Optional[str] = None
+    shm_history: int = 1024
+    ws_port: int = 0
+    ws_host: str = '127.0.0.1'
+    ws_rate_hz: float = 10.0
+    ws_raw_decimation: int = 0
 
 
-def _open_csv_if_needed(log_csv: bool) -> Tuple[Optional[object], Optional[object], Optional[str]]:
-    if not log_csv:
-        return None, None, None
+def _open_session_log(cfg: BridgeConfig, suffix: str = '') -> Optional[BackgroundRowWriter]:
+    """Session log writer for `log_csv`, fed with `_session_row` values and encoded off the hot path."""
+    if not cfg.log_csv:
+        return None
     os.makedirs('logs', exist_ok=True)
     stamp = time.strftime('%Y%m%d_%H%M%S')
-    csv_path = os.path.join('logs', f'session_{stamp}.csv')
-    f = open(csv_path, 'w', newline='')
-    try:
-        import csv
-        w = csv.writer(f)
-        w.writerow(['elapsed_seconds', 'timestamp_utc', 'alpha_rel', 'beta_rel', 'ri', 'ri_ema', 'ri_scaled'])
-        print(f"Logging to {csv_path}")
-        return f, w, csv_path
-    except Exception:
-        f.close()
-        raise
-
-
-def _init_osc_client(ip: str, port: int):
-    if not OscUDPClient:
-        return None
-    try:
-        return OscUDPClient(ip, port)
-    except Exception as e:
-        print(f"Warning: could not create OSC client {ip}:{port} ({e})")
-        return None
-
-
-def _send_osc(client, address: str, *args: float) -> None:
-    if client is None:
-        return
-    try:
-        client.send_message(address, list(float(a) for a in args))
-    except Exception:
-        pass
+    policy = dict(flush_rows=cfg.log_flush_rows, flush_seconds=cfg.log_flush_seconds, fsync=cfg.log_fsync)
+    if cfg.log_format == 'binary':
+        log_path = os.path.join('logs', f'session_{stamp}{suffix}{SESSION_LOG_SUFFIX}')
+        writer = BinarySessionWriter(log_path, meta={'source': 'rocketwave-live',
+                                                     'hop_seconds': cfg.hop_seconds,
+                                                     'window_seconds': cfg.window_seconds}, **policy)
+    else:
+        log_path = os.path.join('logs', f'session_{stamp}{suffix}.csv')
+        writer = BackgroundCSVWriter(log_path, SESSION_CSV_HEADER, format_row=_format_csv_row, **policy)
+    print(f"Logging to {log_path}")
+    return writer
 
 
-def _send_udp_json(sock: socket.socket, addr: Tuple[str, int], payload: dict) -> None:
-    if sock is None:
+def _close_session_log(writer: Optional[BackgroundRowWriter]) -> None:
+    if writer is None:
         return
     try:
-        sock.sendto(json.dumps(payload).encode('utf-8'), addr)
-    except Exception:
-        pass
+        writer.close()
+    except OSError as e:
+        print(f"Session log {writer.path}: write failed: {e}")
 
 
-def _simulate_window(fs: float, n: int, t0: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, float]:
-    t = np.arange(n) / fs + t0
-    tp9 = 50e-6 * np.sin(2 * np.pi * 10.0 * t) + 10e-6 * np.random.randn(n)
-    tp10 = 50e-6 * np.sin(2 * np.pi * 10.0 * (t + 0.01)) + 10e-6 * np.random.randn(n)
-    af7 = 10e-6 * np.sin(2 * np.pi * 20.0 * t) + 10e-6 * np.random.randn(n)
-    af8 = 10e-6 * np.sin(2 * np.pi * 20.0 * (t + 0.02)) + 10e-6 * np.random.randn(n)
-    return tp9, af7, af8, tp10, t[-1] + (1.0 / fs)
+def _open_raw_recorder(cfg: BridgeConfig, fs: float, suffix: str = '') -> RawEEGRecorder:
+    os.makedirs('logs', exist_ok=True)
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    base = os.path.join('logs', f'raw_{stamp}{suffix}')
+    print(f"Recording raw EEG to {base}.eeg")
+    return RawEEGRecorder(base, fs, clock='synthetic' if cfg.simulate else 'lsl',
+                          meta={'simulate': cfg.simulate})
 
 
 def _simulate_step(
-    cfg: 'BridgeConfig',
-    fs: float,
+    synth: SyntheticEEG,
     hop_size: int,
-    sim_t0: float,
-    tp9_buf: Deque[float],
-    af7_buf: Deque[float],
-    af8_buf: Deque[float],
-    tp10_buf: Deque[float],
-    osc_client,
-) -> float:
+    eeg_buf: RingBuffer,
+    pacer: Optional[Pacer] = None,
+    recorder: Optional[RawEEGRecorder] = None,
+) -> int:
     """
     Advance one simulate-mode step by generating and buffering synthetic EEG.
 
+    With a `pacer`, waits until the generated samples would have arrived
+    live, on absolute deadlines, so the stream holds exactly `fs` however
+    long the rest of the loop takes; callers with their own timer, and
+    unthrottled load tests, pass None.
 
     Returns
     -------
-    float
-        Updated simulation time origin for the next call.
+    int
+        Number of samples buffered (fewer than `hop_size` only at the end of
+        `sim_seconds`).
     """
-    tp9, af7, af8, tp10, sim_t0 = _simulate_window(fs, hop_size, sim_t0)
-    tp9_buf.extend(tp9.tolist())
-    af7_buf.extend(af7.tolist())
-    af8_buf.extend(af8.tolist())
-    tp10_buf.extend(tp10.tolist())
-    if cfg.enable_osc and cfg.send_raw_eeg and tp9.size > 0:
-        _send_osc(osc_client, '/muse/eeg', tp9[-1], af7[-1], af8[-1], tp10[-1])
-    time.sleep(cfg.hop_seconds)
-    return sim_t0
+    chunk = synth.generate(hop_size)[0]
+    n = chunk.shape[1]
+    if n == 0:
+        return 0
+    eeg_buf.extend(chunk)
+    if recorder is not None:
+        recorder.write(chunk)
+    if pacer is not None:
+        pacer.wait_until(synth.position / synth.fs)
+    return n
 
 
 def _step(
-    cfg: 'BridgeConfig',
     inlet: StreamInlet,
-    tp9_buf: Deque[float],
-    af7_buf: Deque[float],
-    af8_buf: Deque[float],
-    tp10_buf: Deque[float],
-    osc_client,
-) -> None:
+    eeg_buf: RingBuffer,
+    recorder: Optional[RawEEGRecorder] = None,
+) -> int:
     """
     Advance one real-input step by pulling an LSL sample and buffering it.
+
+    Returns
+    -------
+    int
+        Number of samples buffered (0 on timeout).
     """
-    sample, ts = inlet.pull_sample(timeout=5.0)
+    sample, ts = inlet.pull_sample(timeout=_PULL_SAMPLE_TIMEOUT)
     if sample is None:
-        return
+        return 0
     ch0 = sample[0] if len(sample) >= 1 else 0.0
     ch1 = sample[1] if len(sample) >= 2 else ch0
     ch2 = sample[2] if len(sample) >= 3 else ch1
     ch3 = sample[3] if len(sample) >= 4 else ch0
 
-    tp9_buf.append(ch0)
-    af7_buf.append(ch1)
-    af8_buf.append(ch2)
-    tp10_buf.append(ch3)
+    eeg_buf.append((ch0, ch1, ch2, ch3))
+    if recorder is not None:
+        recorder.write(np.array([[ch0], [ch1], [ch2], [ch3]]), np.array([ts]))
+    return 1
+
+
+def _step_chunk(
+    reader: ChunkedInlet,
+    eeg_buf: RingBuffer,
+    recorder: Optional[RawEEGRecorder] = None,
+) -> int:
+    """
+    Advance one real-input step by pulling an LSL chunk and buffering it.
+
+    Returns
+    -------
+    int
+        Number of samples buffered (0 on timeout).
+    """
+    chunk, timestamps = reader.pull()
+    n = chunk.shape[1]
+    if n == 0:
+        return 0
+    eeg_buf.extend(chunk)
+    if recorder is not None:
+        recorder.write(chunk, timestamps)
+    return n
+
+
+class EEGSource:
+    """Acquisition front end feeding the bridge: simulated, LSL chunks or LSL samples.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Selects simulation and the LSL pull mode.
+    hop_size : int
+        Samples generated per simulate-mode step.
+    pace : bool
+        If True, simulate mode runs in real time (see `Pacer`).
+    stream_key : Optional[Tuple[str, str]]
+        (prop, value) selecting one LSL stream, ie from `list_eeg_streams`;
+        defaults to the first EEG stream.
+    record_suffix : str
+        Appended to the raw recording name with `record_raw`, ie '_h1'.
+    replay_path : Optional[str]
+        Recording to replay instead of LSL; defaults to the first of
+        `cfg.replay`, if any.
+    sim_stream : int
+        Synthetic stream index in simulate mode, ie the headset ID, so every
+        headset gets its own reproducible signal.
+    """
+
+    def __init__(self, cfg: BridgeConfig, hop_size: int, pace: bool = True,
+                 stream_key: Optional[Tuple[str, str]] = None, record_suffix: str = '',
+                 replay_path: Optional[str] = None, sim_stream: int = 0):
+        self.cfg = cfg
+        self.hop_size = hop_size
+        self.pace = pace
+        self.stream_key = stream_key
+        self.record_suffix = record_suffix
+        self.replay_path = replay_path or (cfg.replay[0] if cfg.replay else None)
+        self.fs = 256.0
+        self.inlet: Optional[StreamInlet] = None
+        self.reader: Optional[ChunkedInlet] = None
+        self.recorder: Optional[RawEEGRecorder] = None
+        self.replay: Optional[RawEEGReplay] = None
+        self.sim_stream = sim_stream
+        self.synth: Optional[SyntheticEEG] = None
+        self.pacer: Optional[Pacer] = None
+
+    def open(self, fs_expected: float = 256.0) -> float:
+        """Connect to the input and return its sampling rate."""
+        cfg = self.cfg
+        self.fs = fs_expected
+        if self.replay_path is not None:
+            recording = load_raw_eeg(self.replay_path)
+            self.replay = RawEEGReplay(recording, cfg.chunk_max_samples, cfg.replay_speed,
+                                       spin_seconds=cfg.pace_spin_ms / 1000.0)
+            self.fs = recording.fs
+            pace = f"{cfg.replay_speed:g}x" if cfg.replay_speed > 0 else "unpaced"
+            print(f"Replaying {self.replay_path}: {len(recording)} samples at {self.fs:g} Hz, {pace}")
+        elif not cfg.simulate:
+            prop, value = self.stream_key or ('type', 'EEG')
+            self.inlet = find_eeg_inlet(timeout_seconds=10.0, prop=prop, value=value)
+            fs = self.inlet.info().nominal_srate() or fs_expected
+            if fs <= 0:
+                fs = fs_expected
+            self.fs = fs
+            print(f"Using sampling rate: {fs} Hz")
+            if cfg.pull_chunk:
+                self.reader = ChunkedInlet(self.inlet, n_channels=4, max_samples=cfg.chunk_max_samples,
+                                           timeout=cfg.chunk_timeout)
+        else:
+            self.synth = SyntheticEEG(self.fs, n_streams=1, seed=cfg.sim_seed, first_stream=self.sim_stream,
+                                      low=cfg.sim_low, high=cfg.sim_high, trajectory=cfg.sim_trajectory,
+                                      duration_seconds=cfg.sim_seconds)
+            if self.pace and not cfg.sim_unthrottled:
+                self.pacer = Pacer(spin_seconds=cfg.pace_spin_ms / 1000.0)
+            pace = "unthrottled" if cfg.sim_unthrottled else "real time"
+            print(f"Running in --simulate mode (no LSL needed): seed {self.synth.seed}, "
+                  f"trajectory {cfg.sim_trajectory}, {pace}")
+        if cfg.record_raw:
+            self.recorder = _open_raw_recorder(cfg, self.fs, self.record_suffix)
+        return self.fs
+
+    @property
+    def read_timeout(self) -> float:
+        """Longest a `read_into` call can block waiting for LSL input, in seconds."""
+        if self.reader is not None:
+            return self.reader.timeout
+        return _PULL_SAMPLE_TIMEOUT if self.inlet is not None else 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        """True once a replayed recording, or a simulation with `sim_seconds`, has been read to the end."""
+        if self.synth is not None:
+            return self.synth.exhausted
+        return self.replay is not None and self.replay.exhausted
+
+    def read_into(self, eeg_buf: RingBuffer) -> int:
+        """Buffer the next batch of samples and return how many arrived.
+
+        Raw EEG is forwarded by `BridgeOutputs.send_raw`, never from here.
+        """
+        if self.replay is not None:
+            chunk, timestamps = self.replay.pull()
+            if chunk.shape[1]:
+                eeg_buf.extend(chunk)
+                if self.recorder is not None:
+                    self.recorder.write(chunk, timestamps)
+            return chunk.shape[1]
+        if self.synth is not None:
+            return _simulate_step(self.synth, self.hop_size, eeg_buf, pacer=self.pacer, recorder=self.recorder)
+        if self.reader is not None:
+            return _step_chunk(self.reader, eeg_buf, self.recorder)
+        return _step(self.inlet, eeg_buf, self.recorder)
+
+    def close(self) -> None:
+        """Finish the raw recording, if any, and report replay throughput."""
+        if self.replay is not None:
+            print("Replay: " + _format_stats(self.replay.stats()))
+        if self.synth is not None and self.cfg.sim_unthrottled:
+            print("Simulation: " + _format_stats(self.synth.stats()))
+        if self.pacer is not None:
+            print("Pacer: " + _format_stats(self.pacer.stats()))
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"Recorded {self.recorder.n_samples} raw samples to {self.recorder.data_path}")
+
+
+class HopScheduler:
+    """Sample-count driven hop scheduler.
+
+    A hop is due every `hop_size` samples of input, regardless of how the
+    samples arrive (one by one, in LSL bursts, or late). When a burst covers
+    several hop boundaries every one of them is returned, oldest first, so the
+    backlog is caught up deterministically; with `coalesce` only the newest is
+    returned and the rest are counted as coalesced.
+
+    Parameters
+    ----------
+    hop_size : int
+        Samples between hops.
+    warmup : int
+        Hops ending before this many samples (a full window) are skipped.
+    max_lag : int
+        Oldest hop, in samples behind the newest sample, that can still be
+        processed; older ones are counted as dropped.
+    coalesce : bool
+        If True, process only the newest due hop of each push.
+    """
+
+    def __init__(self, hop_size: int, warmup: int = 0, max_lag: int = 0, coalesce: bool = False):
+        self.hop_size = max(1, int(hop_size))
+        self.warmup = warmup
+        self.max_lag = max_lag
+        self.coalesce = coalesce
+        self.samples_seen = 0
+        self.fired = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_backlog = 0
+        self._last_fire: Optional[float] = None
+        self._intervals = 0
+        self._interval_sum = 0.0
+        self._interval_sumsq = 0.0
+        self._interval_max = 0.0
+
+    def push(self, n_samples: int) -> List[int]:
+        """Account for `n_samples` new samples.
+
+        Returns
+        -------
+        List[int]
+            Absolute sample index at which each hop to process ends, oldest
+            first. The newest sample has index `samples_seen`.
+        """
+        before = self.samples_seen
+        self.samples_seen += n_samples
+        first = max(before // self.hop_size + 1, -(-self.warmup // self.hop_size))
+        last = self.samples_seen // self.hop_size
+        if last < first:
+            return []
+        due = [k * self.hop_size for k in range(first, last + 1)]
+        self.max_backlog = max(self.max_backlog, len(due))
+        if self.coalesce:
+            self.coalesced += len(due) - 1
+            due = due[-1:]
+        else:
+            oldest = self.samples_seen - self.max_lag
+            late = [end for end in due if end < oldest]
+            if late:
+                self.dropped += len(late)
+                due = due[len(late):]
+        if due:
+            self._record_fire(time.perf_counter())
+            self.fired += len(due)
+        return due
+
+    def _record_fire(self, now: float) -> None:
+        if self._last_fire is not None:
+            dt = now - self._last_fire
+            self._intervals += 1
+            self._interval_sum += dt
+            self._interval_sumsq += dt * dt
+            self._interval_max = max(self._interval_max, dt)
+        self._last_fire = now
+
+    def stats(self) -> dict:
+        """Counters plus wall-clock spacing (ms) between pushes that fired hops."""
+        n = self._intervals
+        mean = self._interval_sum / n if n else 0.0
+        var = max(0.0, self._interval_sumsq / n - mean * mean) if n else 0.0
+        return {
+            'samples_seen': self.samples_seen,
+            'hops_fired': self.fired,
+            'hops_coalesced': self.coalesced,
+            'hops_dropped': self.dropped,
+            'max_backlog': self.max_backlog,
+            'interval_mean_ms': 1e3 * mean,
+            'interval_max_ms': 1e3 * self._interval_max,
+            'interval_jitter_ms': 1e3 * math.sqrt(var),
+        }
+
+
+@dataclass
+class HopFeatures:
+    """Features computed for one hop.
+
+    Attributes
+    ----------
+    t : float
+        Wall-clock time (`time.time()`) the hop was computed.
+    absolute : Tuple[float, ...]
+        Absolute power per band in `BAND_NAMES` order, averaged over channels.
+    relative : Tuple[float, ...]
+        Absolute powers divided by the total band power.
+    ri : float
+        Relaxation index, alpha_rel - beta_rel.
+    ri_ema : float
+        Exponentially smoothed `ri`.
+    ri_scaled : float
+        `ri_ema` mapped to [0, 1] for the game, slew limited.
+    """
+    t: float
+    absolute: Tuple[float, ...]
+    relative: Tuple[float, ...]
+    ri: float
+    ri_ema: float
+    ri_scaled: float
+
+    @property
+    def alpha_rel(self) -> float:
+        return self.relative[2]
+
+    @property
+    def beta_rel(self) -> float:
+        return self.relative[3]
+
+
+class FeatureComputer:
+    """Bandpowers and relaxation index for one analysis window per hop.
+
+    Holds the Welch settings and the smoothing state (EMA, slew limiting) so
+    that successive `compute` calls form one continuous session.
+    """
+
+    def __init__(self, cfg: BridgeConfig, fs: float, window_size: int):
+        self.fs = fs
+        self.window_size = window_size
+        self.seg_len = int(fs * 1.0)
+        self.overlap = int(self.seg_len * 0.5)
+        self.streaming = None
+        if cfg.streaming_welch:
+            streaming = StreamingWelch(fs, 4, window_size, self.seg_len, self.overlap, BANDS)
+            hop_size = _window_and_hop(cfg)[1]
+            if streaming.aligned(hop_size):
+                self.streaming = streaming
+            else:
+                print(f"--streaming-welch needs a hop dividing the {streaming.step}-sample segment step, "
+                      f"not {hop_size}; using batch Welch")
+
+        self.ri_ema = float('nan')
+        self.last_ri_scaled = 0.5
+        tau_seconds = 1.5
+        # EMA smoothing factor tied to hop cadence; bounds avoid over/under reaction.
+        self.ema_alpha = max(0.01, min(0.5, cfg.hop_seconds / tau_seconds))
+        # Apply cosine ease on mid-range to improve sensitivity
+        self.focus_low, self.focus_high = 0.2, 0.6
+        # Cap rate-of-change to reduce spikiness
+        self.max_step = 0.05
+
+    def compute(self, window: np.ndarray, end: int) -> HopFeatures:
+        """Compute features for `window`, shaped (4, window_size), ending at sample `end`."""
+        # Absolute bandpowers for every (channel, band) in one batched Welch pass,
+        # then average across all 4 channels for the global element.
+        if self.streaming is not None:
+            powers = self.streaming.band_powers(window, end)
+        else:
+            powers = compute_band_powers_welch_multi(window, self.fs, BANDS, segment_length=self.seg_len,
+                                                     overlap=self.overlap)
+        *absolute, total_abs = (float(p) for p in powers.mean(axis=0))
+        # Avoid division-by-zero while keeping the relative scale consistent.
+        eps = 1e-9
+        relative = tuple(p / (total_abs + eps) for p in absolute)
+        alpha_rel, beta_rel = relative[2], relative[3]
+
+        # Optional Relaxation Index derivation (kept for UDP Unity channel)
+        # TODO: Remove this, I keep the scripts separate now. 
+        ri = alpha_rel - beta_rel
+        if math.isnan(self.ri_ema):
+            self.ri_ema = ri
+        else:
+            self.ri_ema = exponential_moving_average(self.ri_ema, ri, alpha=self.ema_alpha)
+        base_linear = 0.5 * (self.ri_ema + 1.0)
+        base_linear = 0.0 if base_linear < 0.0 else 1.0 if base_linear > 1.0 else base_linear
+        denom = max(1e-9, (self.focus_high - self.focus_low))
+        if base_linear <= self.focus_low or base_linear >= self.focus_high:
+            desired_scaled = base_linear
+        else:
+            # Apply cosine ease inside the focus window to expand mid-range
+            # resolution where the UI needs more sensitivity.
+            ri_norm = (base_linear - self.focus_low) / denom
+            desired_scaled = 0.5 - 0.5 * math.cos(math.pi * ri_norm)
+        ri_scaled_raw = max(0.0, min(1.0, desired_scaled))
+        # Slew limiting: softly bound the per-update change to avoid flicker.
+        delta_val = ri_scaled_raw - self.last_ri_scaled
+        if delta_val > self.max_step:
+            ri_scaled = self.last_ri_scaled + self.max_step
+        elif delta_val < -self.max_step:
+            ri_scaled = self.last_ri_scaled - self.max_step
+        else:
+            ri_scaled = ri_scaled_raw
+        self.last_ri_scaled = ri_scaled
+
+        return HopFeatures(time.time(), tuple(absolute), relative, ri, self.ri_ema, ri_scaled)
+
+
+def _relaxation_datagram(ri: float, ri_ema: float, ri_scaled: float,
+                         encoder: Optional[RelaxationPacketEncoder] = None,
+                         headset_id: Optional[int] = None) -> bytes:
+    """Encode a Unity channel packet, binary if an encoder is given, else JSON."""
+    if encoder is not None:
+        return encoder.encode(time.time(), ri, ri_ema, ri_scaled)
+    packet = {
+        't': time.time(),
+        'ri': float(ri),
+        'ri_ema': float(ri_ema),
+        'ri_scaled': float(ri_scaled),
+        'ok': True,
+    }
+    if headset_id is not None:
+        packet['headset'] = headset_id
+    return json.dumps(packet).encode('utf-8')
+
+
+def _udp_datagram(feats: HopFeatures, encoder: Optional[RelaxationPacketEncoder] = None,
+                  headset_id: Optional[int] = None) -> bytes:
+    """Encode one hop for the Unity channel."""
+    return _relaxation_datagram(feats.ri, feats.ri_ema, feats.ri_scaled, encoder, headset_id)
+
+
+def _make_game_rate_output(cfg: BridgeConfig, send: Callable[[bytes], None],
+                           encoder: Optional[RelaxationPacketEncoder] = None,
+                           headset_id: Optional[int] = None) -> Optional[GameRateOutput]:
+    """Fixed-rate, interpolated Unity channel if `udp_rate_hz` is set; `send` takes encoded packets."""
+    if not (cfg.enable_udp and cfg.udp_rate_hz > 0):
+        return None
+    interpolator = HopInterpolator(cfg.hop_seconds, cfg.udp_interpolation,
+                                   bounds=((-1.0, 1.0), (-1.0, 1.0), (0.0, 1.0)))
+    return GameRateOutput(cfg.udp_rate_hz, interpolator,
+                          lambda values: send(_relaxation_datagram(*values, encoder, headset_id)))
+
+
+def _session_row(feats: HopFeatures, start_time: float) -> tuple:
+    """Raw values of one session log row; `_format_csv_row` turns them into text on the writer thread."""
+    now = time.time()
+    return (now - start_time, now, feats.alpha_rel, feats.beta_rel, feats.ri, feats.ri_ema, feats.ri_scaled)
+
+
+def _format_csv_row(row: tuple) -> list:
+    elapsed, now, alpha_rel, beta_rel, ri, ri_ema, ri_scaled = row
+    return [
+        elapsed,
+        time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)),
+        f"{alpha_rel:.6f}",
+        f"{beta_rel:.6f}",
+        f"{ri:.6f}",
+        f"{ri_ema:.6f}",
+        f"{ri_scaled:.6f}",
+    ]
+
+
+def _console_line(feats: HopFeatures) -> str:
+    delta_rel, theta_rel, alpha_rel, beta_rel, gamma_rel = feats.relative
+    return (
+        f"REL: d={delta_rel:.3f} t={theta_rel:.3f} a={alpha_rel:.3f} b={beta_rel:.3f} g={gamma_rel:.3f}  "
+        f"ABS: a={feats.absolute[2]:.3e} b={feats.absolute[3]:.3e} (ri={feats.ri:.3f} ri_s={feats.ri_scaled:.3f})"
+    )
+
+
+def _osc_element_addresses(prefix: str = '') -> List[str]:
+    """Mind Monitor-style band element addresses, relative then absolute."""
+    return ([f'{prefix}/muse/elements/{name}_relative' for name in BAND_NAMES]
+            + [f'{prefix}/muse/elements/{name}_absolute' for name in BAND_NAMES])
+
+
+def _osc_elements(feats: HopFeatures):
+    """(address, value) pairs for the Mind Monitor-style band elements."""
+    return zip(_osc_element_addresses(), feats.relative + feats.absolute)
 
-    # Optional raw EEG export helps with quick debugging.
-    if cfg.enable_osc and cfg.send_raw_eeg:
-        _send_osc(osc_client, '/muse/eeg', ch0, ch1, ch2, ch3)
+
+def _osc_element_bundle(prefix: str = '') -> OscBundleTemplate:
+    """Bundle template holding every band element of one hop."""
+    return OscBundleTemplate([(address, 1) for address in _osc_element_addresses(prefix)])
+
+
+def _encode_osc_elements(template: OscBundleTemplate, feats: HopFeatures) -> bytes:
+    return template.encode(feats.relative + feats.absolute, t=feats.t)
+
+
+def _encode_osc(address: str, *args: float) -> Optional[bytes]:
+    if OscMessageBuilder is None:
+        return None
+    builder = OscMessageBuilder(address=address)
+    for a in args:
+        builder.add_arg(float(a), OscMessageBuilder.ARG_TYPE_FLOAT)
+    return builder.build().dgram
+
+
+class RawEEGForwarder:
+    """Batches raw EEG into `/muse/eeg_chunk` OSC messages.
+
+    Samples are collected until `chunk_samples` are pending, however they
+    arrive, and each full block goes out as one message carrying the Unix
+    time of its first sample, the sampling rate and the samples as a blob
+    (see `utils.utils.encode_osc_eeg_chunk`). Every sample is forwarded, at a
+    fraction of the per-sample message rate.
+
+    Parameters
+    ----------
+    chunk_samples : int
+        Samples per message.
+    prefix : str
+        Prepended to the address, ie '/headset1' in multi-headset mode.
+    """
+
+    def __init__(self, chunk_samples: int, prefix: str = ''):
+        self.chunk_samples = max(1, int(chunk_samples))
+        self.address = f'{prefix}/muse/eeg_chunk'
+        self._pending = np.empty((4, self.chunk_samples))
+        self._n = 0
+
+    def push(self, chunk: np.ndarray, fs: float, now: Optional[float] = None) -> List[bytes]:
+        """Add `chunk`, shaped (4, n), whose newest sample arrived at `now`; returns messages to send."""
+        now = time.time() if now is None else now
+        n = chunk.shape[1]
+        t_first = now - (self._n + n - 1) / fs
+        messages = []
+        i = 0
+        while i < n:
+            take = min(self.chunk_samples - self._n, n - i)
+            self._pending[:, self._n:self._n + take] = chunk[:, i:i + take]
+            self._n += take
+            i += take
+            if self._n == self.chunk_samples:
+                messages.append(encode_osc_eeg_chunk(self.address, t_first, fs, self._pending))
+                t_first += self.chunk_samples / fs
+                self._n = 0
+        return messages
+
+
+def _wants_raw(cfg: BridgeConfig) -> bool:
+    """Whether any output consumes raw EEG."""
+    return (cfg.enable_osc and cfg.send_raw_eeg) or bool(cfg.ws_port and cfg.ws_raw_decimation)
+
+
+def _open_ws_server(cfg: BridgeConfig) -> Optional[FeatureWebSocketServer]:
+    if not cfg.ws_port:
+        return None
+    server = FeatureWebSocketServer(BAND_NAMES, host=cfg.ws_host, port=cfg.ws_port, max_rate_hz=cfg.ws_rate_hz,
+                                    raw_decimation=cfg.ws_raw_decimation)
+    return server.start_background()
+
+
+def _make_raw_forwarder(cfg: BridgeConfig, prefix: str = '') -> Optional[RawEEGForwarder]:
+    if cfg.enable_osc and cfg.send_raw_eeg and cfg.raw_eeg_chunks:
+        return RawEEGForwarder(cfg.raw_chunk_samples, prefix)
+    return None
+
+
+class BridgeOutputs:
+    """OSC, UDP, CSV and console outputs for computed features.
+
+    OSC and UDP payloads are encoded once per hop and fanned out to every
+    subscribed destination (see `fanout.py`).
+    """
+
+    def __init__(self, cfg: BridgeConfig):
+        self.cfg = cfg
+        self.channels = OutputChannels(cfg)
+        self.osc = self.channels.osc
+        self.udp = self.channels.udp
+        self.osc_bundle = _osc_element_bundle() if cfg.enable_osc and cfg.osc_bundle else None
+        self.raw_forwarder = _make_raw_forwarder(cfg)
+        self.ws = _open_ws_server(cfg)
+        self.udp_encoder = RelaxationPacketEncoder() if cfg.udp_format == 'binary' else None
+        self.udp_rate = _make_game_rate_output(cfg, self.udp.send, self.udp_encoder) if self.udp is not None else None
+        if self.udp_rate is not None:
+            self.udp_rate.start()
+        self.session_log = _open_session_log(cfg)
+        self.start_time = time.time()
+
+    def emit(self, feats: HopFeatures) -> None:
+        """Send one hop of features to every enabled output."""
+        # OSC outputs using Mind Monitor-style addresses, relative then absolute bands
+        if self.osc is not None:
+            if self.osc_bundle is not None:
+                self.osc.send(_encode_osc_elements(self.osc_bundle, feats))
+            else:
+                for address, value in _osc_elements(feats):
+                    self.osc.send(_encode_osc(address, value))
+
+        # UDP (JSON or binary) for Unity TODO: REMOVE! 
+        if self.udp_rate is not None:
+            self.udp_rate.push((feats.ri, feats.ri_ema, feats.ri_scaled))
+        elif self.udp is not None:
+            self.udp.send(_udp_datagram(feats, self.udp_encoder))
+
+        if self.ws is not None:
+            self.ws.publish(feats)
+
+        if self.session_log is not None:
+            self.session_log.write(_session_row(feats, self.start_time))
+
+        if self.cfg.enable_console:
+            print(_console_line(feats))
+
+    def send_raw(self, chunk: np.ndarray, fs: float) -> None:
+        """Forward raw EEG, shaped (4, n), in chunks or as one /muse/eeg message per sample."""
+        if self.ws is not None:
+            self.ws.publish_raw(chunk, fs)
+        if self.osc is None or not self.cfg.send_raw_eeg:
+            return
+        if self.raw_forwarder is not None:
+            for message in self.raw_forwarder.push(chunk, fs):
+                self.osc.send(message)
+            return
+        for ch0, ch1, ch2, ch3 in chunk.T:
+            self.osc.send(_encode_osc('/muse/eeg', ch0, ch1, ch2, ch3))
+
+    def close(self) -> None:
+        _close_session_log(self.session_log)
+        if self.udp_rate is not None:
+            self.udp_rate.close()
+            print("Game-rate UDP: " + _format_stats(self.udp_rate.stats()))
+        self.channels.close()
+        if self.ws is not None:
+            self.ws.close()
+
+
+def _window_and_hop(cfg: BridgeConfig, fs_expected: float = 256.0) -> Tuple[int, int]:
+    """Window and hop sizes in samples; windows and hops are sized for the nominal rate."""
+    window_size = int(fs_expected * cfg.window_seconds)
+    # Ensure forward progress if the hop rounds to nothing
+    hop_size = max(1, int(fs_expected * cfg.hop_seconds))
+    return window_size, hop_size
+
+
+def _make_window_buffer(cfg: BridgeConfig, window_size: int, hop_size: int) -> Tuple[RingBuffer, HopScheduler]:
+    """Ring buffer for all 4 Muse channels (rows TP9, AF7, AF8, TP10) and its hop scheduler.
+
+    The slack beyond one window lets every hop inside a burst see its own window.
+    """
+    slack = max(1, cfg.chunk_max_samples)
+    eeg_buf = RingBuffer(4, window_size + slack)
+    scheduler = HopScheduler(hop_size, warmup=window_size, max_lag=slack, coalesce=cfg.coalesce_hops)
+    return eeg_buf, scheduler
+
+
+def _open_shm_publisher(cfg: BridgeConfig, fs: float, window_size: int,
+                        suffix: str = '') -> Optional[SharedMemoryPublisher]:
+    if not cfg.shm_name:
+        return None
+    publisher = SharedMemoryPublisher(cfg.shm_name + suffix, n_bands=len(BAND_NAMES), n_channels=4,
+                                      window_size=window_size, fs=fs, history=cfg.shm_history)
+    print(f"Publishing features to shared memory '{publisher.name}'")
+    return publisher
+
+
+def _format_stats(stats: dict) -> str:
+    return ", ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items())
 
 
 def run_bridge(cfg: BridgeConfig) -> None:
@@ -185,6 +959,8 @@ def run_bridge(cfg: BridgeConfig) -> None:
 
     Orchestrates acquisition (real vs. simulated), computes bandpowers via
     Welch's method, emits OSC and UDP outputs, and optionally logs to CSV.
+    Hops are scheduled by sample count, once every `hop_seconds` worth of
+    input samples.
 
     Parameters
     ----------
@@ -192,190 +968,222 @@ def run_bridge(cfg: BridgeConfig) -> None:
         Configuration controlling I/O, timing, and simulation.
     """
     fs_expected = 256.0
-    window_size = int(fs_expected * cfg.window_seconds)
-    hop_size = int(fs_expected * cfg.hop_seconds)
-    if hop_size <= 0:
-        # Ensure forward progress if input is negative
-        hop_size = 1
-
-    delta_band = (1.0, 4.0)
-    theta_band = (4.0, 8.0)
-    alpha_band = (8.0, 12.0)
-    beta_band = (13.0, 30.0)
-    gamma_band = (30.0, 45.0)
-    total_band = (1.0, 45.0)
+    window_size, hop_size = _window_and_hop(cfg, fs_expected)
+
+    if cfg.multi_headset:
+        from src.live_visualisation.multi_headset import run_multi_bridge
+        run_multi_bridge(cfg, window_size, hop_size)
+        return
+    if cfg.use_asyncio:
+        try:
+            asyncio.run(run_bridge_async(cfg))
+        except KeyboardInterrupt:
+            print("\nStopping...")
+        return
+    if cfg.threaded and cfg.replay and cfg.replay_speed <= 0:
+        # The threaded runtime drops windows when compute falls behind, which unpaced replay always does.
+        print("Unpaced replay runs on the synchronous loop")
+    elif cfg.threaded:
+        from src.live_visualisation.pipeline import run_pipeline
+        run_pipeline(cfg, window_size, hop_size)
+        return
 
     # I/O
-    osc_client = _init_osc_client(cfg.osc_ip, cfg.osc_port) if cfg.enable_osc else None
-    udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) if cfg.enable_udp else None
-    udp_addr = (cfg.udp_ip, cfg.udp_port) if cfg.enable_udp else None
-
-    csv_file, csv_writer, _ = _open_csv_if_needed(cfg.log_csv)
-
-    # Buffers
-    tp9_buf: Deque[float] = deque(maxlen=window_size)
-    af7_buf: Deque[float] = deque(maxlen=window_size)
-    af8_buf: Deque[float] = deque(maxlen=window_size)
-    tp10_buf: Deque[float] = deque(maxlen=window_size)
-
-    # Stats
-    ri_ema = float('nan')
-    last_ri_scaled = 0.5
-    tau_seconds = 1.5
-    # EMA smoothing factor tied to hop cadence; bounds avoid over/under reaction.
-    ema_alpha = max(0.01, min(0.5, cfg.hop_seconds / tau_seconds))
-    # Apply cosine ease on mid-range to improve sensitivity
-    focus_low, focus_high = 0.2, 0.6
-    # Cap rate-of-change to reduce spikiness
-    max_step = 0.05
-
-    start_time = time.time()
-    last_process = time.time()
-
-    inlet = None
-    fs = fs_expected
-    sim_t0 = 0.0
+    outputs = BridgeOutputs(cfg)
 
-    try:
-        if not cfg.simulate:
-            inlet = find_eeg_inlet(timeout_seconds=10.0)
-            fs = inlet.info().nominal_srate() or fs_expected
-            if fs <= 0:
-                fs = fs_expected
-            print(f"Using sampling rate: {fs} Hz")
-        else:
-            print("Running in --simulate mode (no LSL needed)")
+    eeg_buf, scheduler = _make_window_buffer(cfg, window_size, hop_size)
+    source = EEGSource(cfg, hop_size)
+    publisher = None
+    raw = _wants_raw(cfg)
 
-        seg_len = int(fs * 1.0)
-        overlap = int(seg_len * 0.5)
+    try:
+        fs = source.open(fs_expected)
+        computer = FeatureComputer(cfg, fs, window_size)
+        publisher = _open_shm_publisher(cfg, fs, window_size)
 
-        while True:
-            if cfg.simulate:
-                sim_t0 = _simulate_step(cfg, fs, hop_size, sim_t0, tp9_buf, af7_buf, af8_buf, tp10_buf, osc_client)
-            else:
-                _step(cfg, inlet, tp9_buf, af7_buf, af8_buf, tp10_buf, osc_client)
-
-            now = time.time()
-            if (len(tp9_buf) == window_size and len(af7_buf) == window_size and
-                len(af8_buf) == window_size and len(tp10_buf) == window_size and
-                (now - last_process) >= cfg.hop_seconds):
-
-                tp9 = np.array(tp9_buf, dtype=np.float64)
-                af7 = np.array(af7_buf, dtype=np.float64)
-                af8 = np.array(af8_buf, dtype=np.float64)
-                tp10 = np.array(tp10_buf, dtype=np.float64)
-
-                # Absolute bandpowers per channel
-                def band_abs(ch: np.ndarray, band: Tuple[float, float]) -> float:
-                    return compute_bandpower_welch(ch, fs, band[0], band[1], segment_length=seg_len, overlap=overlap)
-
-                # Compute per channel, then average across all 4 for global element
-                def avg_abs(band: Tuple[float, float]) -> float:
-                    return 0.25 * (
-                        band_abs(tp9, band) + band_abs(af7, band) + band_abs(af8, band) + band_abs(tp10, band)
-                    )
-
-                delta_abs = avg_abs(delta_band)
-                theta_abs = avg_abs(theta_band)
-                alpha_abs = avg_abs(alpha_band)
-                beta_abs = avg_abs(beta_band)
-                gamma_abs = avg_abs(gamma_band)
-
-                total_abs = avg_abs(total_band)
-                # Avoid division-by-zero while keeping the relative scale consistent.
-                eps = 1e-9
-                delta_rel = delta_abs / (total_abs + eps)
-                theta_rel = theta_abs / (total_abs + eps)
-                alpha_rel = alpha_abs / (total_abs + eps)
-                beta_rel = beta_abs / (total_abs + eps)
-                gamma_rel = gamma_abs / (total_abs + eps)
-
-                # Optional Relaxation Index derivation (kept for UDP Unity channel)
-                # TODO: Remove this, I keep the scripts separate now. 
-                ri = alpha_rel - beta_rel
-                if math.isnan(ri_ema):
-                    ri_ema = ri
-                else:
-                    ri_ema = exponential_moving_average(ri_ema, ri, alpha=ema_alpha)
-                base_linear = 0.5 * (ri_ema + 1.0)
-                base_linear = 0.0 if base_linear < 0.0 else 1.0 if base_linear > 1.0 else base_linear
-                denom = max(1e-9, (focus_high - focus_low))
-                if base_linear <= focus_low or base_linear >= focus_high:
-                    desired_scaled = base_linear
-                else:
-                    # Apply cosine ease inside the focus window to expand mid-range
-                    # resolution where the UI needs more sensitivity.
-                    ri_norm = (base_linear - focus_low) / denom
-                    desired_scaled = 0.5 - 0.5 * math.cos(math.pi * ri_norm)
-                ri_scaled_raw = max(0.0, min(1.0, desired_scaled))
-                # Slew limiting: softly bound the per-update change to avoid flicker.
-                delta_val = ri_scaled_raw - last_ri_scaled
-                if delta_val > max_step:
-                    ri_scaled = last_ri_scaled + max_step
-                elif delta_val < -max_step:
-                    ri_scaled = last_ri_scaled - max_step
-                else:
-                    ri_scaled = ri_scaled_raw
-                last_ri_scaled = ri_scaled
-
-                # OSC outputs using Mind Monitor-style addresses
-                if cfg.enable_osc:
-                    # Relative bands
-                    _send_osc(osc_client, '/muse/elements/delta_relative', delta_rel)
-                    _send_osc(osc_client, '/muse/elements/theta_relative', theta_rel)
-                    _send_osc(osc_client, '/muse/elements/alpha_relative', alpha_rel)
-                    _send_osc(osc_client, '/muse/elements/beta_relative', beta_rel)
-                    _send_osc(osc_client, '/muse/elements/gamma_relative', gamma_rel)
-                    # Absolute bands
-                    _send_osc(osc_client, '/muse/elements/delta_absolute', delta_abs)
-                    _send_osc(osc_client, '/muse/elements/theta_absolute', theta_abs)
-                    _send_osc(osc_client, '/muse/elements/alpha_absolute', alpha_abs)
-                    _send_osc(osc_client, '/muse/elements/beta_absolute', beta_abs)
-                    _send_osc(osc_client, '/muse/elements/gamma_absolute', gamma_abs)
-
-                # UDP JSON for Unity TODO: REMOVE! 
-                if cfg.enable_udp and udp_sock and udp_addr:
-                    packet = {
-                        't': time.time(),
-                        'ri': float(ri),
-                        'ri_ema': float(ri_ema),
-                        'ri_scaled': float(ri_scaled),
-                        'ok': True,
-                    }
-                    _send_udp_json(udp_sock, udp_addr, packet)
-
-                if csv_writer is not None:
-                    elapsed_time = time.time() - start_time
-                    csv_writer.writerow([
-                        elapsed_time,
-                        time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-                        f"{alpha_rel:.6f}",
-                        f"{beta_rel:.6f}",
-                        f"{ri:.6f}",
-                        f"{ri_ema:.6f}",
-                        f"{ri_scaled:.6f}",
-                    ])
-                    csv_file.flush()
-
-                print(
-                    f"REL: d={delta_rel:.3f} t={theta_rel:.3f} a={alpha_rel:.3f} b={beta_rel:.3f} g={gamma_rel:.3f}  "
-                    f"ABS: a={alpha_abs:.3e} b={beta_abs:.3e} (ri={ri:.3f} ri_s={ri_scaled:.3f})"
-                )
-                last_process = now
+        while not source.exhausted:
+            n_new = source.read_into(eeg_buf)
+            if n_new and raw:
+                outputs.send_raw(eeg_buf.view(n_new), fs)
+            for end in scheduler.push(n_new):
+                lag = scheduler.samples_seen - end
+                # Zero-copy (4, window_size) view of the window ending at this hop
+                window = eeg_buf.view(window_size + lag)[:, :window_size]
+                feats = computer.compute(window, end)
+                if publisher is not None:
+                    publisher.publish(feats, window, end)
+                outputs.emit(feats)
 
     except KeyboardInterrupt:
         print("\nStopping...")
     finally:
-        try:
-            if csv_file is not None:
-                csv_file.close()
-        except Exception:
-            pass
-        try:
-            if udp_sock is not None:
-                udp_sock.close()
-        except Exception:
-            pass
+        print("Hop scheduler: " + _format_stats(scheduler.stats()))
+        source.close()
+        outputs.close()
+        if publisher is not None:
+            publisher.close()
+
+
+class AsyncBridgeOutputs:
+    """Coroutine outputs for `run_bridge_async`.
+
+    OSC and UDP go out through the non-blocking fan-out sockets (a UDP
+    `sendto` never waits on the receiver); CSV rows are queued for the
+    session log writer thread so disk stalls never reach the event loop.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Enables and addresses the outputs.
+    sinks : Sequence[Callable[[HopFeatures], Awaitable[None]]]
+        Extra coroutine sinks fanned out alongside the built-in outputs.
+    """
+
+    def __init__(self, cfg: BridgeConfig, sinks: Sequence[Callable[[HopFeatures], Awaitable[None]]] = ()):
+        self.cfg = cfg
+        self.sinks = list(sinks)
+        self.channels: Optional[OutputChannels] = None
+        self.osc = None
+        self.udp = None
+        self.udp_encoder = RelaxationPacketEncoder() if cfg.udp_format == 'binary' else None
+        self.udp_rate: Optional[GameRateOutput] = None
+        self._udp_rate_task: Optional[asyncio.Future] = None
+        self.osc_bundle = _osc_element_bundle() if cfg.osc_bundle else None
+        self.raw_forwarder = _make_raw_forwarder(cfg)
+        self.ws: Optional[FeatureWebSocketServer] = None
+        self.session_log: Optional[BackgroundRowWriter] = None
+        self.start_time = time.time()
+
+    async def open(self) -> None:
+        cfg = self.cfg
+        self.channels = OutputChannels(cfg)
+        self.osc = self.channels.osc
+        self.udp = self.channels.udp
+        if self.udp is not None:
+            self.udp_rate = _make_game_rate_output(cfg, self.udp.send, self.udp_encoder)
+        if self.udp_rate is not None:
+            self._udp_rate_task = asyncio.ensure_future(self.udp_rate.run_async())
+        if cfg.ws_port:
+            self.ws = FeatureWebSocketServer(BAND_NAMES, host=cfg.ws_host, port=cfg.ws_port,
+                                             max_rate_hz=cfg.ws_rate_hz, raw_decimation=cfg.ws_raw_decimation)
+            await self.ws.start()
+        self.session_log = _open_session_log(cfg)
+
+    async def emit(self, feats: HopFeatures) -> None:
+        """Send one hop of features to every enabled output and extra sink."""
+        if self.osc is not None:
+            if self.osc_bundle is not None:
+                self.osc.send(_encode_osc_elements(self.osc_bundle, feats))
+            else:
+                for address, value in _osc_elements(feats):
+                    self.osc.send(_encode_osc(address, value))
+        if self.udp_rate is not None:
+            self.udp_rate.push((feats.ri, feats.ri_ema, feats.ri_scaled))
+        elif self.udp is not None:
+            self.udp.send(_udp_datagram(feats, self.udp_encoder))
+        if self.ws is not None:
+            self.ws.publish(feats)
+        if self.session_log is not None:
+            self.session_log.write(_session_row(feats, self.start_time))
+        if self.cfg.enable_console:
+            print(_console_line(feats))
+        if self.sinks:
+            await asyncio.gather(*(sink(feats) for sink in self.sinks), return_exceptions=True)
+
+    async def send_raw(self, chunk: np.ndarray, fs: float) -> None:
+        """Forward raw EEG, shaped (4, n), in chunks or as one /muse/eeg message per sample."""
+        if self.ws is not None:
+            self.ws.publish_raw(chunk, fs)
+        if self.osc is None or not self.cfg.send_raw_eeg:
+            return
+        if self.raw_forwarder is not None:
+            for message in self.raw_forwarder.push(chunk, fs):
+                self.osc.send(message)
+            return
+        for ch0, ch1, ch2, ch3 in chunk.T:
+            self.osc.send(_encode_osc('/muse/eeg', ch0, ch1, ch2, ch3))
+
+    async def aclose(self) -> None:
+        """Close the outputs, stopping the loop-hosted WebSocket server and game-rate sender first."""
+        if self.ws is not None:
+            await self.ws.close_async()
+        if self.udp_rate is not None:
+            self.udp_rate.close()
+            await asyncio.gather(self._udp_rate_task, return_exceptions=True)
+            print("Game-rate UDP: " + _format_stats(self.udp_rate.stats()))
+        self.close()
+
+    def close(self) -> None:
+        if self.channels is not None:
+            self.channels.close()
+        _close_session_log(self.session_log)
+
+
+async def run_bridge_async(
+    cfg: BridgeConfig,
+    sinks: Sequence[Callable[[HopFeatures], Awaitable[None]]] = (),
+) -> None:
+    """Run the live EEG bridge on an asyncio event loop.
+
+    Blocking LSL pulls run in the default executor and outputs are
+    coroutines, so the same loop can host other services (a control API,
+    extra fan-out sinks) next to the bridge. In simulate mode samples are
+    released on absolute `Pacer` deadlines instead of sleeping after each step.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Configuration controlling I/O, timing, and simulation.
+    sinks : Sequence[Callable[[HopFeatures], Awaitable[None]]]
+        Extra coroutine sinks called with every hop's features.
+    """
+    fs_expected = 256.0
+    window_size, hop_size = _window_and_hop(cfg, fs_expected)
+    loop = asyncio.get_running_loop()
+
+    outputs = AsyncBridgeOutputs(cfg, sinks)
+    await outputs.open()
+    eeg_buf, scheduler = _make_window_buffer(cfg, window_size, hop_size)
+    source = EEGSource(cfg, hop_size, pace=False)
+    publisher = None
+    raw = _wants_raw(cfg)
+    # Simulated samples are released on the pacer's deadlines, awaited on the loop.
+    pacer = (Pacer(spin_seconds=cfg.pace_spin_ms / 1000.0)
+             if cfg.simulate and not cfg.replay and not cfg.sim_unthrottled else None)
+
+    try:
+        fs = await loop.run_in_executor(None, source.open, fs_expected)
+        computer = FeatureComputer(cfg, fs, window_size)
+        publisher = _open_shm_publisher(cfg, fs, window_size)
+
+        while not source.exhausted:
+            if cfg.simulate and source.replay is None:
+                n_new = source.read_into(eeg_buf)
+            else:
+                n_new = await loop.run_in_executor(None, source.read_into, eeg_buf)
+            if n_new and raw:
+                await outputs.send_raw(eeg_buf.view(n_new), fs)
+            for end in scheduler.push(n_new):
+                lag = scheduler.samples_seen - end
+                window = eeg_buf.view(window_size + lag)[:, :window_size]
+                feats = computer.compute(window, end)
+                if publisher is not None:
+                    publisher.publish(feats, window, end)
+                await outputs.emit(feats)
+            if cfg.simulate and source.replay is None:
+                # Deadlines are absolute, so compute and send time do not add up.
+                # The final spin_seconds are busy-waited on the loop, as in the threaded runtime.
+                await asyncio.sleep(pacer.remaining(scheduler.samples_seen / fs) if pacer is not None else 0.0)
+                if pacer is not None:
+                    pacer.release()
+    finally:
+        print("Hop scheduler: " + _format_stats(scheduler.stats()))
+        if pacer is not None:
+            print("Pacer: " + _format_stats(pacer.stats()))
+        source.close()
+        await outputs.aclose()
+        if publisher is not None:
+            publisher.close()
 
 
 def main():
@@ -388,27 +1196,147 @@ def main():
     parser.add_argument('--osc-port', type=int, default=7000)
     parser.add_argument('--udp-ip', default='127.0.0.1')
     parser.add_argument('--udp-port', type=int, default=5005)
+    parser.add_argument('--osc-dest', action='append', default=[], metavar='HOST:PORT',
+                        help='Additional OSC destination (repeatable; multicast groups allowed)')
+    parser.add_argument('--udp-dest', action='append', default=[], metavar='HOST:PORT',
+                        help='Additional Unity UDP destination (repeatable; multicast groups allowed)')
+    parser.add_argument('--multicast-ttl', type=int, default=1)
+    parser.add_argument('--control-ip', default='127.0.0.1')
+    parser.add_argument('--control-port', type=int, default=0,
+                        help='Listen here for subscribe/unsubscribe/list/stats commands (0 disables)')
+    parser.add_argument('--udp-format', choices=['json', 'binary'], default='json',
+                        help='Unity UDP packet format (binary is the fixed 32-byte layout)')
+    parser.add_argument('--udp-rate', type=float, default=0.0,
+                        help='Send the Unity packet at this rate (Hz), interpolated between hops (0: once per hop)')
+    parser.add_argument('--udp-interpolation', choices=['interpolate', 'extrapolate', 'hold'], default='interpolate')
     parser.add_argument('--window-seconds', type=float, default=2.0)
     parser.add_argument('--hop-seconds', type=float, default=0.1)
-    parser.add_argument('--send-raw-eeg', action='store_true', help='Send last raw EEG sample via OSC /muse/eeg')
+    parser.add_argument('--send-raw-eeg', action='store_true', help='Forward raw EEG via OSC /muse/eeg')
+    parser.add_argument('--raw-eeg-chunks', action='store_true',
+                        help='Forward raw EEG in /muse/eeg_chunk messages instead of one /muse/eeg message per sample')
+    parser.add_argument('--raw-chunk-samples', type=int, default=16)
     parser.add_argument('--no-osc', action='store_true')
+    parser.add_argument('--osc-messages', action='store_true',
+                        help='Send one OSC message per band element instead of one bundle per hop')
     parser.add_argument('--no-udp', action='store_true')
     parser.add_argument('--log-csv', action='store_true')
+    parser.add_argument('--log-format', choices=['csv', 'binary'], default='csv',
+                        help='Session log format for --log-csv (binary writes a .rwlog file)')
+    parser.add_argument('--log-flush-rows', type=int, default=64, help='Rows queued before the session log flushes early')
+    parser.add_argument('--log-flush-seconds', type=float, default=1.0,
+                        help='Longest time a log row waits before it is written (0: flush by row count only)')
+    parser.add_argument('--log-fsync', action='store_true', help='fsync the session log after each flush')
+    parser.add_argument('--record-raw', action='store_true',
+                        help='Record raw EEG with LSL timestamps to logs/raw_<stamp>.eeg (+ .json header)')
+    parser.add_argument('--replay', action='append', default=[], metavar='PATH',
+                        help='Replay recorded raw EEG (.eeg, .npz or .csv) instead of LSL; repeat with --multi-headset')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Replay rate relative to real time (0: as fast as possible)')
+    parser.add_argument('--no-console', action='store_true', help='Do not print features every hop')
     parser.add_argument('--simulate', action='store_true')
+    parser.add_argument('--sim-seed', type=int, default=None, help='Seed for reproducible synthetic EEG')
+    parser.add_argument('--sim-trajectory', default='0.5',
+                        help='Synthetic relaxation level: LEVEL, T:LEVEL,... keyframes or sine:PERIOD[:LOW:HIGH]')
+    parser.add_argument('--sim-low', choices=sorted(BAND_PROFILES), default='focused',
+                        help='Synthetic band profile at relaxation level 0')
+    parser.add_argument('--sim-high', choices=sorted(BAND_PROFILES), default='relaxed',
+                        help='Synthetic band profile at relaxation level 1')
+    parser.add_argument('--sim-seconds', type=float, default=0.0,
+                        help='Stop after this many seconds of synthetic EEG (0 runs until stopped)')
+    parser.add_argument('--sim-unthrottled', action='store_true',
+                        help='Generate synthetic EEG as fast as it is consumed, to load-test the pipeline')
+    parser.add_argument('--pace-spin-ms', type=float, default=0.0,
+                        help='Busy-wait this long before each simulate/replay deadline for sub-ms timing')
+    parser.add_argument('--pull-sample', action='store_true',
+                        help='Pull LSL samples one at a time instead of in chunks')
+    parser.add_argument('--chunk-max-samples', type=int, default=64)
+    parser.add_argument('--chunk-timeout', type=float, default=5.0)
+    parser.add_argument('--coalesce-hops', action='store_true',
+                        help='Process only the newest hop when input arrives in a burst')
+    parser.add_argument('--threaded', action='store_true',
+                        help='Run acquisition, compute and outputs on separate threads')
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--asyncio', action='store_true', help='Run the bridge on an asyncio event loop')
+    parser.add_argument('--multi-headset', action='store_true',
+                        help='Run one worker process per EEG stream, outputs tagged by headset ID')
+    parser.add_argument('--headsets', type=int, default=4,
+                        help='Max streams in --multi-headset mode (simulated headsets with --simulate)')
+    parser.add_argument('--ws-port', type=int, default=0,
+                        help='Serve features to browsers over a WebSocket on this port (0 disables)')
+    parser.add_argument('--ws-host', default='127.0.0.1')
+    parser.add_argument('--ws-rate', type=float, default=10.0, help='Max WebSocket sends per client per second')
+    parser.add_argument('--ws-raw-decimation', type=int, default=0,
+                        help='Also stream raw EEG averaged over this many samples (0 disables)')
+    parser.add_argument('--shm-name', default=None,
+                        help='Also publish features and raw windows to this shared-memory segment')
+    parser.add_argument('--shm-history', type=int, default=1024)
+    parser.add_argument('--streaming-welch', action='store_true',
+                        help='Reuse segment FFTs across hops instead of recomputing the whole window (needs a hop '
+                             'dividing 0.5 s, ie --hop-seconds 0.125 or 0.25)')
     args = parser.parse_args()
+    if len(args.replay) > 1 and not args.multi_headset:
+        parser.error('replaying several files needs --multi-headset')
+    try:
+        parse_trajectory(args.sim_trajectory)
+        for dest in args.osc_dest + args.udp_dest:
+            parse_destination(dest)
+    except ValueError as e:
+        parser.error(str(e))
 
     cfg = BridgeConfig(
         osc_ip=args.osc_ip,
         osc_port=args.osc_port,
         udp_ip=args.udp_ip,
         udp_port=args.udp_port,
+        udp_format=args.udp_format,
+        udp_rate_hz=args.udp_rate,
+        udp_interpolation=args.udp_interpolation,
+        osc_destinations=tuple(args.osc_dest),
+        udp_destinations=tuple(args.udp_dest),
+        multicast_ttl=args.multicast_ttl,
+        control_ip=args.control_ip,
+        control_port=args.control_port,
         window_seconds=args.window_seconds,
         hop_seconds=args.hop_seconds,
         send_raw_eeg=args.send_raw_eeg,
+        raw_eeg_chunks=args.raw_eeg_chunks,
+        raw_chunk_samples=args.raw_chunk_samples,
         enable_osc=not args.no_osc,
+        osc_bundle=not args.osc_messages,
         enable_udp=not args.no_udp,
         log_csv=args.log_csv,
+        log_format=args.log_format,
+        log_flush_rows=args.log_flush_rows,
+        log_flush_seconds=args.log_flush_seconds,
+        log_fsync=args.log_fsync,
+        record_raw=args.record_raw,
+        replay=tuple(args.replay),
+        replay_speed=args.replay_speed,
+        enable_console=not args.no_console,
         simulate=args.simulate,
+        sim_seed=args.sim_seed,
+        sim_trajectory=args.sim_trajectory,
+        sim_low=args.sim_low,
+        sim_high=args.sim_high,
+        sim_seconds=args.sim_seconds,
+        sim_unthrottled=args.sim_unthrottled,
+        pace_spin_ms=args.pace_spin_ms,
+        streaming_welch=args.streaming_welch,
+        pull_chunk=not args.pull_sample,
+        chunk_max_samples=args.chunk_max_samples,
+        chunk_timeout=args.chunk_timeout,
+        coalesce_hops=args.coalesce_hops,
+        threaded=args.threaded,
+        queue_size=args.queue_size,
+        use_asyncio=args.asyncio,
+        multi_headset=args.multi_headset,
+        headsets=args.headsets,
+        shm_name=args.shm_name,
+        shm_history=args.shm_history,
+        ws_port=args.ws_port,
+        ws_host=args.ws_host,
+        ws_rate_hz=args.ws_rate,
+        ws_raw_decimation=args.ws_raw_decimation,
     )
 
     run_bridge(cfg)
@@ -0,0 +1,286 @@
+"""Multi-headset bridge.
+
+Resolves every EEG stream and runs the bridge's acquisition and feature
+computation for each one in its own worker process, so several Muse headsets
+scale across cores instead of contending for one GIL. Workers send their
+features to the parent, where a single `OutputMultiplexer` owns the sockets
+and tags every packet with the headset ID:
+
+- OSC addresses are prefixed, ie `/headset1/muse/elements/alpha_relative`,
+  and each headset's hop goes out as its own bundle;
+- UDP packets carry the headset ID (a `headset` field in JSON, the header
+  field in the binary format);
+- CSV logs get one file per headset, `session_<stamp>_h<ID>.csv`.
+
+With a shared-memory name set, each worker publishes its own segment,
+`<name>_h<ID>`, directly.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.live_visualisation.fanout import OutputChannels
+from src.live_visualisation.live_eeg_stream import (
+    BridgeConfig,
+    EEGSource,
+    FeatureComputer,
+    HopFeatures,
+    RawEEGForwarder,
+    _close_session_log,
+    _console_line,
+    _session_row,
+    _encode_osc,
+    _encode_osc_elements,
+    _format_stats,
+    _make_game_rate_output,
+    _make_raw_forwarder,
+    _make_window_buffer,
+    _open_session_log,
+    _open_shm_publisher,
+    _open_ws_server,
+    _osc_element_bundle,
+    _osc_elements,
+    _udp_datagram,
+    _wants_raw,
+)
+from src.live_visualisation.rate_output import GameRateOutput
+from utils.row_writer import BackgroundRowWriter
+from utils.utils import OscBundleTemplate, RelaxationPacketEncoder, list_eeg_streams
+
+
+class OutputMultiplexer:
+    """Shared OSC/UDP/CSV outputs for every headset, tagged by headset ID.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Enables and addresses the outputs.
+    """
+
+    def __init__(self, cfg: BridgeConfig):
+        self.cfg = cfg
+        self.channels = OutputChannels(cfg)
+        self.osc = self.channels.osc
+        self.udp = self.channels.udp
+        self.ws = _open_ws_server(cfg)
+        self.start_time = time.time()
+        self._logs: Dict[int, Optional[BackgroundRowWriter]] = {}
+        self._encoders: Dict[int, RelaxationPacketEncoder] = {}
+        self._bundles: Dict[int, OscBundleTemplate] = {}
+        self._raw_forwarders: Dict[int, Optional[RawEEGForwarder]] = {}
+        self._udp_rates: Dict[int, Optional[GameRateOutput]] = {}
+
+    def _log_for(self, headset_id: int) -> Optional[BackgroundRowWriter]:
+        if headset_id not in self._logs:
+            self._logs[headset_id] = _open_session_log(self.cfg, suffix=f'_h{headset_id}')
+        return self._logs[headset_id]
+
+    def emit(self, headset_id: int, feats: HopFeatures) -> None:
+        """Send one hop of features from `headset_id` to every enabled output."""
+        if self.osc is not None:
+            if self.cfg.osc_bundle:
+                bundle = self._bundles.get(headset_id)
+                if bundle is None:
+                    bundle = self._bundles[headset_id] = _osc_element_bundle(f'/headset{headset_id}')
+                self.osc.send(_encode_osc_elements(bundle, feats))
+            else:
+                for address, value in _osc_elements(feats):
+                    self.osc.send(_encode_osc(f'/headset{headset_id}{address}', value))
+        if self.udp is not None:
+            encoder = None
+            if self.cfg.udp_format == 'binary':
+                encoder = self._encoders.setdefault(headset_id, RelaxationPacketEncoder(headset_id))
+            if headset_id not in self._udp_rates:
+                udp_rate = _make_game_rate_output(self.cfg, self.udp.send, encoder, headset_id)
+                self._udp_rates[headset_id] = udp_rate.start() if udp_rate is not None else None
+            udp_rate = self._udp_rates[headset_id]
+            if udp_rate is not None:
+                udp_rate.push((feats.ri, feats.ri_ema, feats.ri_scaled))
+            else:
+                self.udp.send(_udp_datagram(feats, encoder, headset_id))
+        if self.ws is not None:
+            self.ws.publish(feats, headset=headset_id)
+        session_log = self._log_for(headset_id)
+        if session_log is not None:
+            session_log.write(_session_row(feats, self.start_time))
+        if self.cfg.enable_console:
+            print(f"[h{headset_id}] " + _console_line(feats))
+
+    def send_raw(self, headset_id: int, chunk: np.ndarray, fs: float) -> None:
+        """Forward raw EEG, shaped (4, n), in /headset<ID>/muse/eeg_chunk messages or per sample."""
+        if self.ws is not None:
+            self.ws.publish_raw(chunk, fs, headset=headset_id)
+        if self.osc is None or not self.cfg.send_raw_eeg:
+            return
+        if headset_id not in self._raw_forwarders:
+            self._raw_forwarders[headset_id] = _make_raw_forwarder(self.cfg, f'/headset{headset_id}')
+        forwarder = self._raw_forwarders[headset_id]
+        if forwarder is not None:
+            for message in forwarder.push(chunk, fs):
+                self.osc.send(message)
+            return
+        for ch0, ch1, ch2, ch3 in chunk.T:
+            self.osc.send(_encode_osc(f'/headset{headset_id}/muse/eeg', ch0, ch1, ch2, ch3))
+
+    def close(self) -> None:
+        for session_log in self._logs.values():
+            _close_session_log(session_log)
+        for headset_id, udp_rate in self._udp_rates.items():
+            if udp_rate is not None:
+                udp_rate.close()
+                print(f"Headset {headset_id} game-rate UDP: " + _format_stats(udp_rate.stats()))
+        self.channels.close()
+        if self.ws is not None:
+            self.ws.close()
+
+
+def _headset_worker(
+    cfg: BridgeConfig,
+    headset_id: int,
+    stream_key: Optional[Tuple[str, str]],
+    window_size: int,
+    hop_size: int,
+    out_queue,
+    stop_event,
+) -> None:
+    """Worker process: acquisition and feature computation for one headset.
+
+    Results go to `out_queue` as (headset_id, kind, payload) tuples, with kind
+    'features', 'raw' (a (chunk, fs) pair) or 'stats'. When the queue is full the item is dropped
+    and counted so a slow parent never stalls acquisition.
+    """
+    replay_path = cfg.replay[headset_id] if cfg.replay else None
+    source = EEGSource(cfg, hop_size, stream_key=stream_key, record_suffix=f'_h{headset_id}',
+                       replay_path=replay_path, sim_stream=headset_id)
+    eeg_buf, scheduler = _make_window_buffer(cfg, window_size, hop_size)
+    raw = _wants_raw(cfg)
+    dropped = 0
+    publisher = None
+    try:
+        fs = source.open()
+        computer = FeatureComputer(cfg, fs, window_size)
+        publisher = _open_shm_publisher(cfg, fs, window_size, suffix=f'_h{headset_id}')
+        while not stop_event.is_set() and not source.exhausted:
+            n_new = source.read_into(eeg_buf)
+            items = []
+            if n_new and raw:
+                items.append(('raw', (eeg_buf.view(n_new).copy(), fs)))
+            for end in scheduler.push(n_new):
+                lag = scheduler.samples_seen - end
+                window = eeg_buf.view(window_size + lag)[:, :window_size]
+                feats = computer.compute(window, end)
+                if publisher is not None:
+                    publisher.publish(feats, window, end)
+                items.append(('features', feats))
+            for kind, payload in items:
+                try:
+                    if replay_path is not None:
+                        # Replay must not lose hops; wait for the parent instead.
+                        out_queue.put((headset_id, kind, payload))
+                    else:
+                        out_queue.put_nowait((headset_id, kind, payload))
+                except queue.Full:
+                    dropped += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+        if publisher is not None:
+            publisher.close()
+        stats = scheduler.stats()
+        stats['queue_dropped'] = dropped
+        try:
+            out_queue.put((headset_id, 'stats', stats), timeout=1.0)
+        except Exception:
+            pass
+
+
+def run_multi_bridge(cfg: BridgeConfig, window_size: int, hop_size: int) -> None:
+    """Run one bridge worker process per EEG stream with shared, tagged outputs.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Configuration controlling I/O, timing, and simulation; `headsets`
+        caps the number of streams (or sets the number of simulated ones).
+    window_size : int
+        Analysis window in samples.
+    hop_size : int
+        Samples between hops.
+    """
+    if cfg.replay:
+        stream_keys: List[Optional[Tuple[str, str]]] = [None] * len(cfg.replay)
+        for i, path in enumerate(cfg.replay):
+            print(f"Headset {i}: replay {path}")
+    elif cfg.simulate:
+        stream_keys = [None] * max(1, cfg.headsets)
+        if cfg.sim_seed is None:
+            # One base seed for every worker, so the printed seed reproduces the whole run.
+            cfg = replace(cfg, sim_seed=int(np.random.SeedSequence().generate_state(1)[0]))
+        print(f"Running {len(stream_keys)} simulated headsets, seed {cfg.sim_seed}")
+    else:
+        stream_keys = list_eeg_streams(timeout_seconds=10.0)[:max(1, cfg.headsets)]
+        if not stream_keys:
+            raise RuntimeError("No EEG LSL stream found. Did you run 'muselsl stream'? Is Muse on?")
+        for i, (prop, value) in enumerate(stream_keys):
+            print(f"Headset {i}: {prop}={value}")
+
+    out_queue = mp.Queue(maxsize=max(1, cfg.queue_size) * len(stream_keys))
+    stop_event = mp.Event()
+    workers = [
+        mp.Process(
+            target=_headset_worker,
+            args=(cfg, i, key, window_size, hop_size, out_queue, stop_event),
+            name=f'bridge-headset{i}',
+            daemon=True,
+        )
+        for i, key in enumerate(stream_keys)
+    ]
+    mux = OutputMultiplexer(cfg)
+    stats: Dict[int, dict] = {}
+
+    def dispatch(item) -> None:
+        headset_id, kind, payload = item
+        if kind == 'features':
+            mux.emit(headset_id, payload)
+        elif kind == 'raw':
+            mux.send_raw(headset_id, *payload)
+        else:
+            stats[headset_id] = payload
+
+    try:
+        for w in workers:
+            w.start()
+        while any(w.is_alive() for w in workers):
+            try:
+                dispatch(out_queue.get(timeout=0.5))
+            except queue.Empty:
+                continue
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        stop_event.set()
+        deadline = time.time() + 2.0
+        # Drain so workers can flush their last items and exit.
+        while any(w.is_alive() for w in workers) and time.time() < deadline:
+            try:
+                dispatch(out_queue.get(timeout=0.1))
+            except queue.Empty:
+                pass
+        while True:
+            try:
+                dispatch(out_queue.get_nowait())
+            except (queue.Empty, EOFError, OSError):
+                break
+        for w in workers:
+            w.join(0.5)
+            if w.is_alive():
+                w.terminate()
+        mux.close()
+        for headset_id in sorted(stats):
+            print(f"Headset {headset_id}: " + _format_stats(stats[headset_id]))
@@ -18,6 +18,7 @@ from PyQt6.QtWidgets import (
     QDoubleSpinBox,
     QFileDialog,
 )
+import numpy as np
 import pyqtgraph as pg
 from pythonosc import dispatcher, osc_server
 
@@ -84,6 +85,9 @@ class OSCDataPlotter:
 
     # OSC handler
     def _on_any(self, address: str, *args):
+        if address.endswith('/muse/eeg_chunk'):
+            self._on_eeg_chunk(address[:-len('_chunk')], *args)
+            return
         now = datetime.now()
         if address not in self.addresses:
             self.addresses.append(address)
@@ -95,6 +99,22 @@ class OSCDataPlotter:
             return
         self.buffers[address].append((now, vals))
 
+    def _on_eeg_chunk(self, address: str, *args):
+        # Raw EEG chunk: start time, sampling rate and a blob of (n, 4) big-endian
+        # float32 samples. Unpacked into one entry per sample under /muse/eeg.
+        try:
+            t0, fs, blob = args
+            samples = np.frombuffer(blob, dtype='>f4').reshape(-1, 4)
+            start = datetime.fromtimestamp(float(t0))
+            step = timedelta(seconds=1.0 / float(fs))
+        except Exception:
+            return
+        if address not in self.addresses:
+            self.addresses.append(address)
+        self.buffers[address].extend(
+            (start + k * step, tuple(vals)) for k, vals in enumerate(samples.tolist())
+        )
+
     # UI callbacks
     def _on_stream_change(self, index: int):
         if index < 0:
@@ -112,7 +132,7 @@ class OSCDataPlotter:
         num_values = len(buf[-1][1]) if len(buf) > 0 else 1
         # Choose per-channel labels. For /muse/eeg use TP9, AF7, AF8, TP10.
         labels = [f"value[{k}]" for k in range(num_values)]
-        if self.current_address == '/muse/eeg':
+        if self.current_address.endswith('/muse/eeg'):
             muse_labels = ['TP9', 'AF7', 'AF8', 'TP10']
             labels = [muse_labels[k] if k < len(muse_labels) else f"value[{k}]" for k in range(num_values)]
         for i in range(num_values):
@@ -0,0 +1,291 @@
+"""Threaded bridge runtime.
+
+Splits `run_bridge` into three threads joined by bounded queues so a slow
+CSV flush or a stalled socket never delays sample ingestion:
+
+- acquisition: pulls samples into the ring buffer and, on every scheduled
+  hop, hands a copy of the window to the compute queue;
+- compute: turns windows into `HopFeatures`;
+- sink: sends features (and raw EEG) to OSC, UDP, CSV and the console.
+
+Every queue has exactly one producer and one consumer: raw EEG from
+acquisition and features from compute reach the sink on separate queues.
+When a queue is full its oldest item is dropped and counted, so latency stays
+bounded and the drop counters show where the pipeline is falling behind.
+"""
+
+import queue
+import threading
+from collections import deque
+from typing import Any, Deque, Optional
+
+from src.live_visualisation.live_eeg_stream import (
+    BridgeConfig,
+    BridgeOutputs,
+    EEGSource,
+    FeatureComputer,
+    _format_stats,
+    _make_window_buffer,
+    _open_shm_publisher,
+    _wants_raw,
+)
+from src.live_visualisation.shm_channel import SharedMemoryPublisher
+
+
+class SPSCQueue:
+    """Bounded single-producer/single-consumer queue.
+
+    `deque.append` and `deque.popleft` are atomic, so the data path takes no
+    lock; an Event only wakes the consumer when it is idle. When the queue is
+    full `put` drops the oldest item (or the new one with `drop_oldest=False`)
+    and counts it. The counters are only safe with one producer: give each
+    producer its own queue.
+
+    Parameters
+    ----------
+    capacity : int
+        Maximum number of queued items.
+    drop_oldest : bool
+        Overflow policy, evict the oldest item instead of rejecting the new one.
+    ready : Optional[threading.Event]
+        Event set by every `put`; share one between queues so a consumer of
+        several can sleep on it and drain them with `get_nowait`.
+    """
+
+    def __init__(self, capacity: int, drop_oldest: bool = True, ready: Optional[threading.Event] = None):
+        self.capacity = max(1, int(capacity))
+        self.drop_oldest = drop_oldest
+        self._items: Deque[Any] = deque()
+        self._ready = ready or threading.Event()
+        self.put_count = 0
+        self.get_count = 0
+        self.dropped = 0
+        self.high_watermark = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any) -> bool:
+        """Enqueue `item`; returns False if it was rejected because the queue is full."""
+        if len(self._items) >= self.capacity:
+            self.dropped += 1
+            if not self.drop_oldest:
+                return False
+            try:
+                self._items.popleft()
+            except IndexError:
+                pass
+        self._items.append(item)
+        self.put_count += 1
+        self.high_watermark = max(self.high_watermark, len(self._items))
+        self._ready.set()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Dequeue the oldest item, waiting up to `timeout` seconds.
+
+        Raises
+        ------
+        queue.Empty
+            If nothing arrived in time.
+        """
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            # Clear before re-checking so a concurrent put cannot be missed.
+            self._ready.clear()
+            if not self._items and not self._ready.wait(timeout):
+                raise queue.Empty
+            try:
+                item = self._items.popleft()
+            except IndexError:
+                raise queue.Empty
+        self.get_count += 1
+        return item
+
+    def get_nowait(self) -> Any:
+        """Dequeue the oldest item without waiting or touching the ready event.
+
+        Raises
+        ------
+        queue.Empty
+            If the queue is empty.
+        """
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            raise queue.Empty
+        self.get_count += 1
+        return item
+
+    def stats(self) -> dict:
+        return {
+            'put': self.put_count,
+            'got': self.get_count,
+            'dropped': self.dropped,
+            'high_watermark': self.high_watermark,
+        }
+
+
+class BridgePipeline:
+    """Acquisition, compute and sink threads for one EEG stream.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Bridge configuration; `queue_size` bounds every queue.
+    window_size : int
+        Analysis window in samples.
+    hop_size : int
+        Samples between hops.
+    """
+
+    def __init__(self, cfg: BridgeConfig, window_size: int, hop_size: int):
+        self.cfg = cfg
+        self.window_size = window_size
+        self.source = EEGSource(cfg, hop_size)
+        self.eeg_buf, self.scheduler = _make_window_buffer(cfg, window_size, hop_size)
+        self.compute_queue = SPSCQueue(cfg.queue_size)
+        # The sink consumes from acquisition and compute, one queue each, and sleeps on a shared event.
+        self._sink_ready = threading.Event()
+        self.raw_queue = SPSCQueue(cfg.queue_size, ready=self._sink_ready)
+        self.sink_queue = SPSCQueue(cfg.queue_size, ready=self._sink_ready)
+        self.outputs: Optional[BridgeOutputs] = None
+        self.computer: Optional[FeatureComputer] = None
+        self.publisher: Optional[SharedMemoryPublisher] = None
+        self.stop_event = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._threads = []
+
+    def start(self) -> None:
+        """Open the input and outputs, then start the three worker threads."""
+        fs = self.source.open()
+        self.computer = FeatureComputer(self.cfg, fs, self.window_size)
+        self.publisher = _open_shm_publisher(self.cfg, fs, self.window_size)
+        self.outputs = BridgeOutputs(self.cfg)
+        for name, target in (('acquisition', self._acquire_loop), ('compute', self._compute_loop),
+                             ('sink', self._sink_loop)):
+            t = threading.Thread(target=self._guard, args=(target,), name=f'bridge-{name}', daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Signal the workers to finish, let the sink drain, and close outputs.
+
+        Acquisition may be blocked in a pull for up to the source's
+        `read_timeout`, so it gets that much longer to return before the
+        source and recorder are closed under it.
+        """
+        self.stop_event.set()
+        for t in self._threads:
+            grace = self.source.read_timeout if t.name == 'bridge-acquisition' else 0.0
+            t.join(timeout + grace)
+        self.source.close()
+        if self.outputs is not None:
+            self.outputs.close()
+        if self.publisher is not None:
+            self.publisher.close()
+
+    def wait(self, poll_seconds: float = 0.5) -> None:
+        """Block until a worker fails or the pipeline is stopped."""
+        while not self.stop_event.wait(poll_seconds):
+            pass
+        if self.error is not None:
+            raise self.error
+
+    def stats(self) -> dict:
+        return {
+            'scheduler': self.scheduler.stats(),
+            'compute_queue': self.compute_queue.stats(),
+            'raw_queue': self.raw_queue.stats(),
+            'sink_queue': self.sink_queue.stats(),
+        }
+
+    def _guard(self, target) -> None:
+        try:
+            target()
+        except BaseException as e:
+            if self.error is None:
+                self.error = e
+            self.stop_event.set()
+
+    def _acquire_loop(self) -> None:
+        raw = _wants_raw(self.cfg)
+        while not self.stop_event.is_set():
+            # Raw EEG goes through the sink thread, never out of this one.
+            n_new = self.source.read_into(self.eeg_buf)
+            if n_new == 0:
+                if self.source.exhausted:
+                    # End of a replayed recording; compute and sink drain what is queued.
+                    self.stop_event.set()
+                continue
+            if raw:
+                self.raw_queue.put(self.eeg_buf.view(n_new).copy())
+            for end in self.scheduler.push(n_new):
+                lag = self.scheduler.samples_seen - end
+                window = self.eeg_buf.view(self.window_size + lag)[:, :self.window_size]
+                # Copy: the ring buffer keeps moving while compute works on it.
+                self.compute_queue.put((window.copy(), end))
+
+    def _compute_loop(self) -> None:
+        while not self.stop_event.is_set() or len(self.compute_queue) > 0:
+            try:
+                window, end = self.compute_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            feats = self.computer.compute(window, end)
+            # Shared memory is published straight from compute; it never waits on the sink.
+            if self.publisher is not None:
+                self.publisher.publish(feats, window, end)
+            self.sink_queue.put(feats)
+
+    def _drain_sink_queues(self) -> int:
+        handled = 0
+        for q, send in ((self.raw_queue, lambda chunk: self.outputs.send_raw(chunk, self.source.fs)),
+                        (self.sink_queue, self.outputs.emit)):
+            while True:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                send(item)
+                handled += 1
+        return handled
+
+    def _sink_loop(self) -> None:
+        # Keep draining after stop, until acquisition and compute are done too, so the last rows
+        # still reach the CSV.
+        producers = self._threads[:2]
+        while (not self.stop_event.is_set() or len(self.raw_queue) > 0 or len(self.sink_queue) > 0
+               or any(t.is_alive() for t in producers)):
+            # Clear before draining so a put landing in between still wakes the next wait.
+            self._sink_ready.clear()
+            if not self._drain_sink_queues():
+                self._sink_ready.wait(0.1)
+
+
+def run_pipeline(cfg: BridgeConfig, window_size: int, hop_size: int) -> None:
+    """Run the bridge on separate acquisition, compute and sink threads.
+
+    Parameters
+    ----------
+    cfg : BridgeConfig
+        Configuration controlling I/O, timing, and simulation.
+    window_size : int
+        Analysis window in samples.
+    hop_size : int
+        Samples between hops.
+    """
+    pipeline = BridgePipeline(cfg, window_size, hop_size)
+    try:
+        pipeline.start()
+        pipeline.wait()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        pipeline.stop()
+        stats = pipeline.stats()
+        print("Hop scheduler: " + _format_stats(stats['scheduler']))
+        print("Compute queue: " + _format_stats(stats['compute_queue']))
+        print("Raw queue: " + _format_stats(stats['raw_queue']))
+        print("Sink queue: " + _format_stats(stats['sink_queue']))
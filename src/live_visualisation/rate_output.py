@@ -0,0 +1,154 @@
+"""Game-rate output for the Unity UDP channel.
+
+The relaxation index is computed once per hop, but the game renders at
+60-144 fps. `GameRateOutput` sends the Unity packet at its own fixed rate and
+fills in the values between hops from their arrival timestamps with a
+`HopInterpolator`, so the Welch computation can run at a lower hop rate
+without the rocket moving in steps.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+INTERPOLATION_MODES = ('interpolate', 'extrapolate', 'hold')
+
+
+class HopInterpolator:
+    """Continuous-time estimate of a signal that is only known once per hop.
+
+    Modes:
+
+    - 'interpolate': each new hop value is approached linearly over one hop
+      period, starting from the current output, so the output is continuous
+      and lags by at most one hop;
+    - 'extrapolate': continues the slope through the last two hops for up
+      to `max_horizon` seconds, trading occasional overshoot for no lag;
+    - 'hold': the latest hop value, as without this stage.
+
+    Parameters
+    ----------
+    hop_seconds : float
+        Nominal time between hops.
+    mode : str
+        One of `INTERPOLATION_MODES`.
+    max_horizon : Optional[float]
+        Longest extrapolation in seconds; defaults to one hop.
+    bounds : Sequence[Tuple[float, float]]
+        (low, high) clamp per value, applied to extrapolated output.
+    """
+
+    def __init__(self, hop_seconds: float, mode: str = 'interpolate', max_horizon: Optional[float] = None,
+                 bounds: Sequence[Tuple[float, float]] = ()):
+        if mode not in INTERPOLATION_MODES:
+            raise ValueError(f"mode must be one of {INTERPOLATION_MODES}, got {mode!r}")
+        self.hop_seconds = max(1e-3, float(hop_seconds))
+        self.mode = mode
+        self.max_horizon = self.hop_seconds if max_horizon is None else max_horizon
+        self.bounds = tuple(bounds)
+        self._prev: Optional[Tuple[float, Tuple[float, ...]]] = None
+        self._last: Optional[Tuple[float, Tuple[float, ...]]] = None
+        self._start: Tuple[float, ...] = ()
+
+    def push(self, t: float, values: Sequence[float]) -> None:
+        """Record the hop `values` that became available at time `t`."""
+        values = tuple(float(v) for v in values)
+        # Ramp from wherever the output is now, so a late or early hop never makes it jump.
+        self._start = self.sample(t) or values
+        self._prev, self._last = self._last, (t, values)
+
+    def sample(self, t: float) -> Optional[Tuple[float, ...]]:
+        """Output at time `t`, or None before the first hop."""
+        if self._last is None:
+            return None
+        t1, v1 = self._last
+        if self.mode == 'hold' or (self.mode == 'extrapolate' and self._prev is None):
+            return v1
+        if self.mode == 'interpolate':
+            a = min(1.0, max(0.0, (t - t1) / self.hop_seconds))
+            return tuple(s + a * (v - s) for s, v in zip(self._start, v1))
+        t0, v0 = self._prev
+        dt = max(t1 - t0, 1e-3)
+        h = min(max(0.0, t - t1), self.max_horizon)
+        out = tuple(b + (b - a) * h / dt for a, b in zip(v0, v1))
+        return tuple(min(hi, max(lo, v)) for v, (lo, hi) in zip(out, self.bounds)) + out[len(self.bounds):]
+
+
+class GameRateOutput:
+    """Sends interpolated values at a fixed rate, independent of the hop rate.
+
+    Ticks run on absolute `time.perf_counter` deadlines, so the send rate does
+    not drift with the time each send takes; ticks that fall more than one
+    period behind are skipped and counted rather than sent in a burst.
+
+    Parameters
+    ----------
+    rate_hz : float
+        Sends per second.
+    interpolator : HopInterpolator
+        Fed with `push`; sampled once per tick.
+    send : Callable[[Tuple[float, ...]], None]
+        Called with the sampled values on every tick.
+    """
+
+    def __init__(self, rate_hz: float, interpolator: HopInterpolator, send: Callable[[Tuple[float, ...]], None]):
+        self.period = 1.0 / rate_hz
+        self.interpolator = interpolator
+        self.send = send
+        self.ticks = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def push(self, values: Sequence[float]) -> None:
+        """Hand over a new hop's values; safe from any thread."""
+        with self._lock:
+            self.interpolator.push(time.perf_counter(), values)
+
+    def _tick(self) -> None:
+        with self._lock:
+            values = self.interpolator.sample(time.perf_counter())
+        if values is not None:
+            self.send(values)
+            self.ticks += 1
+
+    def _next_deadline(self, deadline: float, now: float) -> float:
+        deadline += self.period
+        if now - deadline > self.period:
+            missed = int((now - deadline) / self.period)
+            self.skipped += missed
+            deadline += missed * self.period
+        return deadline
+
+    def start(self) -> 'GameRateOutput':
+        """Tick on a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='bridge-game-rate', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            self._tick()
+            deadline = self._next_deadline(deadline, time.perf_counter())
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+
+    async def run_async(self) -> None:
+        """Tick as a coroutine on the running event loop instead of a thread."""
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            self._tick()
+            deadline = self._next_deadline(deadline, time.perf_counter())
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+
+    def stats(self) -> dict:
+        return {'ticks': self.ticks, 'skipped': self.skipped, 'rate_hz': 1.0 / self.period}
@@ -0,0 +1,244 @@
+"""Shared-memory feature channel for consumers on the same host.
+
+The bridge publishes every hop into a `multiprocessing.shared_memory`
+segment; local readers (recorders, visualizers, the game) map the same
+segment and read features and the latest raw window directly, without a
+socket or any serialization.
+
+Layout of the segment, all little-endian:
+
+- header (64 bytes): magic b'RWSM', version, n_bands, history capacity,
+  n_channels, window_size (uint32 each), fs (float64), seq and written
+  (uint64 each);
+- latest slot: one feature record (`feature_dtype`);
+- history ring: `history` feature records, record k at index k % history;
+- raw window: float64 array shaped (n_channels, window_size), the window the
+  latest record was computed from.
+
+`seq` is a seqlock: the publisher makes it odd before touching the slot,
+ring and window and even again afterwards, so a reader that sees the same
+even value before and after copying knows its copy is consistent.
+"""
+
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+SHM_MAGIC = b'RWSM'
+SHM_VERSION = 1
+_HEADER_SIZE = 64
+_HEADER_DTYPE = np.dtype({
+    'names': ['magic', 'version', 'n_bands', 'history', 'n_channels', 'window_size', 'fs', 'seq', 'written'],
+    'formats': ['S4', '<u4', '<u4', '<u4', '<u4', '<u4', '<f8', '<u8', '<u8'],
+    'offsets': [0, 4, 8, 12, 16, 20, 24, 32, 40],
+    'itemsize': _HEADER_SIZE,
+})
+
+
+def feature_dtype(n_bands: int) -> np.dtype:
+    """Structured dtype of one published hop, ie `HopFeatures` plus its window end."""
+    return np.dtype([
+        ('t', '<f8'),
+        ('end', '<i8'),
+        ('ri', '<f8'),
+        ('ri_ema', '<f8'),
+        ('ri_scaled', '<f8'),
+        ('absolute', '<f8', (n_bands,)),
+        ('relative', '<f8', (n_bands,)),
+    ])
+
+
+class _Segment:
+    """Typed views over the header, latest slot, history ring and raw window."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shm.buf)
+
+    def map(self, n_bands: int, history: int, n_channels: int, window_size: int) -> None:
+        self.record_dtype = feature_dtype(n_bands)
+        offset = _HEADER_SIZE
+        self.latest = np.ndarray((), dtype=self.record_dtype, buffer=self.shm.buf, offset=offset)
+        offset += self.record_dtype.itemsize
+        self.history = np.ndarray((history,), dtype=self.record_dtype, buffer=self.shm.buf, offset=offset)
+        offset += self.record_dtype.itemsize * history
+        self.window = np.ndarray((n_channels, window_size), dtype='<f8', buffer=self.shm.buf, offset=offset)
+
+    @staticmethod
+    def size(n_bands: int, history: int, n_channels: int, window_size: int) -> int:
+        return _HEADER_SIZE + feature_dtype(n_bands).itemsize * (1 + history) + 8 * n_channels * window_size
+
+    def release(self) -> None:
+        # numpy views pin the buffer; drop them before closing the mapping.
+        self.header = self.latest = self.history = self.window = None
+        self.shm.close()
+
+
+class SharedMemoryPublisher:
+    """Publishes bridge hops into a named shared-memory segment.
+
+    A stale segment with the same name, ie left by a crashed bridge, is
+    replaced. The segment is unlinked on `close`.
+
+    Parameters
+    ----------
+    name : str
+        Segment name readers attach to.
+    n_bands : int
+        Bands per record (`BAND_NAMES` in the bridge).
+    n_channels : int
+        Rows of the raw window.
+    window_size : int
+        Samples in the raw window.
+    fs : float
+        Sampling rate of the raw window, stored for readers.
+    history : int
+        Records kept in the history ring.
+    """
+
+    def __init__(self, name: str, n_bands: int, n_channels: int, window_size: int, fs: float,
+                 history: int = 1024):
+        self.name = name
+        history = max(1, int(history))
+        size = _Segment.size(n_bands, history, n_channels, window_size)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._seg = _Segment(shm)
+        self._seg.map(n_bands, history, n_channels, window_size)
+        h = self._seg.header
+        h['magic'] = SHM_MAGIC
+        h['version'] = SHM_VERSION
+        h['n_bands'] = n_bands
+        h['history'] = history
+        h['n_channels'] = n_channels
+        h['window_size'] = window_size
+        h['fs'] = fs
+        h['seq'] = 0
+        h['written'] = 0
+        self._record = np.zeros((), dtype=self._seg.record_dtype)
+
+    def publish(self, feats, window: np.ndarray, end: int) -> None:
+        """Publish one hop's `HopFeatures` and the (n_channels, window_size) window they came from."""
+        rec = self._record
+        rec['t'] = feats.t
+        rec['end'] = end
+        rec['ri'] = feats.ri
+        rec['ri_ema'] = feats.ri_ema
+        rec['ri_scaled'] = feats.ri_scaled
+        rec['absolute'] = feats.absolute
+        rec['relative'] = feats.relative
+
+        seg = self._seg
+        h = seg.header
+        seq, written = int(h['seq']), int(h['written'])
+        h['seq'] = seq + 1
+        seg.latest[...] = rec
+        seg.history[written % seg.history.shape[0]] = rec
+        seg.window[...] = window
+        h['written'] = written + 1
+        h['seq'] = seq + 2
+
+    def close(self) -> None:
+        shm = self._seg.shm
+        self._seg.release()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedMemoryReader:
+    """Reads hops published by a `SharedMemoryPublisher` in another process.
+
+    Every read is a consistent copy: it is retried while the publisher is
+    mid-update, which only takes microseconds.
+
+    Parameters
+    ----------
+    name : str
+        Segment name given to the publisher (`--shm-name` on the bridge).
+    max_retries : int
+        Attempts before a read gives up on a publisher stuck mid-update.
+
+    Examples
+    --------
+    >>> reader = SharedMemoryReader('rocketwave')
+    >>> rec = reader.latest()
+    >>> rec['ri_scaled'], rec['relative']
+    """
+
+    def __init__(self, name: str, max_retries: int = 10000):
+        self.name = name
+        self.max_retries = max_retries
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 tracks attached segments too and would unlink the
+            # publisher's segment when this process exits.
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name == 'posix':
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        self._seg = _Segment(shm)
+        h = self._seg.header
+        if h['magic'].item() != SHM_MAGIC or int(h['version']) != SHM_VERSION:
+            self._seg.release()
+            raise ValueError(f"shared-memory segment {name!r} is not a RocketWave feature channel")
+        self.n_bands = int(h['n_bands'])
+        self.history_size = int(h['history'])
+        self.n_channels = int(h['n_channels'])
+        self.window_size = int(h['window_size'])
+        self.fs = float(h['fs'])
+        self._seg.map(self.n_bands, self.history_size, self.n_channels, self.window_size)
+
+    @property
+    def written(self) -> int:
+        """Hops published so far."""
+        return int(self._seg.header['written'])
+
+    def _read(self, copy):
+        header = self._seg.header
+        for _ in range(self.max_retries):
+            seq = int(header['seq'])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            value = copy()
+            if int(header['seq']) == seq:
+                return value
+        raise RuntimeError(f"shared-memory publisher {self.name!r} appears stuck mid-update")
+
+    def latest(self) -> Optional[np.ndarray]:
+        """Most recent record (`feature_dtype`), or None before the first hop."""
+        seg = self._seg
+        rec, written = self._read(lambda: (seg.latest.copy(), int(seg.header['written'])))
+        return rec if written else None
+
+    def snapshot(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Most recent record together with the raw window it was computed from."""
+        seg = self._seg
+        rec, window, written = self._read(lambda: (seg.latest.copy(), seg.window.copy(),
+                                                   int(seg.header['written'])))
+        return (rec, window) if written else (None, None)
+
+    def history(self, n: Optional[int] = None) -> np.ndarray:
+        """Up to `n` most recent records (all retained ones by default), oldest first."""
+        seg = self._seg
+
+        def copy():
+            written = int(seg.header['written'])
+            count = min(written, self.history_size if n is None else min(n, self.history_size))
+            idx = np.arange(written - count, written) % self.history_size
+            return seg.history[idx]
+
+        return self._read(copy)
+
+    def close(self) -> None:
+        self._seg.release()
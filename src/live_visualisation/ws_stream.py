@@ -0,0 +1,363 @@
+"""WebSocket feature stream for browser dashboards.
+
+Serves band powers, the relaxation index and, optionally, decimated raw EEG
+to browsers on the local machine. The server runs its own asyncio event
+loop (on a background thread, or on the caller's loop in the asyncio
+runtime) and implements just enough of RFC 6455 for a server that pushes
+JSON text messages, so it needs nothing beyond the standard library.
+
+Publishing never blocks the bridge: `publish` and `publish_raw` encode each
+message once and hand it to the loop with `call_soon_threadsafe`. Every
+client then has a one-slot mailbox for features, so a slow client skips to
+the newest hop (the stale ones are counted as dropped), plus a short bounded
+backlog of raw chunks. Sends are rate limited per client to `max_rate_hz`.
+
+Messages are JSON objects:
+
+- {"type": "features", "t", "ri", "ri_ema", "ri_scaled",
+  "relative": {band: value}, "absolute": {band: value}[, "headset"]}
+- {"type": "raw", "t0", "fs", "channels": [...], "samples": [[...] per channel][, "headset"]}
+
+Opening http://127.0.0.1:<port>/ in a browser shows a minimal dashboard.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence, Set
+
+import numpy as np
+
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+_OP_TEXT, _OP_CLOSE, _OP_PING, _OP_PONG = 0x1, 0x8, 0x9, 0xA
+_MAX_CLIENT_FRAME = 1 << 16
+RAW_CHANNELS = ('TP9', 'AF7', 'AF8', 'TP10')
+
+_DASHBOARD = """<!doctype html>
+<html><head><meta charset="utf-8"><title>RocketWave</title>
+<style>body{font-family:sans-serif;margin:2em}#bar{height:24px;background:#4a8;width:0}
+#box{width:400px;border:1px solid #888}td{padding:2px 12px}</style></head>
+<body><h2>RocketWave live</h2><div id="box"><div id="bar"></div></div>
+<p id="ri"></p><table id="bands"></table><p id="status">connecting...</p>
+<script>
+const ws = new WebSocket(`ws://${location.host}/`);
+ws.onopen = () => status.textContent = 'connected';
+ws.onclose = () => status.textContent = 'disconnected';
+const fix = (v) => v === null ? '-' : v.toFixed(3);
+ws.onmessage = (ev) => {
+  const m = JSON.parse(ev.data);
+  if (m.type !== 'features') return;
+  bar.style.width = (100 * (m.ri_scaled ?? 0)).toFixed(1) + '%';
+  ri.textContent = `ri=${fix(m.ri)} ema=${fix(m.ri_ema)} scaled=${fix(m.ri_scaled)}`;
+  bands.innerHTML = Object.keys(m.relative).map(b => `<tr><td>${b}</td><td>${fix(m.relative[b])}</td><td>${
+    m.absolute[b] === null ? '-' : m.absolute[b].toExponential(2)}</td></tr>`).join('');
+};
+</script></body></html>
+"""
+
+
+def _finite(value):
+    """`value` with every non-finite float replaced by None, recursing into dicts and lists."""
+    if isinstance(value, float):
+        return value if np.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def _json_text(message: dict) -> bytes:
+    """UTF-8 JSON for `message` with NaN and infinities sent as null, which browsers' JSON.parse accepts."""
+    try:
+        text = json.dumps(message, allow_nan=False)
+    except ValueError:
+        # Rare (ie the EMA before its first value), so the common case skips the walk.
+        text = json.dumps(_finite(message), allow_nan=False)
+    return text.encode('utf-8')
+
+
+def _ws_frame(payload: bytes, opcode: int = _OP_TEXT) -> bytes:
+    """Unmasked, unfragmented server frame."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < (1 << 16):
+        header = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter, raw_backlog: int):
+        self.writer = writer
+        self.features: Optional[bytes] = None
+        self.raw: Deque[bytes] = deque(maxlen=raw_backlog)
+        self.wake = asyncio.Event()
+        self.last_send = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+
+class FeatureWebSocketServer:
+    """Pushes bridge features (and optional decimated raw EEG) to WebSocket clients.
+
+    Parameters
+    ----------
+    band_names : Sequence[str]
+        Names for the entries of `HopFeatures.relative/absolute`.
+    host : str
+        Interface to bind; localhost by default.
+    port : int
+        TCP port for both the WebSocket and the dashboard page.
+    max_rate_hz : float
+        Most sends to one client per second; each send carries the newest
+        hop plus any queued raw messages.
+    raw_decimation : int
+        Raw EEG is block-averaged by this factor before sending; 0 disables
+        raw messages.
+    raw_backlog : int
+        Raw messages queued per client before the oldest are dropped.
+    """
+
+    def __init__(self, band_names: Sequence[str], host: str = '127.0.0.1', port: int = 8765,
+                 max_rate_hz: float = 10.0, raw_decimation: int = 0, raw_backlog: int = 32):
+        self.band_names = tuple(band_names)
+        self.host = host
+        self.port = port
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.raw_decimation = max(0, int(raw_decimation))
+        self.raw_backlog = max(1, int(raw_backlog))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._clients: Set[_Client] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        # Leftover raw samples per headset that did not fill a decimation block yet.
+        self._raw_rest: Dict[Optional[int], np.ndarray] = {}
+        self.clients_served = 0
+        self.sent = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        """Start serving on the running event loop."""
+        self.loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"WebSocket feature stream on ws://{self.host}:{self.port}/")
+
+    def start_background(self) -> 'FeatureWebSocketServer':
+        """Start serving on a private event loop in a daemon thread."""
+        ready = threading.Event()
+        errors = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='bridge-websocket', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    async def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def close_async(self) -> None:
+        """Stop serving when started with `start` on the caller's loop."""
+        await self._shutdown()
+        self._report()
+
+    def close(self) -> None:
+        """Stop a server started with `start_background`."""
+        if self.loop is not None and self._thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(2.0)
+        self._report()
+
+    def _report(self) -> None:
+        sent = self.sent + sum(c.sent for c in self._clients)
+        dropped = self.dropped + sum(c.dropped for c in self._clients)
+        print(f"WebSocket: clients={self.clients_served}, sent={sent}, stale_dropped={dropped}")
+
+    def publish(self, feats, headset: Optional[int] = None) -> None:
+        """Queue one hop's `HopFeatures` for every connected client."""
+        if not self._clients or self.loop is None:
+            return
+        message = {
+            'type': 'features',
+            't': feats.t,
+            'ri': feats.ri,
+            'ri_ema': feats.ri_ema,
+            'ri_scaled': feats.ri_scaled,
+            'relative': dict(zip(self.band_names, feats.relative)),
+            'absolute': dict(zip(self.band_names, feats.absolute)),
+        }
+        if headset is not None:
+            message['headset'] = headset
+        frame = _ws_frame(_json_text(message))
+        self.loop.call_soon_threadsafe(self._offer, frame, False)
+
+    def publish_raw(self, chunk: np.ndarray, fs: float, headset: Optional[int] = None) -> None:
+        """Queue raw EEG, shaped (channels, n), block-averaged by `raw_decimation`."""
+        k = self.raw_decimation
+        if not k or self.loop is None:
+            return
+        rest = self._raw_rest.get(headset)
+        data = chunk if rest is None or rest.shape[1] == 0 else np.concatenate((rest, chunk), axis=1)
+        n_out = data.shape[1] // k
+        self._raw_rest[headset] = data[:, n_out * k:].copy()
+        if n_out == 0 or not self._clients:
+            return
+        # Newest input sample arrived now; block j covers samples [j*k, (j+1)*k).
+        t0 = time.time() - (data.shape[1] - 1) / fs
+        samples = data[:, :n_out * k].reshape(data.shape[0], n_out, k).mean(axis=2)
+        message = {
+            'type': 'raw',
+            't0': t0 + (k - 1) / (2.0 * fs),
+            'fs': fs / k,
+            'channels': list(RAW_CHANNELS[:samples.shape[0]]),
+            'samples': samples.tolist(),
+        }
+        if headset is not None:
+            message['headset'] = headset
+        frame = _ws_frame(_json_text(message))
+        self.loop.call_soon_threadsafe(self._offer, frame, True)
+
+    def _offer(self, frame: bytes, raw: bool) -> None:
+        for client in self._clients:
+            if raw:
+                if len(client.raw) == client.raw.maxlen:
+                    client.dropped += 1
+                client.raw.append(frame)
+            else:
+                if client.features is not None:
+                    client.dropped += 1
+                client.features = frame
+            client.wake.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            await self._serve_client(reader, writer)
+        except asyncio.CancelledError:
+            # Server shutdown; end quietly so asyncio does not report the connection task.
+            pass
+        finally:
+            self._handlers.discard(task)
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode('latin-1').split('\r\n')[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if 'websocket' not in headers.get('upgrade', '').lower() or not key:
+            body = _DASHBOARD.encode('utf-8')
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n'
+                         b'Content-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+            await self._close_writer(writer)
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode('ascii')).digest()).decode('ascii')
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode('ascii'))
+
+        client = _Client(writer, self.raw_backlog)
+        self._clients.add(client)
+        self.clients_served += 1
+        sender = asyncio.ensure_future(self._send_loop(client))
+        try:
+            await self._read_loop(reader, client)
+        finally:
+            self._clients.discard(client)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+            self.sent += client.sent
+            self.dropped += client.dropped
+            await self._close_writer(writer)
+
+    async def _read_loop(self, reader: asyncio.StreamReader, client: _Client) -> None:
+        """Consume client frames: answer pings, stop on close, ignore anything else."""
+        try:
+            while True:
+                b0, b1 = await reader.readexactly(2)
+                opcode, n = b0 & 0x0F, b1 & 0x7F
+                if n == 126:
+                    n, = struct.unpack('!H', await reader.readexactly(2))
+                elif n == 127:
+                    n, = struct.unpack('!Q', await reader.readexactly(8))
+                if n > _MAX_CLIENT_FRAME:
+                    return
+                mask = await reader.readexactly(4) if b1 & 0x80 else b'\0\0\0\0'
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(n)))
+                if opcode == _OP_CLOSE:
+                    client.writer.write(_ws_frame(payload[:2], _OP_CLOSE))
+                    return
+                if opcode == _OP_PING:
+                    client.writer.write(_ws_frame(payload, _OP_PONG))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+
+    async def _send_loop(self, client: _Client) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await client.wake.wait()
+                delay = client.last_send + self.min_interval - loop.time()
+                if delay > 0:
+                    # Frames arriving meanwhile replace the pending one.
+                    await asyncio.sleep(delay)
+                client.wake.clear()
+                frames = list(client.raw)
+                client.raw.clear()
+                if client.features is not None:
+                    frames.append(client.features)
+                    client.features = None
+                if not frames:
+                    continue
+                client.writer.write(b''.join(frames))
+                client.sent += len(frames)
+                client.last_send = loop.time()
+                # A slow client only ever waits here, in its own task.
+                await client.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            return
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter) -> None:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
@@ -0,0 +1,117 @@
+"""Drift-free pacing against absolute monotonic deadlines.
+
+`Pacer` releases work at fixed offsets from its first call, measured on
+`time.perf_counter_ns`, instead of sleeping a fixed period after each step:
+time spent generating, computing and sending is absorbed by the next wait
+rather than added to it, so a simulated or replayed stream keeps its exact
+sample rate over hours. Deadlines are integer nanoseconds derived from the
+total offset, not accumulated periods, so rounding never builds up either.
+
+`time.sleep` typically wakes 50 us to a few ms late depending on the OS;
+with `spin_seconds` the pacer sleeps until that much before the deadline
+and busy-waits the rest, trading one core's idle time for sub-millisecond
+release times.
+"""
+
+import time
+from typing import Optional
+
+_NS = 1_000_000_000
+
+
+class Pacer:
+    """Waits for absolute deadlines relative to the first `wait_until` call.
+
+    A deadline that has already passed when `wait_until` is called is an
+    overrun: the call returns at once and is counted, and later deadlines
+    keep their schedule, so the stream catches up like a device delivering
+    a buffered burst. With `max_lag_seconds`, falling further behind than
+    that re-anchors the schedule to now instead (counted as a reset).
+
+    Parameters
+    ----------
+    spin_seconds : float
+        Busy-wait this long before each deadline instead of sleeping; 0
+        only sleeps.
+    max_lag_seconds : Optional[float]
+        Largest backlog to catch up on; None always catches up.
+    """
+
+    def __init__(self, spin_seconds: float = 0.0, max_lag_seconds: Optional[float] = None):
+        self.spin_ns = max(0, int(spin_seconds * _NS))
+        self.max_lag_ns = None if max_lag_seconds is None else int(max_lag_seconds * _NS)
+        self._start_ns: Optional[int] = None
+        self.waits = 0
+        self.overruns = 0
+        self.resets = 0
+        self._overrun_max_ns = 0
+        self._timed = 0
+        self._late_sum_ns = 0
+        self._late_max_ns = 0
+        self._pending_ns: Optional[int] = None
+
+    def start(self) -> None:
+        """Anchor offset 0 to now; done implicitly by the first wait."""
+        self._start_ns = time.perf_counter_ns()
+
+    def _deadline(self, offset_seconds: float):
+        if self._start_ns is None:
+            self.start()
+        deadline = self._start_ns + int(offset_seconds * _NS)
+        now = time.perf_counter_ns()
+        self.waits += 1
+        if now < deadline:
+            return deadline, now
+        behind = now - deadline
+        self.overruns += 1
+        self._overrun_max_ns = max(self._overrun_max_ns, behind)
+        if self.max_lag_ns is not None and behind > self.max_lag_ns:
+            self._start_ns += behind
+            self.resets += 1
+        return None, now
+
+    def wait_until(self, offset_seconds: float) -> None:
+        """Block until `offset_seconds` after the start, ie the total duration of the stream so far."""
+        deadline, now = self._deadline(offset_seconds)
+        if deadline is None:
+            return
+        sleep_ns = deadline - now - self.spin_ns
+        if sleep_ns > 0:
+            time.sleep(sleep_ns / _NS)
+        self._spin(deadline)
+
+    def _spin(self, deadline: int) -> None:
+        while time.perf_counter_ns() < deadline:
+            # Yield the GIL while spinning, or the bridge's other threads would delay the release.
+            time.sleep(0)
+        late = time.perf_counter_ns() - deadline
+        self._timed += 1
+        self._late_sum_ns += late
+        self._late_max_ns = max(self._late_max_ns, late)
+
+    def remaining(self, offset_seconds: float) -> float:
+        """Seconds to sleep towards `offset_seconds` after the start, for callers that sleep themselves (ie asyncio).
+
+        This stops `spin_seconds` short of the deadline; call `release` after
+        the sleep to busy-wait the rest. Overruns are counted as in `wait_until`.
+        """
+        deadline, now = self._deadline(offset_seconds)
+        self._pending_ns = deadline
+        return 0.0 if deadline is None else max(0, deadline - now - self.spin_ns) / _NS
+
+    def release(self) -> None:
+        """Busy-wait until the deadline of the last `remaining` call and record how late it released."""
+        deadline, self._pending_ns = self._pending_ns, None
+        if deadline is not None:
+            self._spin(deadline)
+
+    def stats(self) -> dict:
+        """Wait counts, overruns and how late on-time waits released, in ms."""
+        return {
+            'waits': self.waits,
+            'overruns': self.overruns,
+            'overrun_max_ms': self._overrun_max_ns / 1e6,
+            'resets': self.resets,
+            'wake_late_mean_ms': self._late_sum_ns / self._timed / 1e6 if self._timed else 0.0,
+            'wake_late_max_ms': self._late_max_ns / 1e6,
+        }
@@ -0,0 +1,198 @@
+"""Raw EEG recordings on growable memory-mapped files.
+
+A recording is two files sharing a base name:
+
+- `<base>.eeg`: little-endian `RAW_DTYPE` records, ie one float64 timestamp
+  and the four Muse channels as float32 per sample (24 bytes), written
+  straight into an `np.memmap` that grows in preallocated blocks;
+- `<base>.json`: fs, channel names, start time, timestamp clock and, once
+  the recording is closed, the sample count.
+
+Every pulled chunk is one slice assignment into the map, so recording costs
+a memcpy per chunk and the OS writes the pages back in the background. A
+recording that was never closed (ie the bridge crashed) is still readable:
+the zero-filled, preallocated tail is recognised and cut off.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+MUSE_CHANNEL_NAMES = ('TP9', 'AF7', 'AF8', 'TP10')
+RAW_RECORDING_VERSION = 1
+
+
+def raw_dtype(n_channels: int = 4) -> np.dtype:
+    """Record layout of one sample: timestamp and `n_channels` float32 values."""
+    return np.dtype([('t', '<f8'), ('eeg', '<f4', (n_channels,))])
+
+
+RAW_DTYPE = raw_dtype()
+
+
+def _paths(base: str):
+    return base + '.eeg', base + '.json'
+
+
+class RawEEGRecorder:
+    """Appends timestamped EEG chunks to a memory-mapped recording.
+
+    `write` is safe to call from the acquisition thread while another thread
+    closes the recorder; writes after `close` are ignored.
+
+    Parameters
+    ----------
+    base : str
+        Path without suffix; creates `<base>.eeg` and `<base>.json`.
+    fs : float
+        Nominal sampling rate, used for the growth block and for synthesized
+        timestamps.
+    channel_names : Sequence[str]
+        One name per channel, in row order of the written chunks.
+    clock : str
+        'lsl' if `write` gets LSL timestamps, 'synthetic' if timestamps are
+        generated from `fs`, starting at the wall-clock start time.
+    block_seconds : float
+        Samples preallocated each time the file grows, in seconds of data.
+    meta : Optional[dict]
+        Extra JSON-serialisable fields for the header, ie the headset id.
+    """
+
+    def __init__(self, base: str, fs: float, channel_names: Sequence[str] = MUSE_CHANNEL_NAMES,
+                 clock: str = 'lsl', block_seconds: float = 600.0, meta: Optional[dict] = None):
+        self.data_path, self.header_path = _paths(base)
+        self.fs = float(fs)
+        self.dtype = raw_dtype(len(channel_names))
+        self.block = max(1, int(self.fs * block_seconds))
+        self.n_samples = 0
+        self._lock = threading.Lock()
+        self._next_t = time.time()
+        self.header = dict(meta or {}, version=RAW_RECORDING_VERSION, fs=self.fs,
+                           channel_names=list(channel_names), dtype=np.lib.format.dtype_to_descr(self.dtype),
+                           clock=clock, start_time=self._next_t, n_samples=None)
+        self._write_header()
+        with open(self.data_path, 'wb'):
+            pass
+        self._capacity = 0
+        self._map: Optional[np.memmap] = None
+        self._grow(self.block)
+
+    def _write_header(self) -> None:
+        tmp = self.header_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.header, f, indent=2)
+        os.replace(tmp, self.header_path)
+
+    def _grow(self, needed: int) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        capacity = max(needed, self._capacity + self.block)
+        os.truncate(self.data_path, capacity * self.dtype.itemsize)
+        self._map = np.memmap(self.data_path, dtype=self.dtype, mode='r+', shape=(capacity,))
+        self._capacity = capacity
+
+    def write(self, samples: np.ndarray, timestamps: Optional[np.ndarray] = None) -> None:
+        """Append one chunk.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            Shape (n_channels, n).
+        timestamps : Optional[np.ndarray]
+            n timestamps; generated at 1/fs spacing if None.
+        """
+        n = samples.shape[1]
+        if n == 0:
+            return
+        with self._lock:
+            if self._map is None:
+                return
+            if timestamps is None:
+                timestamps = self._next_t + np.arange(n) / self.fs
+                self._next_t += n / self.fs
+            start = self.n_samples
+            if start + n > self._capacity:
+                self._grow(start + n)
+            records = self._map[start:start + n]
+            records['t'] = timestamps
+            records['eeg'] = samples.T
+            self.n_samples = start + n
+
+    def close(self) -> None:
+        """Trim the preallocated tail and record the sample count in the header."""
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map = None
+            os.truncate(self.data_path, self.n_samples * self.dtype.itemsize)
+            self.header['n_samples'] = self.n_samples
+            self.header['end_time'] = time.time()
+            self._write_header()
+
+
+@dataclass
+class RawRecording:
+    """A recording opened with `open_raw_recording`.
+
+    Attributes
+    ----------
+    records : np.ndarray
+        Read-only memory map of the samples (`raw_dtype`).
+    header : dict
+        The JSON header.
+    """
+
+    records: np.ndarray
+    header: dict
+
+    @property
+    def fs(self) -> float:
+        return float(self.header['fs'])
+
+    @property
+    def channel_names(self):
+        return list(self.header['channel_names'])
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.records['t']
+
+    @property
+    def samples(self) -> np.ndarray:
+        """(n_channels, n) view of the EEG, not copied."""
+        return self.records['eeg'].T
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def open_raw_recording(base: str) -> RawRecording:
+    """Map a recording written by `RawEEGRecorder` without loading it.
+
+    Parameters
+    ----------
+    base : str
+        Path of the recording with or without its `.eeg`/`.json` suffix.
+    """
+    root, ext = os.path.splitext(base)
+    data_path, header_path = _paths(root if ext in ('.eeg', '.json') else base)
+    with open(header_path) as f:
+        header = json.load(f)
+    dtype = np.lib.format.descr_to_dtype(header['dtype'])
+    size = os.path.getsize(data_path) // dtype.itemsize
+    if size == 0:
+        return RawRecording(np.empty(0, dtype=dtype), header)
+    records = np.memmap(data_path, dtype=dtype, mode='r', shape=(size,))
+    n = header.get('n_samples')
+    if n is None:
+        # Not closed cleanly: the preallocated tail is still zero-filled.
+        written = np.flatnonzero(records['t'] != 0)
+        n = int(written[-1]) + 1 if written.size else 0
+    return RawRecording(records[:n], header)
@@ -1,8 +1,7 @@
+import argparse
 import os
-import csv
 import time
 from datetime import datetime
-from collections import deque
 import json
 import socket
 
@@ -10,9 +9,29 @@ import numpy as np
 from pylsl import StreamInlet, resolve_byprop
 
 # Helper imports
-from utils.utils import find_eeg_inlet, compute_bandpower_welch, exponential_moving_average
+from src.session_log import SESSION_LOG_SUFFIX, BinarySessionWriter
+from utils.row_writer import SESSION_CSV_HEADER, BackgroundCSVWriter
+from utils.utils import ChunkedInlet, RingBuffer, find_eeg_inlet, compute_band_powers_welch_multi, exponential_moving_average
+
+def _format_row(row):
+    # Runs on the CSV writer thread, keeping string formatting out of the hop loop.
+    elapsed_time, now, alpha_rel, beta_rel, ri, ri_ema, ri_scaled = row
+    return [
+        elapsed_time,
+        datetime.utcfromtimestamp(now).isoformat(),
+        f"{alpha_rel:.6f}",
+        f"{beta_rel:.6f}",
+        f"{ri:.6f}",
+        f"{ri_ema:.6f}",
+        f"{ri_scaled:.6f}",
+    ]
 
 def main():
+    parser = argparse.ArgumentParser(description='Log the Relaxation Index from a Muse LSL stream and send it to the game.')
+    parser.add_argument('--log-format', choices=['csv', 'binary'], default='csv',
+                        help='Session log format (binary writes a .rwlog file, see src/session_log.py)')
+    args = parser.parse_args()
+
     fs_expected = 256.0  # Muse-2 nominal
     window_seconds = 2.0 
     hop_seconds = 0.1
@@ -29,22 +48,23 @@ def main():
     if fs <= 0:
         fs = fs_expected
     print(f"Using sampling rate: {fs} Hz")
+    reader = ChunkedInlet(inlet, n_channels=4, max_samples=64, timeout=5.0)
 
     # Prepare logging
     os.makedirs('logs', exist_ok=True)
     stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    csv_path = os.path.join('logs', f'session_{stamp}.csv')
-    csv_file = open(csv_path, 'w', newline='')
-    csv_writer = csv.writer(csv_file)
-    csv_writer.writerow(['elapsed_seconds', 'timestamp_utc', 'alpha_rel', 'beta_rel', 'ri', 'ri_ema', 'ri_scaled'])
-    print(f"Logging to {csv_path}")
-
-    # Ring buffers for all 4 Muse channels
+    if args.log_format == 'binary':
+        log_path = os.path.join('logs', f'session_{stamp}{SESSION_LOG_SUFFIX}')
+        session_log = BinarySessionWriter(log_path, meta={'source': 'rocketwave-log', 'hop_seconds': hop_seconds,
+                                                          'window_seconds': window_seconds})
+    else:
+        log_path = os.path.join('logs', f'session_{stamp}.csv')
+        session_log = BackgroundCSVWriter(log_path, SESSION_CSV_HEADER, format_row=_format_row)
+    print(f"Logging to {log_path}")
+
+    # Ring buffer for all 4 Muse channels
     # Muse LSL order is typically: TP9, AF7, AF8, TP10
-    tp9_buf = deque(maxlen=window_size)
-    af7_buf = deque(maxlen=window_size)
-    af8_buf = deque(maxlen=window_size)
-    tp10_buf = deque(maxlen=window_size)
+    eeg_buf = RingBuffer(4, window_size)
 
     # Stats
     ri_ema = float('nan')
@@ -65,46 +85,27 @@ def main():
 
     try:
         while True:
-            sample, ts = inlet.pull_sample(timeout=5.0)
-            if sample is None:
+            # Channels are mapped with fallbacks if stream has fewer than 4 channels
+            chunk, ts = reader.pull()
+            if chunk.shape[1] == 0:
                 print("No samples received; still waiting...")
                 continue
 
-            # Fetch channels with fallbacks if stream has fewer than 4 channels
-            ch0 = sample[0] if len(sample) >= 1 else 0.0  # TP9
-            ch1 = sample[1] if len(sample) >= 2 else ch0  # AF7
-            ch2 = sample[2] if len(sample) >= 3 else ch1  # AF8
-            ch3 = sample[3] if len(sample) >= 4 else ch0  # TP10
-
-            tp9_buf.append(ch0)
-            af7_buf.append(ch1)
-            af8_buf.append(ch2)
-            tp10_buf.append(ch3)
+            eeg_buf.extend(chunk)
 
             # Process at hop cadence
             now = time.time()
-            if (len(tp9_buf) == window_size and len(af7_buf) == window_size and
-                len(af8_buf) == window_size and len(tp10_buf) == window_size and
-                (now - last_window_time) >= hop_seconds):
-                tp9 = np.array(tp9_buf, dtype=np.float64)
-                af7 = np.array(af7_buf, dtype=np.float64)
-                af8 = np.array(af8_buf, dtype=np.float64)
-                tp10 = np.array(tp10_buf, dtype=np.float64)
+            if eeg_buf.full and (now - last_window_time) >= hop_seconds:
+                window = eeg_buf.view()
 
                 # Welch params: 1s segments with 50% overlap
                 seg_len = int(fs * 1.0)
                 overlap = int(seg_len * 0.5)
 
-                # Bandpowers per channel
-                alpha_tp9 = compute_bandpower_welch(tp9, fs, *alpha_band, segment_length=seg_len, overlap=overlap)
-                alpha_tp10 = compute_bandpower_welch(tp10, fs, *alpha_band, segment_length=seg_len, overlap=overlap)
-                beta_af7 = compute_bandpower_welch(af7, fs, *beta_band, segment_length=seg_len, overlap=overlap)
-                beta_af8 = compute_bandpower_welch(af8, fs, *beta_band, segment_length=seg_len, overlap=overlap)
-
-                total_tp9 = compute_bandpower_welch(tp9, fs, *total_band, segment_length=seg_len, overlap=overlap)
-                total_tp10 = compute_bandpower_welch(tp10, fs, *total_band, segment_length=seg_len, overlap=overlap)
-                total_af7 = compute_bandpower_welch(af7, fs, *total_band, segment_length=seg_len, overlap=overlap)
-                total_af8 = compute_bandpower_welch(af8, fs, *total_band, segment_length=seg_len, overlap=overlap)
+                # Bandpowers for every channel in one batched pass, rows are TP9, AF7, AF8, TP10
+                bands = (alpha_band, beta_band, total_band)
+                powers = compute_band_powers_welch_multi(window, fs, bands, segment_length=seg_len, overlap=overlap)
+                (alpha_tp9, _, total_tp9), (_, beta_af7, total_af7), (_, beta_af8, total_af8), (alpha_tp10, _, total_tp10) = powers
 
                 # Relative powers (average across left/right pairs)
                 alpha_power = 0.5 * (alpha_tp9 + alpha_tp10)
@@ -151,18 +152,9 @@ def main():
                     ri_scaled = ri_scaled_raw
                 last_ri_scaled = ri_scaled
 
-                # Log
-                elapsed_time = time.time() - start_time
-                csv_writer.writerow([
-                    elapsed_time,
-                    datetime.utcnow().isoformat(),
-                    f"{alpha_rel:.6f}",
-                    f"{beta_rel:.6f}",
-                    f"{ri:.6f}",
-                    f"{ri_ema:.6f}",
-                    f"{ri_scaled:.6f}",
-                ])
-                csv_file.flush()
+                # Log (queued; written and flushed by the background writer)
+                log_time = time.time()
+                session_log.write((log_time - start_time, log_time, alpha_rel, beta_rel, ri, ri_ema, ri_scaled))
 
                 # Send UDP JSON
                 packet = {
@@ -186,7 +178,11 @@ def main():
     except KeyboardInterrupt:
         print("\nStopping...")
     finally:
-        csv_file.close()
+        # A failed final flush must not hide the exception (or Ctrl+C) that ended the loop.
+        try:
+            session_log.close()
+        except OSError as e:
+            print(f"Session log {log_path}: write failed: {e}")
         try:
             udp_sock.close()
         except Exception:
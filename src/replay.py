@@ -0,0 +1,151 @@
+"""Replay recorded raw EEG through the bridge instead of a live LSL stream.
+
+`load_raw_eeg` opens any of
+
+- a `RawEEGRecorder` recording (`.eeg` + `.json`, memory-mapped);
+- an `.npz` with `samples` shaped (n_channels, n) and `timestamps` and/or
+  `fs` (optionally `channel_names`);
+- a CSV with a timestamp column and one column per channel, ie the files
+  written by `muselsl record` (timestamps, TP9, AF7, AF8, TP10, Right AUX);
+
+and `RawEEGReplay` plays it back in LSL-sized chunks, either paced by the
+recorded timestamps (optionally sped up) or as fast as the consumer reads.
+"""
+
+import csv
+import os
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.pacing import Pacer
+from src.raw_recording import MUSE_CHANNEL_NAMES, RawRecording, open_raw_recording, raw_dtype
+
+# Column names accepted as the timestamp column of a raw CSV, in order of preference.
+TIME_COLUMNS = ('timestamps', 'timestamp', 'time', 't')
+
+
+def _estimate_fs(timestamps: np.ndarray) -> float:
+    steps = np.diff(timestamps)
+    steps = steps[steps > 0]
+    if steps.size == 0:
+        raise ValueError("cannot infer the sampling rate: timestamps do not increase")
+    return float(1.0 / np.median(steps))
+
+
+def _in_memory_recording(samples: np.ndarray, timestamps: Optional[np.ndarray], fs: Optional[float],
+                         channel_names: Sequence[str], source: str) -> RawRecording:
+    n_channels, n = samples.shape
+    if fs is None:
+        if timestamps is None:
+            raise ValueError(f"{source}: needs timestamps or fs")
+        fs = _estimate_fs(timestamps)
+    records = np.empty(n, dtype=raw_dtype(n_channels))
+    records['eeg'] = samples.T
+    records['t'] = timestamps if timestamps is not None else np.arange(n) / fs
+    header = {'fs': float(fs), 'channel_names': list(channel_names), 'n_samples': n,
+              'clock': 'lsl' if timestamps is not None else 'synthetic', 'source': os.path.basename(source)}
+    return RawRecording(records, header)
+
+
+def _load_npz(path: str) -> RawRecording:
+    with np.load(path) as data:
+        samples = np.asarray(data['samples'], dtype=np.float32)
+        timestamps = np.asarray(data['timestamps'], dtype=np.float64) if 'timestamps' in data else None
+        fs = float(data['fs']) if 'fs' in data else None
+        names = [str(c) for c in data['channel_names']] if 'channel_names' in data else None
+    return _in_memory_recording(samples, timestamps, fs, names or MUSE_CHANNEL_NAMES[:samples.shape[0]], path)
+
+
+def _load_csv(path: str, fs: Optional[float] = None) -> RawRecording:
+    with open(path, newline='') as f:
+        header = [h.strip() for h in next(csv.reader(f))]
+    time_col = next((header.index(c) for c in TIME_COLUMNS if c in header), None)
+    if all(name in header for name in MUSE_CHANNEL_NAMES):
+        names = list(MUSE_CHANNEL_NAMES)
+    else:
+        names = [h for i, h in enumerate(header) if i != time_col][:len(MUSE_CHANNEL_NAMES)]
+    cols = [header.index(name) for name in names]
+    usecols = cols + ([time_col] if time_col is not None else [])
+    data = np.loadtxt(path, delimiter=',', skiprows=1, usecols=usecols, ndmin=2)
+    timestamps = data[:, -1] if time_col is not None else None
+    return _in_memory_recording(data[:, :len(cols)].T.astype(np.float32), timestamps, fs, names, path)
+
+
+def load_raw_eeg(path: str, fs: Optional[float] = None) -> RawRecording:
+    """Open a raw EEG recording in any supported format.
+
+    Parameters
+    ----------
+    path : str
+        `.eeg`/`.json` recording, `.npz` or `.csv`.
+    fs : Optional[float]
+        Sampling rate for CSVs; inferred from their timestamps by default.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.eeg', '.json'):
+        return open_raw_recording(path)
+    if ext == '.npz':
+        return _load_npz(path)
+    if ext == '.csv':
+        return _load_csv(path, fs)
+    raise ValueError(f"unsupported raw EEG file {path!r}: expected .eeg, .npz or .csv")
+
+
+class RawEEGReplay:
+    """Plays a `RawRecording` back chunk by chunk.
+
+    Parameters
+    ----------
+    recording : RawRecording
+        Samples and timestamps to play.
+    chunk_samples : int
+        Samples per `pull`, like `ChunkedInlet`'s `max_samples`.
+    speed : float
+        Playback rate relative to the recorded timestamps, ie 1.0 for real
+        time or 10.0 for ten times faster; 0 does not wait at all.
+    spin_seconds : float
+        Busy-wait this long before each chunk's release, see `Pacer`.
+    """
+
+    def __init__(self, recording: RawRecording, chunk_samples: int = 64, speed: float = 1.0,
+                 spin_seconds: float = 0.0):
+        self.recording = recording
+        self.chunk_samples = max(1, int(chunk_samples))
+        self.speed = max(0.0, float(speed))
+        self.pacer = Pacer(spin_seconds)
+        self.position = 0
+        self._t0: Optional[float] = None
+        self._wall0 = 0.0
+        self._wall_end = 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= len(self.recording)
+
+    def pull(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Next chunk as (samples shaped (n_channels, n), timestamps), n is 0 once exhausted."""
+        records = self.recording.records
+        start = self.position
+        end = min(start + self.chunk_samples, len(records))
+        chunk = records[start:end]
+        if self._t0 is None:
+            self._t0 = float(records['t'][0]) if len(records) else 0.0
+            self._wall0 = time.perf_counter()
+            self.pacer.start()
+        if self.speed > 0 and end > start:
+            # A chunk is released once its newest sample would have arrived live.
+            self.pacer.wait_until((float(chunk['t'][-1]) - self._t0) / self.speed)
+        self.position = end
+        self._wall_end = time.perf_counter()
+        return chunk['eeg'].T, chunk['t']
+
+    def stats(self) -> dict:
+        elapsed = max(self._wall_end - self._wall0, 1e-9)
+        seconds = self.position / self.recording.fs
+        stats = {'samples': self.position, 'eeg_seconds': seconds, 'wall_seconds': elapsed,
+                 'x_realtime': seconds / elapsed}
+        if self.speed > 0:
+            stats.update(self.pacer.stats())
+        return stats
@@ -0,0 +1,308 @@
+"""Recompute session logs from raw recordings on all cores.
+
+    rocketwave-reprocess logs/ --workers 8
+    rocketwave-reprocess logs/ data/muse/ --hop-seconds 0.25 --log-format binary
+
+Every raw recording found (`.eeg` recordings, `.npz` files and `muselsl`
+CSVs, see `src/replay.py`) is run through `src.batch_features` in a
+`ProcessPoolExecutor` and written as a session log to the output directory,
+keeping the input's subdirectories: `raw_<name>.eeg` becomes
+`session_<name>.csv`, other formats add their extension
+(`session_<name>_npz.csv`). Inputs that would still share an output are
+refused. `reprocess_summary.csv` lists every recording with its mean features.
+
+Runs are resumable: `reprocess_manifest.json` remembers, per input, the size
+and mtime (or SHA-256 with `--hash`) it was processed at and a fingerprint
+of the settings and feature code, so re-running only redoes recordings
+that changed, or everything once the bands, smoothing or scaling change.
+"""
+
+import argparse
+import csv
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src import batch_features
+from src.batch_features import extract_recording_features
+from src.live_visualisation import live_eeg_stream
+from src.live_visualisation.live_eeg_stream import BANDS, BridgeConfig
+from src.replay import TIME_COLUMNS, load_raw_eeg
+from src.session_log import SESSION_DTYPE, SESSION_LOG_SUFFIX, write_session_csv, write_session_log
+from utils import utils
+
+MANIFEST_NAME = 'reprocess_manifest.json'
+SUMMARY_NAME = 'reprocess_summary.csv'
+SUMMARY_COLUMNS = ['input', 'output', 'status', 'samples', 'duration_seconds', 'hops', 'alpha_rel_mean',
+                   'beta_rel_mean', 'ri_mean', 'ri_ema_mean', 'ri_scaled_mean', 'relaxed_fraction',
+                   'process_seconds', 'error']
+_RAW_SUFFIXES = ('.eeg', '.npz', '.csv')
+# Rewriting the manifest after every file is quadratic over thousands of files.
+_MANIFEST_SAVE_SECONDS = 2.0
+
+
+def settings_fingerprint(cfg: BridgeConfig, log_format: str) -> str:
+    """Hash of everything that shapes a reprocessed log: settings, bands and the feature code itself."""
+    h = hashlib.sha256()
+    settings = {'window_seconds': cfg.window_seconds, 'hop_seconds': cfg.hop_seconds,
+                'log_format': log_format, 'bands': BANDS}
+    h.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for obj in (batch_features, live_eeg_stream.FeatureComputer, utils.WelchPlan, utils.get_welch_plan):
+        h.update(inspect.getsource(obj).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _is_raw_csv(path: str) -> bool:
+    # Session logs are CSVs too; raw ones have a timestamp column and no feature columns.
+    try:
+        with open(path, newline='') as f:
+            header = [h.strip() for h in next(csv.reader(f), [])]
+    except (OSError, UnicodeDecodeError):
+        return False
+    return any(c in header for c in TIME_COLUMNS) and 'ri' not in header
+
+
+def find_recordings(root: str, exclude: Optional[str] = None) -> List[str]:
+    """Raw recordings under `root` (or `root` itself if it is a file), sorted, skipping `exclude`."""
+    if os.path.isfile(root):
+        return [root]
+    exclude = os.path.abspath(exclude) if exclude else None
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != exclude)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in _RAW_SUFFIXES or (ext == '.csv' and not _is_raw_csv(path)):
+                continue
+            found.append(path)
+    return found
+
+
+def _output_name(path: str, log_format: str) -> str:
+    stem, ext = os.path.splitext(os.path.basename(path))
+    stem = 'session_' + (stem[len('raw_'):] if stem.startswith('raw_') else stem)
+    # Native recordings keep the live session log's name; others name their format so foo.npz and
+    # foo.csv do not overwrite each other.
+    if ext.lower() != '.eeg':
+        stem += '_' + ext[1:].lower()
+    return stem + (SESSION_LOG_SUFFIX if log_format == 'binary' else '.csv')
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def reprocess_recording(path: str, out_path: str, cfg: BridgeConfig, log_format: str = 'csv') -> dict:
+    """Compute every hop of one recording and write it as a session log.
+
+    Rows are timed in recording time: `elapsed_seconds` is the hop's end in
+    seconds of EEG, and `timestamp_utc` adds it to the recording's wall-clock
+    start (or uses the sample timestamps for files without one).
+
+    Parameters
+    ----------
+    path : str
+        Raw recording, any format `load_raw_eeg` reads.
+    out_path : str
+        Session log to create; written to a temporary file and renamed, so
+        an interrupted run never leaves a partial log behind.
+    cfg : BridgeConfig
+        Window, hop and smoothing settings.
+    log_format : str
+        'csv' or 'binary'.
+
+    Returns
+    -------
+    dict
+        The recording's `SUMMARY_COLUMNS` values.
+    """
+    start = time.perf_counter()
+    recording = load_raw_eeg(path)
+    feats = extract_recording_features(recording, cfg)
+    records = np.empty(len(feats), dtype=SESSION_DTYPE)
+    records['elapsed_seconds'] = feats.end / recording.fs
+    start_time = recording.header.get('start_time')
+    records['timestamp_utc'] = start_time + records['elapsed_seconds'] if start_time is not None else feats.t
+    records['alpha_rel'] = feats.relative[:, 2]
+    records['beta_rel'] = feats.relative[:, 3]
+    records['ri'] = feats.ri
+    records['ri_ema'] = feats.ri_ema
+    records['ri_scaled'] = feats.ri_scaled
+
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    tmp = out_path + '.tmp'
+    if log_format == 'binary':
+        write_session_log(tmp, records, meta={'source': 'rocketwave-reprocess', 'input': os.path.basename(path),
+                                              'hop_seconds': cfg.hop_seconds, 'window_seconds': cfg.window_seconds})
+    else:
+        write_session_csv(tmp, records)
+    os.replace(tmp, out_path)
+
+    def mean(values: np.ndarray) -> float:
+        return float(values.mean()) if len(values) else float('nan')
+
+    return {'samples': len(recording), 'duration_seconds': len(recording) / recording.fs, 'hops': len(feats),
+            'alpha_rel_mean': mean(records['alpha_rel']), 'beta_rel_mean': mean(records['beta_rel']),
+            'ri_mean': mean(feats.ri), 'ri_ema_mean': mean(feats.ri_ema), 'ri_scaled_mean': mean(feats.ri_scaled),
+            'relaxed_fraction': mean(feats.ri_scaled > 0.5), 'process_seconds': time.perf_counter() - start}
+
+
+def _load_manifest(path: str) -> Dict[str, dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: Dict[str, dict]) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _write_summary(path: str, rows: List[dict]) -> None:
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for row in sorted(rows, key=lambda r: r['input']):
+            writer.writerow({k: (f"{v:.6f}" if isinstance(v, float) else v) for k, v in row.items()})
+
+
+def main() -> None:
+    defaults = BridgeConfig()
+    parser = argparse.ArgumentParser(description='Recompute session logs from raw EEG recordings in parallel.')
+    parser.add_argument('inputs', nargs='+', help='Directories to search for raw recordings (.eeg, .npz, muselsl '
+                                                  '.csv), or recording files')
+    parser.add_argument('--output', default=os.path.join('logs', 'reprocessed'),
+                        help='Directory for the session logs, manifest and summary')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (1 runs in this process)')
+    parser.add_argument('--log-format', choices=['csv', 'binary'], default='csv', help='Session log format')
+    parser.add_argument('--window-seconds', type=float, default=defaults.window_seconds, help='Analysis window length')
+    parser.add_argument('--hop-seconds', type=float, default=defaults.hop_seconds, help='Hop between windows')
+    parser.add_argument('--hash', action='store_true',
+                        help='Detect changed inputs by SHA-256 instead of size and mtime')
+    parser.add_argument('--force', action='store_true', help='Reprocess even if outputs are up to date')
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    cfg = BridgeConfig(window_seconds=args.window_seconds, hop_seconds=args.hop_seconds, log_format=args.log_format)
+    fingerprint = settings_fingerprint(cfg, args.log_format)
+    os.makedirs(args.output, exist_ok=True)
+    manifest_path = os.path.join(args.output, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+
+    jobs = []
+    skipped = 0
+    seen = set()
+    outputs: Dict[str, str] = {}
+    for root in args.inputs:
+        base = root if os.path.isdir(root) else (os.path.dirname(root) or '.')
+        for path in find_recordings(root, exclude=args.output):
+            key = os.path.abspath(path)
+            if key in seen:
+                # Named twice, ie as a directory and as a file in it.
+                continue
+            seen.add(key)
+            rel = os.path.relpath(path, base)
+            out_path = os.path.join(args.output, os.path.dirname(rel), _output_name(path, args.log_format))
+            # Inputs from different roots can still meet in the same output directory.
+            other = outputs.setdefault(os.path.normcase(os.path.abspath(out_path)), key)
+            if other != key:
+                parser.error(f"{other} and {key} would both be written to {out_path}")
+            st = os.stat(path)
+            state = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'fingerprint': fingerprint}
+            if args.hash:
+                state['sha256'] = _file_sha256(path)
+            entry = manifest.get(key)
+            up_to_date = (not args.force and entry is not None and entry.get('status') == 'processed'
+                          and entry.get('fingerprint') == fingerprint and os.path.exists(entry.get('output', '')))
+            if up_to_date:
+                if args.hash and 'sha256' in entry:
+                    up_to_date = entry['sha256'] == state['sha256']
+                else:
+                    up_to_date = entry.get('size') == state['size'] and entry.get('mtime_ns') == state['mtime_ns']
+            if up_to_date:
+                manifest[key].update(state)
+                skipped += 1
+            else:
+                jobs.append((key, path, out_path, state))
+
+    total = len(jobs)
+    print(f"{total + skipped} recordings: {total} to process, {skipped} up to date, {args.workers} worker(s)")
+    start = time.perf_counter()
+    last_save = start
+    failed = 0
+    eeg_seconds = 0.0
+
+    def record(done: int, key: str, path: str, out_path: str, state: dict, summary: dict,
+               error: Optional[BaseException]) -> None:
+        nonlocal failed, eeg_seconds, last_save
+        if error is None:
+            manifest[key] = dict(state, status='processed', output=out_path, input=path, summary=summary)
+            eeg_seconds += summary['duration_seconds']
+            detail = f"{summary['hops']} hops, {summary['process_seconds']:.1f}s"
+        else:
+            failed += 1
+            manifest[key] = dict(state, status='failed', output=out_path, input=path, summary={},
+                                 error=f"{type(error).__name__}: {error}")
+            detail = f"FAILED: {manifest[key]['error']}"
+        elapsed = time.perf_counter() - start
+        eta = elapsed / done * (total - done)
+        print(f"[{done}/{total}] {path} -> {out_path} ({detail}; eta {eta:.0f}s)")
+        if time.perf_counter() - last_save > _MANIFEST_SAVE_SECONDS:
+            _save_manifest(manifest_path, manifest)
+            last_save = time.perf_counter()
+
+    try:
+        if args.workers == 1:
+            for done, (key, path, out_path, state) in enumerate(jobs, 1):
+                try:
+                    summary, error = reprocess_recording(path, out_path, cfg, args.log_format), None
+                except Exception as e:
+                    summary, error = {}, e
+                record(done, key, path, out_path, state, summary, error)
+        elif jobs:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                futures = {pool.submit(reprocess_recording, job[1], job[2], cfg, args.log_format): job
+                           for job in jobs}
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        key, path, out_path, state = futures[future]
+                        error = future.exception()
+                        record(done, key, path, out_path, state, future.result() if error is None else {}, error)
+                except KeyboardInterrupt:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+    except KeyboardInterrupt:
+        print("Interrupted; finished recordings are kept and skipped on the next run")
+    finally:
+        _save_manifest(manifest_path, manifest)
+        rows = [dict(entry.get('summary', {}), input=entry.get('input', key), output=entry.get('output', ''),
+                     status=entry.get('status', ''), error=entry.get('error', ''))
+                for key, entry in manifest.items()]
+        _write_summary(os.path.join(args.output, SUMMARY_NAME), rows)
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {total - failed}/{total} recordings ({eeg_seconds / 3600:.2f} h of EEG) in {elapsed:.1f}s, "
+          f"{failed} failed, {skipped} up to date; summary in {os.path.join(args.output, SUMMARY_NAME)}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
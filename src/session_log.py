@@ -0,0 +1,222 @@
+"""Binary session logs: the CSV session schema as typed, append-only chunks.
+
+A `.rwlog` file holds the same columns as the CSV logs, with
+`timestamp_utc` stored as float64 Unix seconds instead of an ISO string,
+and loads with a single `np.frombuffer` instead of text parsing.
+
+Layout, all little-endian:
+
+- file header: magic b'RWSLOG01', uint32 length, then that many bytes of
+  JSON with the record dtype (`np.lib.format` descr) and session metadata;
+- chunks, one per writer flush: b'RWCK', uint32 row count, the records,
+  then a footer of uint32 CRC-32 of the records and b'KCWR'.
+
+A chunk only counts once its footer is on disk, so a crash mid-write loses
+at most the rows of the last flush: readers stop at the first torn chunk.
+
+Convert to and from CSV with
+
+    rocketwave-convert-log logs/session_20250101_120000.csv
+    rocketwave-convert-log logs/session_20250101_120000.rwlog
+"""
+
+import argparse
+import csv
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.row_writer import SESSION_CSV_HEADER, BackgroundRowWriter
+
+SESSION_LOG_SUFFIX = '.rwlog'
+SESSION_LOG_MAGIC = b'RWSLOG01'
+# Same columns and order as SESSION_CSV_HEADER and the bridge/logger row tuples.
+SESSION_DTYPE = np.dtype([
+    ('elapsed_seconds', '<f8'),
+    ('timestamp_utc', '<f8'),
+    ('alpha_rel', '<f4'),
+    ('beta_rel', '<f4'),
+    ('ri', '<f4'),
+    ('ri_ema', '<f4'),
+    ('ri_scaled', '<f4'),
+])
+_FILE_HEADER = struct.Struct('<8sI')
+_CHUNK_HEADER = struct.Struct('<4sI')
+_CHUNK_FOOTER = struct.Struct('<I4s')
+_CHUNK_MAGIC = b'RWCK'
+_FOOTER_MAGIC = b'KCWR'
+
+
+def _file_header(meta: dict) -> bytes:
+    body = json.dumps({'dtype': np.lib.format.dtype_to_descr(SESSION_DTYPE), 'meta': meta}).encode('utf-8')
+    return _FILE_HEADER.pack(SESSION_LOG_MAGIC, len(body)) + body
+
+
+def _chunk(records: np.ndarray) -> bytes:
+    data = records.tobytes()
+    return (_CHUNK_HEADER.pack(_CHUNK_MAGIC, len(records)) + data
+            + _CHUNK_FOOTER.pack(zlib.crc32(data), _FOOTER_MAGIC))
+
+
+class BinarySessionWriter(BackgroundRowWriter):
+    """
+    Writes session rows to a `.rwlog` file from a background thread.
+
+    Rows are the tuples `(elapsed_seconds, unix_time, alpha_rel, beta_rel,
+    ri, ri_ema, ri_scaled)`; each flush appends one footer-sealed chunk.
+
+    Args:
+        path: File to create (truncated if it exists).
+        meta: JSON-serialisable session metadata stored in the file header.
+        **kwargs: Flush policy, see `BackgroundRowWriter`.
+    """
+
+    def __init__(self, path: str, meta: Optional[dict] = None, **kwargs):
+        self._file = open(path, 'wb')
+        self._file.write(_file_header(dict(meta or {}, created=time.time())))
+        super().__init__(path, **kwargs)
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        self._file.write(_chunk(np.array(rows, dtype=SESSION_DTYPE)))
+
+
+def read_session_log(path: str, strict: bool = False) -> Tuple[np.ndarray, dict]:
+    """
+    Load every complete chunk of a `.rwlog` file.
+
+    Args:
+        path: Session log written by `BinarySessionWriter` or `csv_to_session_log`.
+        strict: Raise on a torn or corrupt chunk instead of stopping before it.
+
+    Returns:
+        (records, meta): the `SESSION_DTYPE` records and the header metadata,
+        with 'torn_bytes' added if anything after the last good chunk was
+        ignored.
+    """
+    with open(path, 'rb') as f:
+        buf = f.read()
+    if len(buf) < _FILE_HEADER.size:
+        raise ValueError(f"{path} is not a RocketWave session log")
+    magic, header_len = _FILE_HEADER.unpack_from(buf)
+    pos = _FILE_HEADER.size + header_len
+    if magic != SESSION_LOG_MAGIC or pos > len(buf):
+        raise ValueError(f"{path} is not a RocketWave session log")
+    header = json.loads(buf[_FILE_HEADER.size:pos].decode('utf-8'))
+    dtype = np.lib.format.descr_to_dtype(header['dtype'])
+    view = memoryview(buf)
+    spans = []
+    while pos + _CHUNK_HEADER.size <= len(buf):
+        chunk_magic, n_rows = _CHUNK_HEADER.unpack_from(buf, pos)
+        start = pos + _CHUNK_HEADER.size
+        end = start + n_rows * dtype.itemsize
+        if chunk_magic != _CHUNK_MAGIC or end + _CHUNK_FOOTER.size > len(buf):
+            break
+        crc, footer_magic = _CHUNK_FOOTER.unpack_from(buf, end)
+        if footer_magic != _FOOTER_MAGIC or crc != zlib.crc32(view[start:end]):
+            break
+        spans.append(view[start:end])
+        pos = end + _CHUNK_FOOTER.size
+    meta = header.get('meta', {})
+    if pos < len(buf):
+        if strict:
+            raise ValueError(f"{path}: torn or corrupt chunk at byte {pos}")
+        meta['torn_bytes'] = len(buf) - pos
+    # One copy of all record bytes, then a single (writable) typed view over them.
+    records = np.frombuffer(bytearray().join(spans), dtype=dtype)
+    return records, meta
+
+
+def write_session_log(path: str, records: np.ndarray, meta: Optional[dict] = None) -> None:
+    """
+    Write whole `SESSION_DTYPE` records to a `.rwlog` file as a single chunk.
+
+    Args:
+        path: File to create (truncated if it exists).
+        records: Rows to write, any array convertible to `SESSION_DTYPE`.
+        meta: JSON-serialisable session metadata stored in the file header.
+    """
+    with open(path, 'wb') as f:
+        f.write(_file_header(dict(meta or {})))
+        f.write(_chunk(np.asarray(records, dtype=SESSION_DTYPE)))
+
+
+def write_session_csv(path: str, records: np.ndarray) -> None:
+    """
+    Write `SESSION_DTYPE` records as a CSV session log.
+
+    Args:
+        path: CSV file to create, with microsecond ISO timestamps.
+        records: Rows to write.
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SESSION_CSV_HEADER)
+        for rec in records.tolist():
+            elapsed, t, *values = rec
+            stamp = datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None).isoformat()
+            writer.writerow([elapsed, stamp, *(f"{v:.6f}" for v in values)])
+
+
+def _parse_timestamp(text: str) -> float:
+    # Bridge logs end in 'Z', logger logs are naive isoformat; both are UTC.
+    return datetime.fromisoformat(text.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
+
+
+def csv_to_session_log(csv_path: str, out_path: str) -> int:
+    """
+    Convert a CSV session log to a `.rwlog` file; returns the row count.
+
+    Args:
+        csv_path: Log with the `SESSION_CSV_HEADER` columns.
+        out_path: `.rwlog` file to create.
+    """
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if header != SESSION_CSV_HEADER:
+            raise ValueError(f"{csv_path}: unexpected columns {header}")
+        rows = [(float(r[0]), _parse_timestamp(r[1]), *map(float, r[2:])) for r in reader if r]
+    records = np.array(rows, dtype=SESSION_DTYPE)
+    write_session_log(out_path, records, {'source': os.path.basename(csv_path)})
+    return len(records)
+
+
+def session_log_to_csv(path: str, csv_path: str) -> int:
+    """
+    Convert a `.rwlog` file to a CSV session log; returns the row count.
+
+    Args:
+        path: `.rwlog` file to read.
+        csv_path: CSV file to create, with microsecond ISO timestamps.
+    """
+    records, _ = read_session_log(path)
+    write_session_csv(csv_path, records)
+    return len(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Convert RocketWave session logs between CSV and binary .rwlog.')
+    parser.add_argument('inputs', nargs='+', help='.csv logs to convert to .rwlog, or .rwlog logs to convert to .csv')
+    parser.add_argument('--output', help='Output path (single input only); defaults to the input with the other suffix')
+    args = parser.parse_args()
+    if args.output and len(args.inputs) > 1:
+        parser.error('--output needs exactly one input')
+    for path in args.inputs:
+        root, ext = os.path.splitext(path)
+        if ext == SESSION_LOG_SUFFIX:
+            out = args.output or root + '.csv'
+            n = session_log_to_csv(path, out)
+        else:
+            out = args.output or root + SESSION_LOG_SUFFIX
+            n = csv_to_session_log(path, out)
+        print(f"{path} -> {out} ({n} rows, {os.path.getsize(path)} -> {os.path.getsize(out)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Seeded synthetic EEG for demos, tests and load tests.
+
+`SyntheticEEG` generates any number of virtual headsets at once. Each channel
+is a sum of oscillators spread over the delta-gamma bands plus Gaussian
+noise, with band amplitudes blended between two `BAND_PROFILES` by a scripted
+relaxation trajectory (see `parse_trajectory`), so the relaxation index
+follows a known course.
+
+Every stream draws from its own `np.random.SeedSequence(seed, spawn_key=(i,))`,
+so stream i is identical whether it is generated alone (ie in one
+multi-headset worker) or next to a hundred others, and runs with the same
+seed reproduce sample for sample.
+
+Write streams to `.npz` files that `--replay` and `rocketwave-reprocess` read:
+
+    rocketwave-synth --streams 32 --seconds 600 --seed 1 --output data/synthetic
+    rocketwave-synth --trajectory 0:0.1,120:0.9,240:0.3 --output data/synthetic
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.raw_recording import MUSE_CHANNEL_NAMES
+
+# Same ranges as the bridge's BANDS, in BAND_NAMES order.
+SYNTH_BANDS = (('delta', 1.0, 4.0), ('theta', 4.0, 8.0), ('alpha', 8.0, 12.0), ('beta', 13.0, 30.0),
+               ('gamma', 30.0, 45.0))
+# Oscillator amplitude per band, in microvolts; halfway between 'focused' and 'relaxed' is
+# roughly 'neutral', a relaxation index near 0 with the default noise.
+BAND_PROFILES: Dict[str, Dict[str, float]] = {
+    'relaxed': {'delta': 8.0, 'theta': 6.0, 'alpha': 30.0, 'beta': 6.0, 'gamma': 2.0},
+    'neutral': {'delta': 8.0, 'theta': 6.0, 'alpha': 18.0, 'beta': 17.0, 'gamma': 3.0},
+    'focused': {'delta': 8.0, 'theta': 6.0, 'alpha': 6.0, 'beta': 28.0, 'gamma': 4.0},
+}
+
+Trajectory = Callable[[np.ndarray], np.ndarray]
+
+
+def parse_trajectory(spec: str) -> Trajectory:
+    """Relaxation level over time, from 0 (the low profile) to 1 (the high one).
+
+    Parameters
+    ----------
+    spec : str
+        One of
+
+        - a constant, ie '0.5';
+        - keyframes 'seconds:level,...', ie '0:0.2,60:0.9,120:0.4', linearly
+          interpolated and held after the last one;
+        - 'sine:PERIOD[:LOW:HIGH]', a sine of PERIOD seconds (> 0) between
+          LOW and HIGH (default 0 and 1) starting at its midpoint.
+
+    Returns
+    -------
+    Trajectory
+        Maps an array of times in seconds to levels, clipped to [0, 1].
+    """
+    spec = spec.strip()
+    period = None
+    try:
+        if spec.startswith('sine:'):
+            period, *bounds = (float(v) for v in spec[len('sine:'):].split(':'))
+            low, high = bounds if bounds else (0.0, 1.0)
+        elif ':' in spec:
+            keys = [tuple(float(v) for v in key.split(':')) for key in spec.split(',')]
+            if any(len(k) != 2 for k in keys):
+                # ie '0:0.2,60', which would otherwise fail with an IndexError; reported below.
+                raise ValueError
+            keys.sort()
+            times = np.array([k[0] for k in keys])
+            levels = np.clip([k[1] for k in keys], 0.0, 1.0)
+            return lambda t: np.interp(t, times, levels)
+        else:
+            level = min(1.0, max(0.0, float(spec)))
+    except ValueError:
+        raise ValueError(f"invalid trajectory {spec!r}: expected LEVEL, T:LEVEL,... or sine:PERIOD[:LOW:HIGH]")
+    if period is not None:
+        # A zero, negative or non-finite period would turn every level into NaN.
+        if not 0.0 < period < np.inf:
+            raise ValueError(f"invalid trajectory {spec!r}: the sine period must be a positive number of seconds")
+        mid, amp = 0.5 * (low + high), 0.5 * (high - low)
+        return lambda t: np.clip(mid + amp * np.sin(2 * np.pi * t / period), 0.0, 1.0)
+    return lambda t: np.full(np.shape(t), level)
+
+
+class SyntheticEEG:
+    """Vectorized generator for several virtual headsets.
+
+    Parameters
+    ----------
+    fs : float
+        Sampling rate.
+    n_streams : int
+        Virtual headsets generated per call.
+    n_channels : int
+        Channels per headset.
+    seed : Optional[int]
+        Base seed; a fresh one (see `seed` attribute) if None.
+    first_stream : int
+        Index of the first stream, so a worker generating only headset 3
+        passes 3 and gets the same signal as stream 3 of a larger batch.
+    low, high : str
+        `BAND_PROFILES` names at relaxation level 0 and 1.
+    trajectory : str
+        Relaxation level over time, see `parse_trajectory`.
+    oscillators_per_band : int
+        Oscillators per band and channel, at random in-band frequencies.
+    noise_uv : float
+        Standard deviation of the white noise, in microvolts.
+    duration_seconds : float
+        Samples after which the generator is `exhausted`; 0 never ends.
+    """
+
+    def __init__(self, fs: float = 256.0, n_streams: int = 1, n_channels: int = 4, seed: Optional[int] = None,
+                 first_stream: int = 0, low: str = 'focused', high: str = 'relaxed', trajectory: str = '0.5',
+                 oscillators_per_band: int = 3, noise_uv: float = 10.0, duration_seconds: float = 0.0):
+        for name in (low, high):
+            if name not in BAND_PROFILES:
+                raise ValueError(f"unknown band profile {name!r}, expected one of {sorted(BAND_PROFILES)}")
+        self.fs = float(fs)
+        self.n_streams = n_streams
+        self.n_channels = n_channels
+        self.seed = int(np.random.SeedSequence().generate_state(1)[0]) if seed is None else int(seed)
+        self.trajectory = parse_trajectory(trajectory)
+        self.noise = noise_uv
+        self.limit = int(round(duration_seconds * self.fs)) if duration_seconds > 0 else None
+        self.position = 0
+        self._wall0: Optional[float] = None
+        self._wall_end = 0.0
+
+        k = max(1, int(oscillators_per_band))
+        # Amplitudes per oscillator, split so each band keeps its profile power.
+        self._low = np.repeat([BAND_PROFILES[low][b] for b, _, _ in SYNTH_BANDS], k) / np.sqrt(k)
+        self._high = np.repeat([BAND_PROFILES[high][b] for b, _, _ in SYNTH_BANDS], k) / np.sqrt(k)
+        f_lo = np.repeat([lo for _, lo, _ in SYNTH_BANDS], k)
+        f_hi = np.repeat([hi for _, _, hi in SYNTH_BANDS], k)
+        self._rngs = [np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(first_stream + i,)))
+                      for i in range(n_streams)]
+        shape = (n_channels, len(f_lo))
+        # (streams, channels, oscillators) frequencies and running phases.
+        self._freqs = np.stack([rng.uniform(f_lo, f_hi, size=shape) for rng in self._rngs])
+        self._phases = np.stack([rng.uniform(0.0, 2 * np.pi, size=shape) for rng in self._rngs])
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit is not None and self.position >= self.limit
+
+    def generate(self, n: int) -> np.ndarray:
+        """Next `n` samples of every stream, shaped (n_streams, n_channels, n), in microvolts like Muse LSL.
+
+        Fewer than `n` samples are returned only at the end of `duration_seconds`.
+        """
+        if self._wall0 is None:
+            self._wall0 = time.perf_counter()
+        if self.limit is not None:
+            n = max(0, min(n, self.limit - self.position))
+        local = np.arange(n) / self.fs
+        level = np.clip(self.trajectory(self.position / self.fs + local), 0.0, 1.0)
+        # (oscillators, n) amplitude envelopes blended along the trajectory.
+        amps = self._low[:, None] * (1.0 - level) + self._high[:, None] * level
+        omega = 2 * np.pi * self._freqs
+        waves = np.sin(omega[..., None] * local + self._phases[..., None])
+        out = np.einsum('scon,on->scn', waves, amps)
+        for s, rng in enumerate(self._rngs):
+            # Drawn sample-major, so the noise does not depend on how the stream is chunked.
+            out[s] += self.noise * rng.standard_normal((n, self.n_channels)).T
+        # Phases stay in [0, 2pi), so long runs lose no precision to large arguments.
+        self._phases = np.mod(self._phases + omega * (n / self.fs), 2 * np.pi)
+        self.position += n
+        self._wall_end = time.perf_counter()
+        return out
+
+    def stats(self) -> dict:
+        elapsed = max(self._wall_end - (self._wall0 or self._wall_end), 1e-9)
+        seconds = self.position / self.fs
+        return {'streams': self.n_streams, 'samples': self.position, 'eeg_seconds': seconds,
+                'wall_seconds': elapsed, 'x_realtime': seconds * self.n_streams / elapsed}
+
+
+def write_npz_streams(synth: SyntheticEEG, seconds: float, out_dir: str, prefix: str = 'synthetic',
+                      channel_names: Sequence[str] = MUSE_CHANNEL_NAMES, chunk_seconds: float = 60.0) -> list:
+    """Generate `seconds` of every stream and save one `.npz` recording per stream; returns the paths."""
+    n = int(round(seconds * synth.fs))
+    step = max(1, int(chunk_seconds * synth.fs))
+    samples = np.empty((synth.n_streams, synth.n_channels, n), dtype=np.float32)
+    for start in range(0, n, step):
+        samples[:, :, start:start + step] = synth.generate(min(step, n - start))
+    os.makedirs(out_dir, exist_ok=True)
+    names = list(channel_names)[:synth.n_channels]
+    names += [f'ch{i}' for i in range(len(names), synth.n_channels)]
+    paths = []
+    for s in range(synth.n_streams):
+        path = os.path.join(out_dir, f'{prefix}_s{synth.seed}_{s:03d}.npz')
+        np.savez(path, samples=samples[s], fs=synth.fs, channel_names=np.array(names))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Write seeded synthetic EEG recordings (.npz) for replay and '
+                                                 'reprocessing.')
+    parser.add_argument('--output', default=os.path.join('data', 'synthetic'), help='Directory for the .npz files')
+    parser.add_argument('--streams', type=int, default=1, help='Virtual headsets, one file each')
+    parser.add_argument('--seconds', type=float, default=300.0, help='Length of each recording')
+    parser.add_argument('--fs', type=float, default=256.0)
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=None, help='Base seed (random and printed if omitted)')
+    parser.add_argument('--low', choices=sorted(BAND_PROFILES), default='focused',
+                        help='Band profile at relaxation level 0')
+    parser.add_argument('--high', choices=sorted(BAND_PROFILES), default='relaxed',
+                        help='Band profile at relaxation level 1')
+    parser.add_argument('--trajectory', default='sine:120',
+                        help='Relaxation level: LEVEL, T:LEVEL,... keyframes or sine:PERIOD[:LOW:HIGH]')
+    parser.add_argument('--noise-uv', type=float, default=10.0, help='White noise standard deviation in microvolts')
+    args = parser.parse_args()
+    try:
+        parse_trajectory(args.trajectory)
+    except ValueError as e:
+        parser.error(str(e))
+
+    synth = SyntheticEEG(args.fs, args.streams, args.channels, seed=args.seed, low=args.low, high=args.high,
+                         trajectory=args.trajectory, noise_uv=args.noise_uv)
+    paths = write_npz_streams(synth, args.seconds, args.output)
+    stats = synth.stats()
+    print(f"Wrote {len(paths)} recordings of {args.seconds:g}s to {args.output} (seed {synth.seed}); "
+          f"generated at {stats['x_realtime']:.0f}x real time")
+
+
+if __name__ == '__main__':
+    main()
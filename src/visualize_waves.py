@@ -10,6 +10,8 @@ try:
 except Exception:
     Image = None
 
+from src.session_log import SESSION_LOG_SUFFIX, read_session_log
+
 
 def _resolve_path(path_str: str, log_dir: str) -> str:
     """Resolve a potentially relative path. If the file does not exist as given,
@@ -25,6 +27,18 @@ def _resolve_path(path_str: str, log_dir: str) -> str:
     return path_str
 
 
+def _load_log(path: str) -> pd.DataFrame:
+    """Load a CSV or binary .rwlog session log with the same columns.
+    Binary timestamps are float64 epoch seconds, so no string parsing is needed.
+    """
+    if path.endswith(SESSION_LOG_SUFFIX):
+        records, _ = read_session_log(path)
+        data = pd.DataFrame({name: records[name] for name in records.dtype.names})
+        data['timestamp_utc'] = pd.to_datetime(data['timestamp_utc'], unit='s')
+        return data
+    return pd.read_csv(path)
+
+
 def _parse_inputs(input_args):
     """Parse --input values supporting either FILE or FILE:LABEL strings.
     Returns a list of tuples: [(file_path, label_or_none), ...]
@@ -69,7 +83,7 @@ def main():
             if not os.path.exists(resolved):
                 print(f"Warning: file not found: {file_path}")
                 continue
-            data = pd.read_csv(resolved)
+            data = _load_log(resolved)
 
             # Prepare x-axis
             time_axis = None
@@ -153,17 +167,18 @@ def main():
         plt.show()
         return
 
-    # Single-file default: Pick the most recent CSV by modification time
-    log_files = [f for f in os.listdir(log_dir) if f.startswith('session_') and f.endswith('.csv')]
+    # Single-file default: Pick the most recent log by modification time
+    log_files = [f for f in os.listdir(log_dir)
+                 if f.startswith('session_') and f.endswith(('.csv', SESSION_LOG_SUFFIX))]
     if not log_files:
-        print("No session_*.csv files found in logs.")
+        print(f"No session_*.csv or session_*{SESSION_LOG_SUFFIX} files found in logs.")
         return
     most_recent_file = max(log_files, key=lambda f: os.path.getmtime(os.path.join(log_dir, f)))
 
-    # Load the most recent CSV file
-    csv_path = os.path.join(log_dir, most_recent_file)
+    # Load the most recent log file
+    log_path = os.path.join(log_dir, most_recent_file)
     print(f"Loading file: {most_recent_file}")
-    data = pd.read_csv(csv_path)
+    data = _load_log(log_path)
 
     # Convert timestamps and prepare axes
     time_axis = None
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.batch_features import extract_features
+from src.live_visualisation.live_eeg_stream import BridgeConfig, FeatureComputer, _window_and_hop
+from src.synthetic import SyntheticEEG
+
+FS = 256.0
+
+
+@pytest.mark.parametrize('hop_seconds', [0.1, 0.25])
+def test_matches_live_feature_computer(hop_seconds):
+    samples = SyntheticEEG(FS, seed=3, trajectory='sine:20').generate(int(FS * 60))[0]
+    cfg = BridgeConfig(hop_seconds=hop_seconds)
+    window_size, _ = _window_and_hop(cfg)
+    batch = extract_features(samples, FS, cfg, max_bytes=1 << 20)
+
+    computer = FeatureComputer(cfg, FS, window_size)
+    live = [computer.compute(samples[:, end - window_size:end], int(end)) for end in batch.end]
+    assert len(live) == len(batch) > 0
+    for name in ('absolute', 'relative', 'ri'):
+        np.testing.assert_allclose(getattr(batch, name), [getattr(f, name) for f in live], rtol=1e-12)
+    for name in ('ri_ema', 'ri_scaled'):
+        np.testing.assert_allclose(getattr(batch, name), [getattr(f, name) for f in live], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(batch.t, (batch.end - 1) / FS)
+
+
+def test_empty_recording():
+    batch = extract_features(np.zeros((4, 100)), FS)
+    assert len(batch) == 0 and batch.absolute.shape == (0, 5)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from src.batch_features import hop_ends
+from src.live_visualisation.live_eeg_stream import HopScheduler
+
+
+@pytest.mark.parametrize('chunks', [[1] * 2000, [64] * 31, [7, 300, 1, 1200, 13, 479]])
+def test_fires_once_per_hop_however_samples_arrive(chunks):
+    scheduler = HopScheduler(25, warmup=512, max_lag=10 ** 9)
+    ends = [end for n in chunks for end in scheduler.push(n)]
+    assert ends == list(hop_ends(sum(chunks), 512, 25))
+    assert scheduler.stats()['hops_fired'] == len(ends)
+
+
+def test_late_hops_are_dropped():
+    scheduler = HopScheduler(25, max_lag=60)
+    # 200 samples at once cover hops 25..200; only those ending within 60 samples survive.
+    assert scheduler.push(200) == [150, 175, 200]
+    assert scheduler.dropped == 5 and scheduler.fired == 3
+
+
+def test_coalesce_keeps_newest_hop():
+    scheduler = HopScheduler(25, warmup=50, coalesce=True)
+    assert scheduler.push(10) == []
+    assert scheduler.push(190) == [200]
+    assert scheduler.push(30) == [225]
+    stats = scheduler.stats()
+    assert stats['hops_coalesced'] == 6 and stats['hops_fired'] == 2 and stats['max_backlog'] == 7
+
+
+def test_hop_ends_match_scheduler_for_uneven_window():
+    scheduler = HopScheduler(32, warmup=500, max_lag=10 ** 9)
+    assert scheduler.push(1000) == list(hop_ends(1000, 500, 32))
+    assert np.all(np.diff(hop_ends(1000, 500, 32)) == 32)
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from src.pacing import Pacer
+
+
+def test_wait_until_keeps_absolute_schedule():
+    pacer = Pacer(spin_seconds=0.001)
+    start = time.perf_counter()
+    for i in range(1, 21):
+        time.sleep(0.001)  # work between waits is absorbed, not added
+        pacer.wait_until(i * 0.005)
+    assert abs(time.perf_counter() - start - 0.1) < 0.02
+    stats = pacer.stats()
+    assert stats['waits'] == 20 and stats['overruns'] == 0
+
+
+def test_remaining_and_release_spin_like_wait_until():
+    async def run(pacer):
+        for i in range(1, 21):
+            delay = pacer.remaining(i * 0.005)
+            assert delay <= 0.005 - 0.002
+            await asyncio.sleep(delay)
+            pacer.release()
+
+    pacer = Pacer(spin_seconds=0.002)
+    start = time.perf_counter()
+    asyncio.run(run(pacer))
+    assert abs(time.perf_counter() - start - 0.1) < 0.02
+    stats = pacer.stats()
+    assert stats['waits'] == 20 and stats['wake_late_max_ms'] < 5.0
+
+
+def test_overrun_is_counted_and_release_is_a_no_op():
+    pacer = Pacer(spin_seconds=0.001)
+    pacer.start()
+    time.sleep(0.01)
+    assert pacer.remaining(0.001) == 0.0
+    pacer.release()
+    stats = pacer.stats()
+    assert stats['overruns'] == 1 and stats['wake_late_max_ms'] == 0.0
@@ -0,0 +1,65 @@
+import csv
+import time
+
+import numpy as np
+import pytest
+
+from src.raw_recording import RawEEGRecorder
+from src.replay import RawEEGReplay, load_raw_eeg
+
+FS = 256.0
+
+
+def _signal(n: int = 1000):
+    rng = np.random.default_rng(3)
+    samples = (rng.standard_normal((4, n)) * 50.0).astype(np.float32)
+    timestamps = 5000.0 + np.arange(n) / FS
+    return samples, timestamps
+
+
+def _write(tmp_path, fmt: str, samples, timestamps) -> str:
+    if fmt == 'eeg':
+        recorder = RawEEGRecorder(str(tmp_path / 'raw_test'), FS, block_seconds=1.0)
+        for start in range(0, samples.shape[1], 300):
+            recorder.write(samples[:, start:start + 300], timestamps[start:start + 300])
+        recorder.close()
+        return str(tmp_path / 'raw_test.eeg')
+    if fmt == 'npz':
+        path = str(tmp_path / 'raw_test.npz')
+        np.savez(path, samples=samples, timestamps=timestamps)
+        return path
+    path = str(tmp_path / 'raw_test.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamps', 'TP9', 'AF7', 'AF8', 'TP10'])
+        for i in range(samples.shape[1]):
+            writer.writerow([repr(timestamps[i]), *(repr(float(v)) for v in samples[:, i])])
+    return path
+
+
+@pytest.mark.parametrize('fmt', ['eeg', 'npz', 'csv'])
+def test_unpaced_replay_returns_every_sample(tmp_path, fmt):
+    samples, timestamps = _signal()
+    recording = load_raw_eeg(_write(tmp_path, fmt, samples, timestamps))
+    assert len(recording) == samples.shape[1] and recording.fs == pytest.approx(FS)
+    replay = RawEEGReplay(recording, chunk_samples=64, speed=0)
+    chunks, stamps = [], []
+    while not replay.exhausted:
+        chunk, t = replay.pull()
+        assert chunk.shape[1] <= 64
+        chunks.append(chunk.copy())
+        stamps.append(t.copy())
+    assert replay.pull()[0].shape[1] == 0
+    np.testing.assert_array_equal(np.concatenate(chunks, axis=1), samples)
+    np.testing.assert_allclose(np.concatenate(stamps), timestamps, rtol=0, atol=1e-9)
+
+
+def test_paced_replay_follows_timestamps(tmp_path):
+    samples, timestamps = _signal(64)
+    recording = load_raw_eeg(_write(tmp_path, 'npz', samples, timestamps))
+    replay = RawEEGReplay(recording, chunk_samples=16, speed=2.0)
+    start = time.perf_counter()
+    while not replay.exhausted:
+        replay.pull()
+    # The last sample is 63 / 256 s after the first; at 2x that takes ~0.123 s.
+    assert time.perf_counter() - start == pytest.approx(63 / FS / 2.0, abs=0.05)
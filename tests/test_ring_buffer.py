@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from utils.utils import RingBuffer
+
+
+def _reference(history: np.ndarray, capacity: int) -> np.ndarray:
+    return history[:, -capacity:]
+
+
+@pytest.mark.parametrize('chunk_sizes', [[1] * 37, [3, 5, 7, 11, 2], [10, 10, 10], [25], [4, 30, 1, 9]])
+def test_extend_wraps_around(chunk_sizes):
+    capacity = 10
+    buf = RingBuffer(2, capacity)
+    history = np.empty((2, 0))
+    start = 0
+    for m in chunk_sizes:
+        chunk = np.vstack([np.arange(start, start + m), -np.arange(start, start + m)]).astype(float)
+        start += m
+        buf.extend(chunk)
+        history = np.concatenate((history, chunk), axis=1)
+        expected = _reference(history, capacity)
+        assert len(buf) == expected.shape[1]
+        np.testing.assert_array_equal(buf.view(), expected)
+        np.testing.assert_array_equal(buf.view(4), expected[:, -4:])
+
+
+def test_append_matches_extend():
+    a, b = RingBuffer(4, 8), RingBuffer(4, 8)
+    samples = np.arange(4 * 21, dtype=float).reshape(4, 21)
+    for i in range(samples.shape[1]):
+        a.append(samples[:, i])
+    b.extend(samples)
+    assert a.full and b.full
+    np.testing.assert_array_equal(a.view(), b.view())
+    np.testing.assert_array_equal(a.view(), samples[:, -8:])
+
+
+def test_view_is_zero_copy():
+    buf = RingBuffer(4, 16)
+    buf.extend(np.ones((4, 23)))
+    view = buf.view()
+    assert view.shape == (4, 16)
+    # Each channel's window is one unit-stride run inside the buffer itself.
+    assert view.strides[1] == view.itemsize
+    assert np.shares_memory(view, buf.view(1))
+
+
+def test_clear():
+    buf = RingBuffer(1, 4)
+    buf.extend(np.ones((1, 3)))
+    buf.clear()
+    assert len(buf) == 0 and buf.view().shape == (1, 0)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from src.session_log import (
+    SESSION_DTYPE,
+    BinarySessionWriter,
+    csv_to_session_log,
+    read_session_log,
+    session_log_to_csv,
+    write_session_log,
+)
+
+
+def _rows(n: int, start: int = 0) -> list:
+    return [(0.1 * k, 1.7e9 + 0.1 * k, 0.3, 0.2, 0.1, 0.05 * k, 0.5) for k in range(start, start + n)]
+
+
+def test_writer_round_trip(tmp_path):
+    path = str(tmp_path / 'session.rwlog')
+    writer = BinarySessionWriter(path, meta={'hop_seconds': 0.1}, flush_rows=7, flush_seconds=0.0)
+    for row in _rows(30):
+        writer.write(row)
+    writer.close()
+    records, meta = read_session_log(path, strict=True)
+    np.testing.assert_array_equal(records, np.array(_rows(30), dtype=SESSION_DTYPE))
+    assert meta['hop_seconds'] == 0.1 and 'torn_bytes' not in meta
+
+
+def test_torn_and_corrupt_chunks_are_dropped(tmp_path):
+    path = tmp_path / 'session.rwlog'
+    write_session_log(str(path), np.array(_rows(5), dtype=SESSION_DTYPE))
+    whole = path.read_bytes()
+    # Chunk header (magic, row count) and footer (CRC, magic) are 8 bytes each.
+    chunk_size = 8 + 5 * SESSION_DTYPE.itemsize + 8
+    with open(path, 'ab') as f:
+        f.write(whole[-chunk_size:-3])  # a second chunk cut short by a crash
+    records, meta = read_session_log(str(path))
+    assert len(records) == 5 and meta['torn_bytes'] > 0
+    with pytest.raises(ValueError):
+        read_session_log(str(path), strict=True)
+
+    # Flip one record byte: the CRC rejects the chunk.
+    corrupt = bytearray(whole)
+    corrupt[-20] ^= 0xFF
+    path.write_bytes(bytes(corrupt))
+    records, meta = read_session_log(str(path))
+    assert len(records) == 0 and meta['torn_bytes'] == chunk_size
+
+
+def test_csv_conversion_round_trip(tmp_path):
+    rwlog, csv_path, back = (str(tmp_path / name) for name in ('a.rwlog', 'a.csv', 'b.rwlog'))
+    expected = np.array(_rows(12), dtype=SESSION_DTYPE)
+    write_session_log(rwlog, expected)
+    assert session_log_to_csv(rwlog, csv_path) == 12
+    assert csv_to_session_log(csv_path, back) == 12
+    records, _ = read_session_log(back, strict=True)
+    for name in SESSION_DTYPE.names:
+        # CSV keeps microsecond timestamps and six decimals.
+        np.testing.assert_allclose(records[name], expected[name], atol=1e-6)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.rwlog'
+    path.write_bytes(b'elapsed_seconds,timestamp_utc\n')
+    with pytest.raises(ValueError):
+        read_session_log(str(path))
@@ -0,0 +1,59 @@
+import os
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.live_visualisation.shm_channel import SharedMemoryPublisher, SharedMemoryReader
+
+N_BANDS = 5
+
+
+def _feats(k: int) -> SimpleNamespace:
+    return SimpleNamespace(t=1000.0 + k, ri=0.01 * k, ri_ema=0.02 * k, ri_scaled=0.5,
+                           absolute=tuple(float(k + b) for b in range(N_BANDS)),
+                           relative=tuple(0.1 * b for b in range(N_BANDS)))
+
+
+@pytest.fixture
+def channel():
+    name = f'rw_test_{os.getpid()}'
+    publisher = SharedMemoryPublisher(name, N_BANDS, n_channels=4, window_size=8, fs=256.0, history=4)
+    reader = SharedMemoryReader(name)
+    yield publisher, reader
+    reader.close()
+    publisher.close()
+
+
+def test_round_trip(channel):
+    publisher, reader = channel
+    assert reader.latest() is None and len(reader.history()) == 0
+    assert (reader.n_bands, reader.n_channels, reader.window_size, reader.fs) == (N_BANDS, 4, 8, 256.0)
+    for k in range(6):
+        window = np.full((4, 8), float(k))
+        publisher.publish(_feats(k), window, end=100 + 25 * k)
+    rec, window = reader.snapshot()
+    assert rec['end'] == 225 and rec['ri'] == pytest.approx(0.05)
+    np.testing.assert_array_equal(rec['absolute'], [5.0, 6.0, 7.0, 8.0, 9.0])
+    np.testing.assert_array_equal(window, np.full((4, 8), 5.0))
+    assert reader.written == 6
+
+
+def test_history_ring_keeps_newest_oldest_first(channel):
+    publisher, reader = channel
+    for k in range(6):
+        publisher.publish(_feats(k), np.zeros((4, 8)), end=k)
+    np.testing.assert_array_equal(reader.history()['end'], [2, 3, 4, 5])
+    np.testing.assert_array_equal(reader.history(2)['end'], [4, 5])
+
+
+def test_reader_rejects_foreign_segment():
+    name = f'rw_test_foreign_{os.getpid()}'
+    shm = shared_memory.SharedMemory(name=name, create=True, size=4096)
+    try:
+        with pytest.raises(ValueError):
+            SharedMemoryReader(name)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from utils.utils import StreamingWelch, compute_band_powers_welch_multi
+
+FS = 256.0
+BANDS = ((1.0, 4.0), (4.0, 8.0), (8.0, 12.0), (13.0, 30.0), (30.0, 45.0), (1.0, 45.0))
+
+
+def _signal(n_seconds: float = 30.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((4, int(n_seconds * FS))) * np.array([1.0, 10.0, 100.0, 1000.0])[:, None]
+    # A large artifact, so the running sum has to shed it exactly once it leaves the window.
+    x[:, 2000:2100] *= 1e4
+    return x
+
+
+def _batch(window: np.ndarray, segment_length: int, overlap: int) -> np.ndarray:
+    return compute_band_powers_welch_multi(window, FS, BANDS, segment_length=segment_length, overlap=overlap)
+
+
+@pytest.mark.parametrize('window_size, segment_length, overlap, hop', [
+    (512, 256, 128, 32),
+    (512, 256, 128, 64),
+    (512, 256, 128, 25),
+    (500, 256, 128, 32),
+    (600, 256, 100, 13),
+])
+def test_matches_batch_welch(window_size, segment_length, overlap, hop):
+    x = _signal()
+    welch = StreamingWelch(FS, 4, window_size, segment_length, overlap, BANDS)
+    ends = np.arange(window_size, x.shape[1] + 1, hop)
+    # Skipped hops, as with --coalesce-hops, restart a chain.
+    ends = np.delete(ends, [10, 11, 50])
+    for end in ends:
+        window = x[:, end - window_size:end]
+        expected = _batch(window, segment_length, overlap)
+        np.testing.assert_allclose(welch.band_powers(window, int(end)), expected, rtol=1e-12)
+
+
+def test_aligned_hops_transform_one_segment():
+    x = _signal()
+    welch = StreamingWelch(FS, 4, 512, 256, 128, BANDS)
+    assert welch.aligned(32) and not welch.aligned(25)
+    ends = np.arange(512, x.shape[1] + 1, 32)
+    for end in ends:
+        welch.band_powers(x[:, end - 512:end], int(end))
+    # Each of the 4 chains starts with a full window of 3 segments, then 1 FFT per hop.
+    assert welch.transformed == len(ends) + 4 * (welch.num_segments - 1)
+
+
+def test_reset_forgets_chains():
+    x = _signal(5.0)
+    welch = StreamingWelch(FS, 4, 512, 256, 128, BANDS)
+    welch.band_powers(x[:, :512], 512)
+    welch.reset()
+    before = welch.transformed
+    welch.band_powers(x[:, 128:640], 640)
+    assert welch.transformed - before == welch.num_segments
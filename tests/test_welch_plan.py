@@ -0,0 +1,45 @@
+import numpy as np
+
+from utils.utils import compute_band_powers_welch_multi, compute_bandpower_welch, get_welch_plan
+
+FS = 256.0
+BANDS = ((1.0, 4.0), (4.0, 8.0), (8.0, 12.0), (13.0, 30.0), (30.0, 45.0), (1.0, 45.0))
+
+
+def _baseline_bandpower(signal, fs, fmin, fmax, segment_length, overlap):
+    """The original per-band loop, rebuilding the window and band mask on every call."""
+    step = max(1, segment_length - overlap)
+    x = signal - np.mean(signal)
+    window = np.hanning(segment_length)
+    window_norm = np.sum(window ** 2)
+    psd_accum, num_segments, i = None, 0, 0
+    while i + segment_length <= signal.size:
+        seg = x[i:i + segment_length]
+        seg = seg - np.mean(seg)
+        psd_seg = np.abs(np.fft.rfft(seg * window)) ** 2 / (fs * window_norm)
+        psd_accum = psd_seg if psd_accum is None else psd_accum + psd_seg
+        num_segments += 1
+        i += step
+    psd_avg = psd_accum / num_segments
+    freqs = np.fft.rfftfreq(segment_length, d=1.0 / fs)
+    idx = np.where((freqs >= fmin) & (freqs <= fmax))[0]
+    return float(np.trapz(psd_avg[idx], freqs[idx]))
+
+
+def test_band_powers_match_baseline():
+    rng = np.random.default_rng(1)
+    signals = rng.standard_normal((4, 512)) * 20.0
+    powers = compute_band_powers_welch_multi(signals, FS, BANDS, segment_length=256, overlap=128)
+    for ch in range(4):
+        for k, (fmin, fmax) in enumerate(BANDS):
+            expected = _baseline_bandpower(signals[ch], FS, fmin, fmax, 256, 128)
+            assert np.isclose(powers[ch, k], expected, rtol=1e-12)
+            assert np.isclose(compute_bandpower_welch(signals[ch], FS, fmin, fmax, 256, 128), expected, rtol=1e-12)
+
+
+def test_plans_are_cached_per_key():
+    plan = get_welch_plan(FS, 256, BANDS)
+    assert get_welch_plan(256, 256, [list(b) for b in BANDS]) is plan
+    assert get_welch_plan(FS, 128, BANDS) is not plan
+    assert get_welch_plan(FS, 256, BANDS[:2]) is not plan
+    assert not plan.window.flags.writeable and not plan.weights.flags.writeable
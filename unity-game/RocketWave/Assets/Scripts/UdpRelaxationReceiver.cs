@@ -21,10 +21,20 @@ public class UdpRelaxationReceiver : MonoBehaviour
 
     [Header("Runtime State")] 
     [Range(0f, 1f)] public volatile float Relaxation01 = 0f;
+    // Binary packets only: datagrams missing from the sequence so far.
+    public volatile int PacketsLost = 0;
 
     private UdpClient udpClient;
     private Thread listenerThread;
     private volatile bool isRunning;
+    private bool haveSequence;
+    private uint lastSequence;
+
+    // Binary packet layout (little-endian, 32 bytes), see RELAXATION_PACKET in utils/utils.py:
+    // "RW", version u8, flags u8, headset u16, reserved u16, seq u32, t f64, ri f32, ri_ema f32, ri_scaled f32
+    private const int BinaryPacketSize = 32;
+    private const byte BinaryPacketVersion = 1;
+    private const byte FlagOk = 0x01;
 
     private void Start()
     {
@@ -50,6 +60,15 @@ public class UdpRelaxationReceiver : MonoBehaviour
             try
             {
                 byte[] data = udpClient.Receive(ref remoteEndPoint);
+                if (TryDecodeBinary(data, out float riScaled, out bool ok))
+                {
+                    if (ok)
+                    {
+                        Relaxation01 = Mathf.Clamp01(riScaled);
+                    }
+                    continue;
+                }
+                // JSON fallback
                 string json = Encoding.UTF8.GetString(data);
                 var pkt = JsonUtility.FromJson<RelaxationPacket>(json);
                 if (pkt != null && pkt.ok)
@@ -70,6 +89,29 @@ public class UdpRelaxationReceiver : MonoBehaviour
         }
     }
 
+    private bool TryDecodeBinary(byte[] data, out float riScaled, out bool ok)
+    {
+        riScaled = 0f;
+        ok = false;
+        if (data.Length < BinaryPacketSize || data[0] != (byte)'R' || data[1] != (byte)'W' || data[2] != BinaryPacketVersion)
+        {
+            return false;
+        }
+        // BitConverter reads little-endian on every platform Unity targets.
+        byte flags = data[3];
+        uint seq = System.BitConverter.ToUInt32(data, 8);
+        uint gap = unchecked(seq - lastSequence - 1);
+        if (haveSequence && gap != 0 && gap < 0x80000000u)
+        {
+            PacketsLost += (int)gap;
+        }
+        haveSequence = true;
+        lastSequence = seq;
+        riScaled = System.BitConverter.ToSingle(data, 28);
+        ok = (flags & FlagOk) != 0;
+        return true;
+    }
+
     private void OnDestroy()
     {
         isRunning = false;
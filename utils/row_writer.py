@@ -0,0 +1,138 @@
+"""Buffered background writers for session logs.
+
+Kept free of pylsl so the offline tools (visualize-waves,
+rocketwave-convert-log) import without liblsl installed.
+"""
+
+import collections
+import csv
+import os
+import threading
+from typing import Callable, List, Optional, Sequence
+
+# Columns of the session logs written by the logger and the bridge, read by visualize_waves.
+SESSION_CSV_HEADER = ['elapsed_seconds', 'timestamp_utc', 'alpha_rel', 'beta_rel', 'ri', 'ri_ema', 'ri_scaled']
+
+
+class BackgroundRowWriter:
+    """
+    Appends rows to a file from a background thread.
+
+    `write` only queues the row, so the caller never formats or touches the
+    file. The writer thread hands the queued rows to `_write_rows` in one
+    batch, then flushes, when `flush_rows` rows are waiting, `flush_seconds`
+    after the last flush, and on `close`. Subclasses open `self._file` and
+    implement `_write_rows` before calling this constructor.
+
+    Args:
+        path: File being written.
+        flush_rows: Pending rows that trigger an early flush.
+        flush_seconds: Longest time a queued row waits before reaching the
+            file; 0 flushes on `flush_rows` and `close` only.
+        fsync: Also os.fsync after each flush, so rows survive a power loss,
+            not just a crash of this process.
+    """
+
+    def __init__(self, path: str, flush_rows: int = 64, flush_seconds: float = 1.0, fsync: bool = False):
+        self.path = path
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_seconds = max(0.0, float(flush_seconds))
+        self.fsync = fsync
+        self.rows_written = 0
+        self.flushes = 0
+        self.error: Optional[BaseException] = None
+        # deque.append/popleft are atomic, so producers never take a lock.
+        self._pending = collections.deque()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name='row-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, row: Sequence) -> None:
+        """
+        Queue one row; returns immediately.
+
+        Args:
+            row: Values for the subclass to encode.
+        """
+        self._pending.append(row)
+        if len(self._pending) >= self.flush_rows:
+            self._wake.set()
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        raise NotImplementedError
+
+    def _drain(self) -> None:
+        rows = []
+        try:
+            while True:
+                rows.append(self._pending.popleft())
+        except IndexError:
+            pass
+        if rows:
+            self._write_rows(rows)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.rows_written += len(rows)
+        self.flushes += 1
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds or None)
+            self._wake.clear()
+            closing = self._closing
+            if self._pending or closing:
+                try:
+                    self._drain()
+                except Exception as e:
+                    # Keep draining the queue so producers never block; report on close.
+                    self.error = self.error or e
+            if closing:
+                return
+
+    def stats(self) -> dict:
+        return {'rows': self.rows_written, 'flushes': self.flushes, 'pending': len(self._pending)}
+
+    def close(self) -> None:
+        """
+        Write every queued row, flush and close the file.
+
+        Raises:
+            OSError: If any background write failed.
+        """
+        if self._file.closed:
+            return
+        self._closing = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+        if self.error is not None:
+            raise self.error
+
+
+class BackgroundCSVWriter(BackgroundRowWriter):
+    """
+    `BackgroundRowWriter` for CSV files.
+
+    Args:
+        path: CSV file to create (truncated if it exists).
+        header: Optional first row, written before any queued row.
+        format_row: Turns a queued row into the list of cells to write; runs
+            on the writer thread. Rows are written as given by default.
+        **kwargs: Flush policy, see `BackgroundRowWriter`.
+    """
+
+    def __init__(self, path: str, header: Optional[Sequence[str]] = None,
+                 format_row: Optional[Callable[[Sequence], Sequence]] = None, **kwargs):
+        self.format_row = format_row
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        if header is not None:
+            self._writer.writerow(header)
+        super().__init__(path, **kwargs)
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        if self.format_row is not None:
+            rows = [self.format_row(row) for row in rows]
+        self._writer.writerows(rows)
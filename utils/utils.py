@@ -1,19 +1,25 @@
+import collections
 import math
-from typing import Tuple
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 from pylsl import StreamInlet, resolve_byprop
 
 
-def find_eeg_inlet(timeout_seconds: float = 10.0) -> StreamInlet:
+def find_eeg_inlet(timeout_seconds: float = 10.0, prop: str = 'type', value: str = 'EEG') -> StreamInlet:
     """
     Find the LSL EEG stream.
 
     Args:
         timeout_seconds: How long to wait before crashing.
+        prop: Stream property to match, ie 'source_id' to pick one headset.
+        value: Value of that property.
     """
     print("Resolving LSL EEG stream (run 'muselsl stream' in another terminal if needed)...")
-    streams = resolve_byprop('type', 'EEG', timeout=timeout_seconds)
+    streams = [s for s in resolve_byprop(prop, value, timeout=timeout_seconds) if s.type() == 'EEG']
     if len(streams) == 0:
         raise RuntimeError("No EEG LSL stream found. Did you run 'muselsl stream'? Is Muse on?")
     inlet = StreamInlet(streams[0], max_buflen=60)
@@ -21,6 +27,111 @@ def find_eeg_inlet(timeout_seconds: float = 10.0) -> StreamInlet:
     print(f"Connected to stream: name={info.name()}, type={info.type()}, fs={info.nominal_srate()} Hz, ch={info.channel_count()}")
     return inlet
 
+
+def list_eeg_streams(timeout_seconds: float = 10.0) -> List[Tuple[str, str]]:
+    """
+    Find every LSL EEG stream, ie one per Muse headset.
+
+    Stream handles cannot be shared between processes, so each stream is
+    described by a (prop, value) pair that find_eeg_inlet can resolve again:
+    its source_id, or its name if the source has no id.
+
+    Args:
+        timeout_seconds: How long to wait for streams to show up.
+
+    Returns:
+        One (prop, value) pair per stream.
+    """
+    keys = []
+    for info in resolve_byprop('type', 'EEG', timeout=timeout_seconds):
+        key = ('source_id', info.source_id()) if info.source_id() else ('name', info.name())
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def muse_channel_map(channel_count: int, n_channels: int = 4) -> np.ndarray:
+    """
+    Source channel feeding each Muse channel (TP9, AF7, AF8, TP10), with the
+    same fallbacks as the per-sample path when a stream has fewer channels:
+    AF7 falls back to TP9, AF8 to AF7 and TP10 to TP9.
+
+    Args:
+        channel_count: Number of channels in the LSL stream.
+        n_channels: Number of output channels.
+
+    Returns:
+        Integer index array of length n_channels.
+    """
+    fallback = [0, 0, 1, 0]
+    mapping = []
+    for k in range(n_channels):
+        if k < channel_count:
+            mapping.append(k)
+        else:
+            mapping.append(mapping[fallback[k]] if k < len(fallback) else 0)
+    return np.asarray(mapping, dtype=np.intp)
+
+
+class ChunkedInlet:
+    """
+    Pulls LSL samples in chunks into preallocated NumPy arrays.
+
+    Wraps inlet.pull_chunk with a dest_obj so samples land straight in a
+    (max_samples, channel_count) array, then maps them onto Muse channels in
+    one vectorized copy instead of one pull_sample call per sample.
+
+    Args:
+        inlet: A connected LSL inlet, ie from find_eeg_inlet.
+        n_channels: Number of output channels, ie 4 for TP9, AF7, AF8, TP10.
+        max_samples: Largest chunk returned by one pull.
+        timeout: How long to block when no sample is buffered yet. Only the
+            first sample is waited for; the rest of a chunk is whatever is
+            already buffered, so a pull never holds back samples that arrived.
+    """
+
+    def __init__(self, inlet: StreamInlet, n_channels: int = 4, max_samples: int = 64,
+                 timeout: float = 5.0):
+        self.inlet = inlet
+        self.max_samples = max(1, int(max_samples))
+        self.timeout = timeout
+        channel_count = inlet.channel_count
+        self._raw = np.zeros((self.max_samples, channel_count), dtype=np.dtype(inlet.value_type))
+        self._map = muse_channel_map(channel_count, n_channels)
+        self._out = np.zeros((n_channels, self.max_samples))
+        self._timestamps = np.zeros(self.max_samples)
+
+    def pull(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pull whatever is available, waiting up to `timeout` only if nothing is.
+
+        pull_chunk with a nonzero timeout blocks until max_samples arrive, ie
+        250 ms for 64 samples at 256 Hz, so the wait is a separate one-sample
+        pull and the chunk itself is always drained with timeout=0.
+
+        Returns:
+            (samples, timestamps) with samples shaped (n_channels, n) and n
+            possibly 0. Both are views into reused buffers, valid until the
+            next pull.
+        """
+        _, timestamps = self.inlet.pull_chunk(timeout=0.0, max_samples=self.max_samples, dest_obj=self._raw)
+        n = len(timestamps)
+        if n == 0 and self.timeout > 0:
+            _, first = self.inlet.pull_chunk(timeout=self.timeout, max_samples=1, dest_obj=self._raw)
+            if first and self.max_samples > 1:
+                _, rest = self.inlet.pull_chunk(timeout=0.0, max_samples=self.max_samples - 1,
+                                                dest_obj=self._raw[1:])
+                timestamps = list(first) + list(rest)
+            else:
+                timestamps = first
+            n = len(timestamps)
+        if n == 0:
+            return self._out[:, :0], self._timestamps[:0]
+        self._out[:, :n] = self._raw[:n, self._map].T
+        self._timestamps[:n] = timestamps
+        return self._out[:, :n], self._timestamps[:n]
+
+
 def compute_bandpower_fft(signal: np.ndarray, fs: float, fmin: float, fmax: float) -> float:
     """
     Compute band power via simple FFT integration (no window/overlap).
@@ -51,11 +162,214 @@ def compute_bandpower_fft(signal: np.ndarray, fs: float, fmin: float, fmax: floa
 
 
 
+Bands = Tuple[Tuple[float, float], ...]
+
+
+def _trapezoid_weights(freqs: np.ndarray, bands: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Weight matrix W such that psd @ W integrates psd over each band with the
+    trapezoid rule, exactly like np.trapz over the bins inside [fmin, fmax].
+    """
+    weights = np.zeros((freqs.size, len(bands)))
+    for k, (fmin, fmax) in enumerate(bands):
+        idx = np.where((freqs >= fmin) & (freqs <= fmax))[0]
+        if idx.size < 2:
+            continue
+        half_df = 0.5 * np.diff(freqs[idx])
+        weights[idx[:-1], k] += half_df
+        weights[idx[1:], k] += half_df
+    return weights
+
+
+@dataclass(frozen=True)
+class WelchPlan:
+    """
+    Everything about a Welch estimate that only depends on the sample rate,
+    segment length and bands, built once and reused on every hop.
+
+    Attributes:
+        fs: sampling rate (how many samples per second)
+        segment_length: The length of the segment to use for the Welch method.
+        bands: (fmin, fmax) pairs, the columns of `weights`.
+        window: Hann window of segment_length samples.
+        window_norm: Sum of the squared window.
+        scale: PSD normalisation, 1 / (fs * window_norm).
+        freqs: Frequency of each rfft bin.
+        weights: (n_freqs, n_bands) trapezoid integration matrix.
+    """
+    fs: float
+    segment_length: int
+    bands: Bands
+    window: np.ndarray
+    window_norm: float
+    scale: float
+    freqs: np.ndarray
+    weights: np.ndarray
+
+    def band_powers(self, psd: np.ndarray) -> np.ndarray:
+        """Integrate a PSD (frequency on the last axis) over every band at once."""
+        return psd @ self.weights
+
+
+@lru_cache(maxsize=16)
+def _cached_welch_plan(fs: float, segment_length: int, bands: Bands) -> WelchPlan:
+    window = np.hanning(segment_length)
+    window.flags.writeable = False
+    window_norm = float(np.sum(window ** 2))
+    freqs = np.fft.rfftfreq(segment_length, d=1.0 / fs)
+    freqs.flags.writeable = False
+    weights = _trapezoid_weights(freqs, bands)
+    weights.flags.writeable = False
+    scale = 1.0 / (fs * window_norm) if window_norm > 0 else 0.0
+    return WelchPlan(fs, segment_length, bands, window, window_norm, scale, freqs, weights)
+
+
+def get_welch_plan(fs: float, segment_length: int,
+                   bands: Sequence[Tuple[float, float]] = ()) -> WelchPlan:
+    """
+    Fetch the WelchPlan for (fs, segment_length, bands) from a small LRU cache.
+
+    Args:
+        fs: sampling rate (how many samples per second)
+        segment_length: The length of the segment to use for the Welch method.
+        bands: (fmin, fmax) pairs, ie [(8.0, 12.0), (13.0, 30.0)].
+
+    Returns:
+        A shared, read-only plan. Do not modify its arrays.
+    """
+    key = tuple((float(fmin), float(fmax)) for fmin, fmax in bands)
+    return _cached_welch_plan(float(fs), int(segment_length), key)
+
+
+def _welch_psd(signals: np.ndarray, plan: WelchPlan, overlap: int) -> np.ndarray:
+    """Welch PSD of a (n_channels, n_samples) array, assuming it fits a segment."""
+    step = max(1, plan.segment_length - overlap)
+    # (channels, segments, segment_length) view, one row per Welch segment
+    segs = np.lib.stride_tricks.sliding_window_view(signals, plan.segment_length, axis=-1)[:, ::step, :]
+    # Per-segment demean also removes the whole-window mean, so no separate pass is needed.
+    segs = segs - segs.mean(axis=-1, keepdims=True)
+    fft_vals = np.fft.rfft(segs * plan.window, axis=-1)
+    return (np.abs(fft_vals) ** 2).mean(axis=1) * plan.scale
+
+
+def compute_psd_welch_multi(signals: np.ndarray, fs: float, segment_length: int,
+                            overlap: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Welch power spectral density for every channel at once.
+
+    Segments are framed as strided views of the input, so there is a single
+    rfft over a (channels, segments, segment_length) block and no Python loop
+    over channels or segments.
+
+    Args:
+        signals: EEG data shaped (n_channels, n_samples).
+        fs: sampling rate (how many samples per second)
+        segment_length: The length of the segment to use for the Welch method.
+        overlap: The overlap between segments.
+
+    Returns:
+        (freqs, psd) where psd is shaped (n_channels, len(freqs)). Both have
+        zero frequency bins if the signal is too short for a single segment.
+    """
+    signals = np.atleast_2d(np.asarray(signals, dtype=np.float64))
+    n_channels, n = signals.shape
+    if n == 0 or segment_length <= 0 or segment_length > n:
+        return np.empty(0), np.empty((n_channels, 0))
+    plan = get_welch_plan(fs, segment_length)
+    if plan.window_norm == 0:
+        return np.empty(0), np.empty((n_channels, 0))
+    return plan.freqs, _welch_psd(signals, plan, overlap)
+
+
+def compute_psd_welch(signal: np.ndarray, fs: float, segment_length: int,
+                      overlap: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Welch power spectral density of one electrode, computed once so that any
+    number of bands can be read from it.
+
+    Args:
+        signal: EEG data from one electrode.
+        fs: sampling rate (how many samples per second)
+        segment_length: The length of the segment to use for the Welch method.
+        overlap: The overlap between segments.
+
+    Returns:
+        (freqs, psd) arrays of the same length, both empty if the signal is too
+        short for a single segment.
+    """
+    freqs, psd = compute_psd_welch_multi(np.ravel(signal)[np.newaxis, :], fs, segment_length, overlap)
+    return freqs, psd[0]
+
+
+def band_powers_from_psd(freqs: np.ndarray, psd: np.ndarray,
+                         bands: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Integrate a PSD over several bands.
+
+    Args:
+        freqs: Frequency of each PSD bin.
+        psd: Power spectral density with frequency on the last axis, ie from
+            compute_psd_welch or compute_psd_welch_multi.
+        bands: (fmin, fmax) pairs, ie [(8.0, 12.0), (13.0, 30.0)].
+
+    Returns:
+        Band powers shaped psd.shape[:-1] + (len(bands),), 0.0 for bands with
+        no bins.
+    """
+    return psd @ _trapezoid_weights(freqs, bands)
+
+
+def compute_band_powers_welch(signal: np.ndarray, fs: float, bands: Sequence[Tuple[float, float]],
+                              segment_length: int, overlap: int) -> np.ndarray:
+    """
+    Welch bandpower for several bands from a single PSD estimate.
+
+    Args:
+        signal: EEG data from one electrode.
+        fs: sampling rate (how many samples per second)
+        bands: (fmin, fmax) pairs, ie [(8.0, 12.0), (13.0, 30.0)].
+        segment_length: The length of the segment to use for the Welch method.
+        overlap: The overlap between segments.
+
+    Returns:
+        One estimated power per band, in the order given.
+    """
+    return compute_band_powers_welch_multi(np.ravel(signal)[np.newaxis, :], fs, bands, segment_length, overlap)[0]
+
+
+def compute_band_powers_welch_multi(signals: np.ndarray, fs: float, bands: Sequence[Tuple[float, float]],
+                                    segment_length: int, overlap: int) -> np.ndarray:
+    """
+    Welch bandpower for every channel and band in one vectorized pass.
+
+    Args:
+        signals: EEG data shaped (n_channels, n_samples).
+        fs: sampling rate (how many samples per second)
+        bands: (fmin, fmax) pairs, ie [(8.0, 12.0), (13.0, 30.0)].
+        segment_length: The length of the segment to use for the Welch method.
+        overlap: The overlap between segments.
+
+    Returns:
+        Estimated powers shaped (n_channels, n_bands).
+    """
+    signals = np.atleast_2d(np.asarray(signals, dtype=np.float64))
+    n_channels, n = signals.shape
+    if n == 0 or segment_length <= 0 or segment_length > n:
+        return np.zeros((n_channels, len(bands)))
+    plan = get_welch_plan(fs, segment_length, bands)
+    if plan.window_norm == 0:
+        return np.zeros((n_channels, len(bands)))
+    return plan.band_powers(_welch_psd(signals, plan, overlap))
+
+
 def compute_bandpower_welch(signal: np.ndarray, fs: float, fmin: float, fmax: float,
                             segment_length: int, overlap: int) -> float:
     """
     More stable bandpower calculation using Welch's method.
 
+    Prefer compute_band_powers_welch when several bands are needed from the
+    same signal, it only computes the PSD once.
+
     Args: 
         signal: EEG data from one electrode.
         fs: sampling rate (how many samples per second)
@@ -67,45 +381,371 @@ def compute_bandpower_welch(signal: np.ndarray, fs: float, fmin: float, fmax: fl
     Returns:
         estimated power for a given band.
     """
-    n = signal.size
-    if n == 0 or segment_length <= 0 or segment_length > n:
-        return 0.0
-    step = max(1, segment_length - overlap)
-    if step <= 0:
-        return 0.0
+    powers = compute_band_powers_welch(signal, fs, [(fmin, fmax)], segment_length, overlap)
+    return float(powers[0])
 
-    x = signal - np.mean(signal)
-    window = np.hanning(segment_length)
-    window_norm = np.sum(window ** 2)
-    if window_norm == 0:
-        return 0.0
 
-    num_segments = 0
-    psd_accum = None
-    i = 0
-    while i + segment_length <= n:
-        seg = x[i:i + segment_length]
-        seg = seg - np.mean(seg)
-        seg_win = seg * window
-        fft_vals = np.fft.rfft(seg_win)
-        psd_seg = (np.abs(fft_vals) ** 2) / (fs * window_norm)
-        if psd_accum is None:
-            psd_accum = psd_seg
-        else:
-            psd_accum += psd_seg
-        num_segments += 1
-        i += step
+@dataclass
+class _SegmentChain:
+    """Segment spectra and their running sum for windows ending a multiple of the Welch step apart."""
+    newest: int
+    spectra: Deque[np.ndarray]
+    total: np.ndarray
+    updates: int = 0
 
-    if num_segments == 0 or psd_accum is None:
-        return 0.0
 
-    psd_avg = psd_accum / num_segments
-    freqs = np.fft.rfftfreq(segment_length, d=1.0 / fs)
-    idx = np.where((freqs >= fmin) & (freqs <= fmax))[0]
-    if idx.size == 0:
-        return 0.0
-    bandpower = np.trapz(psd_avg[idx], freqs[idx])
-    return float(bandpower)
+class StreamingWelch:
+    """
+    Incremental Welch bandpower over a sliding window of a live stream.
+
+    Segments sit exactly where compute_psd_welch_multi puts them in each
+    window, so results match the batch estimate to rounding (~1e-16).
+    Windows whose ends are a whole number of segment steps apart share all
+    but one segment. Each such chain of windows keeps a ring of its segment
+    spectra and a running PSD sum, so a window continuing a chain FFTs only
+    the segment completed since the chain's previous window, adds it to the
+    sum and subtracts the one that dropped out.
+
+    Every hop continues a chain when the hop divides the step
+    (`segment_length - overlap`), ie 32- or 64-sample hops with 256-sample
+    segments at 50% overlap, and then costs one FFT instead of
+    num_segments. Otherwise, and after skipped hops, a window starts a new
+    chain and is transformed in full, just like the batch estimate.
+
+    Args:
+        fs: sampling rate (how many samples per second)
+        n_channels: Number of EEG channels, ie 4 for Muse.
+        window_size: Sliding analysis window in samples.
+        segment_length: The length of the segment to use for the Welch method.
+        overlap: The overlap between segments.
+        bands: (fmin, fmax) pairs returned by band_powers().
+    """
+
+    # Chain updates between exact re-summations, so add/subtract rounding cannot build up.
+    RESYNC_UPDATES = 1024
+    # Dropped-to-remaining power ratio above which the running sum is rebuilt exactly.
+    RESYNC_RATIO = 16.0
+
+    def __init__(self, fs: float, n_channels: int, window_size: int, segment_length: int,
+                 overlap: int, bands: Sequence[Tuple[float, float]]):
+        if segment_length <= 0 or segment_length > window_size:
+            raise ValueError("segment_length must be in (0, window_size]")
+        self.fs = fs
+        self.n_channels = n_channels
+        self.window_size = window_size
+        self.segment_length = segment_length
+        self.step = max(1, segment_length - overlap)
+        self.num_segments = (window_size - segment_length) // self.step + 1
+        # Samples between the newest segment's end and the window's end, as in the batch layout.
+        self._tail = (window_size - segment_length) % self.step
+        self.plan = get_welch_plan(fs, segment_length, bands)
+        self.bands = self.plan.bands
+        self.freqs = self.plan.freqs
+        self.transformed = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all segment spectra and running sums."""
+        self._chains: Dict[int, _SegmentChain] = {}
+
+    def aligned(self, hop_size: int) -> bool:
+        """True if windows `hop_size` samples apart always continue a chain, ie one FFT per hop."""
+        return hop_size > 0 and self.step % hop_size == 0
+
+    def _spectra(self, segs: np.ndarray) -> np.ndarray:
+        segs = segs - segs.mean(axis=-1, keepdims=True)
+        self.transformed += segs.shape[-2] if segs.ndim == 3 else 1
+        return (np.abs(np.fft.rfft(segs * self.plan.window, axis=-1)) ** 2) * self.plan.scale
+
+    def psd(self, window: np.ndarray, end: int) -> np.ndarray:
+        """
+        Average PSD over the segments of `window`, shaped (n_channels, n_freqs).
+
+        Args:
+            window: The latest `window_size` samples, shaped (n_channels, window_size).
+            end: Absolute sample index (exclusive) at which `window` ends.
+        """
+        L = self.segment_length
+        newest = end - self._tail
+        chain = self._chains.get(newest % self.step)
+        if chain is not None and chain.newest == newest - self.step:
+            stop = self.window_size - self._tail
+            spectrum = self._spectra(window[:, stop - L:stop])
+            chain.spectra.append(spectrum)
+            chain.total += spectrum
+            dropped = chain.spectra.popleft()
+            chain.total -= dropped
+            chain.newest = newest
+            chain.updates += 1
+            # Subtracting an artifact much larger than what remains would leave its rounding error
+            # behind, so the sum is rebuilt then, and periodically anyway.
+            swamped = np.any(dropped.sum(axis=-1) > self.RESYNC_RATIO * chain.total.sum(axis=-1))
+            if swamped or chain.updates >= self.RESYNC_UPDATES:
+                chain.total = sum(chain.spectra)
+                chain.updates = 0
+        elif chain is None or chain.newest != newest:
+            segs = np.lib.stride_tricks.sliding_window_view(window, L, axis=-1)[:, ::self.step, :]
+            spectra = self._spectra(segs)
+            chain = _SegmentChain(newest, collections.deque(spectra[:, i, :] for i in range(self.num_segments)),
+                                  spectra.sum(axis=1))
+            self._chains[newest % self.step] = chain
+        # A chain whose next window would already be behind this one can never continue.
+        for key in [k for k, c in self._chains.items() if c.newest < newest - self.step]:
+            del self._chains[key]
+        return chain.total / self.num_segments
+
+    def band_powers(self, window: np.ndarray, end: int) -> np.ndarray:
+        """Band powers shaped (n_channels, n_bands) for `window` ending at sample `end`."""
+        return self.plan.band_powers(self.psd(window, end))
+
+
+class RingBuffer:
+    """
+    Preallocated (n_channels, capacity) float ring buffer for multi-channel EEG.
+
+    Every sample is written twice, at i and i + capacity, so the newest
+    `capacity` samples always sit next to each other in memory and view()
+    returns them without copying. Appends cost O(1) per sample, whether they
+    arrive one at a time or as a chunk.
+
+    Args:
+        n_channels: Number of EEG channels, ie 4 for Muse.
+        capacity: Number of samples kept per channel, ie the analysis window.
+        dtype: Sample dtype of the buffer.
+    """
+
+    def __init__(self, n_channels: int, capacity: int, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.n_channels = n_channels
+        self.capacity = capacity
+        self._data = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self._head = 0  # next write position, also the oldest sample once full
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def append(self, sample: Sequence[float]) -> None:
+        """
+        Push one sample.
+
+        Args:
+            sample: One value per channel.
+        """
+        i = self._head
+        self._data[:, i] = sample
+        self._data[:, i + self.capacity] = sample
+        self._head = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, chunk: np.ndarray) -> None:
+        """
+        Push a chunk of samples with at most two slice copies per half.
+
+        Args:
+            chunk: New samples shaped (n_channels, n_new).
+        """
+        cap = self.capacity
+        m = chunk.shape[1]
+        if m == 0:
+            return
+        if m > cap:
+            # Only the newest `capacity` samples survive anyway.
+            self._head = (self._head + m - cap) % cap
+            chunk = chunk[:, m - cap:]
+            m = cap
+        head = self._head
+        first = min(m, cap - head)
+        self._data[:, head:head + first] = chunk[:, :first]
+        self._data[:, head + cap:head + cap + first] = chunk[:, :first]
+        rest = m - first
+        if rest > 0:
+            self._data[:, :rest] = chunk[:, first:]
+            self._data[:, cap:cap + rest] = chunk[:, first:]
+        self._head = (head + m) % cap
+        self._size = min(self._size + m, cap)
+
+    def view(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy view of the newest samples, oldest first.
+
+        The view aliases the buffer and changes with the next append; copy it
+        if it has to outlive that.
+
+        Args:
+            n: Number of samples, defaults to everything buffered.
+
+        Returns:
+            Array shaped (n_channels, n).
+        """
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return self._data[:, end - n:end]
+
+
+# Binary relaxation packet for the Unity UDP channel, little-endian, 32 bytes:
+# magic "RW", version, flags, headset id, reserved, sequence number,
+# timestamp (float64 epoch seconds), ri, ri_ema, ri_scaled (float32).
+RELAXATION_PACKET = struct.Struct('<2sBBHHIdfff')
+RELAXATION_PACKET_MAGIC = b'RW'
+RELAXATION_PACKET_VERSION = 1
+PACKET_FLAG_OK = 0x01
+PACKET_FLAG_HEADSET = 0x02
+
+
+class RelaxationPacketEncoder:
+    """
+    Builds binary relaxation packets with an increasing sequence number, so
+    receivers can detect loss and reordering.
+
+    Args:
+        headset_id: Tags every packet with this headset, ie in multi-headset mode.
+    """
+
+    def __init__(self, headset_id: Optional[int] = None):
+        self.headset_id = headset_id
+        self.sequence = 0
+        self._buf = bytearray(RELAXATION_PACKET.size)
+
+    def encode(self, t: float, ri: float, ri_ema: float, ri_scaled: float, ok: bool = True) -> bytes:
+        flags = PACKET_FLAG_OK if ok else 0
+        if self.headset_id is not None:
+            flags |= PACKET_FLAG_HEADSET
+        RELAXATION_PACKET.pack_into(
+            self._buf, 0, RELAXATION_PACKET_MAGIC, RELAXATION_PACKET_VERSION, flags,
+            self.headset_id or 0, 0, self.sequence, t, ri, ri_ema, ri_scaled,
+        )
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        return bytes(self._buf)
+
+
+def decode_relaxation_packet(data: bytes) -> dict:
+    """
+    Decode a binary relaxation packet.
+
+    Args:
+        data: One UDP datagram.
+
+    Returns:
+        Dict with the same keys as the JSON packet ('t', 'ri', 'ri_ema',
+        'ri_scaled', 'ok') plus 'seq' and, if tagged, 'headset'.
+    """
+    if len(data) < RELAXATION_PACKET.size or data[:2] != RELAXATION_PACKET_MAGIC:
+        raise ValueError("not a binary relaxation packet")
+    _, version, flags, headset, _, seq, t, ri, ri_ema, ri_scaled = RELAXATION_PACKET.unpack_from(data)
+    if version != RELAXATION_PACKET_VERSION:
+        raise ValueError(f"unsupported relaxation packet version {version}")
+    packet = {'t': t, 'ri': ri, 'ri_ema': ri_ema, 'ri_scaled': ri_scaled,
+              'ok': bool(flags & PACKET_FLAG_OK), 'seq': seq}
+    if flags & PACKET_FLAG_HEADSET:
+        packet['headset'] = headset
+    return packet
+
+
+# Seconds from the NTP epoch (1900) used by OSC time tags to the Unix epoch.
+_NTP_UNIX_OFFSET = 2208988800
+OSC_IMMEDIATELY = 1
+
+
+def osc_timetag(t: float) -> int:
+    """
+    Convert a Unix time in seconds to a 64-bit OSC (NTP) time tag.
+
+    Args:
+        t: Seconds since the Unix epoch, ie `time.time()`.
+
+    Returns:
+        Time tag as an unsigned 64-bit integer, 32.32 fixed point.
+    """
+    return int((t + _NTP_UNIX_OFFSET) * 4294967296.0) & 0xFFFFFFFFFFFFFFFF
+
+
+def _osc_string(s: str) -> bytes:
+    """OSC string: ASCII, NUL terminated, padded to a multiple of 4 bytes."""
+    raw = s.encode('ascii')
+    return raw + b'\0' * (4 - len(raw) % 4)
+
+
+class OscBundleTemplate:
+    """
+    Pre-encoded OSC bundle of float-only messages with fixed addresses.
+
+    The bundle header, every message's size, address and typetag are encoded
+    once; `encode` only patches the time tag and float payloads in place, so
+    a hop's worth of messages costs a handful of `struct.pack_into` calls and
+    goes out as one datagram.
+
+    Args:
+        messages: (address, n_floats) per message, in bundle order.
+    """
+
+    def __init__(self, messages: Sequence[Tuple[str, int]]):
+        self.messages = [(address, int(n)) for address, n in messages]
+        parts = [b'#bundle\0', bytes(8)]
+        self._payloads: List[Tuple[int, struct.Struct]] = []
+        offset = 16
+        for address, n in self.messages:
+            prefix = _osc_string(address) + _osc_string(',' + 'f' * n)
+            size = len(prefix) + 4 * n
+            parts.append(struct.pack('>i', size) + prefix + bytes(4 * n))
+            self._payloads.append((offset + 4 + len(prefix), struct.Struct(f'>{n}f')))
+            offset += 4 + size
+        self._buf = bytearray(b''.join(parts))
+        self.n_values = sum(n for _, n in self.messages)
+
+    @property
+    def size(self) -> int:
+        return len(self._buf)
+
+    def encode(self, values: Sequence[float], t: Optional[float] = None) -> bytes:
+        """
+        Fill in the bundle.
+
+        Args:
+            values: `n_values` floats, message by message in bundle order.
+            t: Unix time for the bundle time tag; None means "immediately".
+
+        Returns:
+            The encoded bundle, ready to send as one UDP datagram.
+        """
+        if len(values) != self.n_values:
+            raise ValueError(f"expected {self.n_values} values, got {len(values)}")
+        buf = self._buf
+        struct.pack_into('>Q', buf, 8, OSC_IMMEDIATELY if t is None else osc_timetag(t))
+        i = 0
+        for offset, payload in self._payloads:
+            n = payload.size // 4
+            payload.pack_into(buf, offset, *values[i:i + n])
+            i += n
+        return bytes(buf)
+
+
+def encode_osc_eeg_chunk(address: str, t0: float, fs: float, samples: np.ndarray) -> bytes:
+    """
+    Encode a block of raw EEG as one OSC message with typetag ',dfb'.
+
+    Args:
+        address: OSC address, ie '/muse/eeg_chunk'.
+        t0: Unix time of the first sample.
+        fs: Sampling rate in Hz; sample k is at t0 + k / fs.
+        samples: Array shaped (channels, n).
+
+    Returns:
+        OSC message whose blob holds the samples as big-endian float32,
+        sample-major, ie shaped (n, channels).
+    """
+    data = np.ascontiguousarray(np.asarray(samples).T, dtype='>f4').tobytes()
+    # float32 data is always a multiple of 4 bytes, so the blob needs no padding.
+    return _osc_string(address) + _osc_string(',dfb') + struct.pack('>dfi', t0, fs, len(data)) + data
 
 
 def exponential_moving_average(prev: float, new: float, alpha: float) -> float: